@@ -0,0 +1,252 @@
+"""
+Bench E2E - Chạy N lần scrape_and_sync đồng thời với portal giả (mock_portal.py)
+
+Đo throughput (lần sync/giây), latency p50/p95 mỗi lần sync và peak memory (RSS) của process.
+Mặc định ghi DB vào repo in-memory để không làm bẩn Supabase; --supabase dùng Supabase thật (.env).
+
+Usage:
+    python bench_e2e.py                                  # tự chạy mock portal, 40 lần sync, 8 đồng thời
+    python bench_e2e.py --runs 200 --concurrency 32 --latency-ms 300
+    python bench_e2e.py --portal-url http://127.0.0.1:8765   # dùng mock portal đang chạy sẵn
+    python bench_e2e.py --json e2e.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+SCRAPER_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRAPER_DIR))
+
+
+# ---------- DB in-memory ----------
+
+class _MemoryTable:
+    """Bảng in-memory có cùng các method repo mà VKUScraperManager dùng"""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.rows: Dict[str, List[Any]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _delay(self) -> None:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def delete_by_student(self, student_id: str) -> bool:
+        self._delay()
+        with self._lock:
+            self.rows.pop(student_id, None)
+        return True
+
+    def insert_many(self, rows: List[Any]) -> List[Any]:
+        self._delay()
+        with self._lock:
+            for row in rows:
+                # Record slots (records.py) giữ nguyên như khi normalize trả về, dict thì copy
+                if isinstance(row, dict):
+                    self.rows[row["StudentID"]].append(dict(row))
+                else:
+                    self.rows[row.StudentID].append(row)
+        return rows
+
+    bulk_insert_grades = insert_many
+    bulk_insert_academic_progress = insert_many
+
+
+class _MemoryStudents(_MemoryTable):
+    def get_student_by_id(self, student_id: str) -> Optional[Dict[str, Any]]:
+        self._delay()
+        with self._lock:
+            rows = self.rows.get(student_id)
+            return rows[0] if rows else None
+
+    def get_student_by_id_and_user(self, student_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_student_by_id(student_id)
+
+    def create_student(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        self._delay()
+        with self._lock:
+            self.rows[info["StudentID"]] = [dict(info)]
+        return info
+
+    def update_student(self, student_id: str, info: Dict[str, Any]) -> Dict[str, Any]:
+        return self.create_student(info)
+
+
+class _MemoryFingerprints(_MemoryTable):
+    def get_fingerprints(self, student_id: str, user_id: Optional[str] = None) -> Dict[str, str]:
+        self._delay()
+        with self._lock:
+            return dict(self.rows.get(student_id, [{}])[0])
+
+    def save_fingerprints(self, student_id: str, fingerprints: Dict[str, str], user_id: Optional[str] = None) -> bool:
+        self._delay()
+        with self._lock:
+            stored = self.rows.setdefault(student_id, [{}])[0]
+            stored.update(fingerprints)
+        return True
+
+
+def install_memory_db(latency_ms: float) -> None:
+    """Thay package Supabase bằng repo in-memory (phải gọi trước khi import scraper)"""
+    module = types.ModuleType("Supabase")
+    module.sinh_vien_repo = _MemoryStudents(latency_ms)
+    module.diem_repo = _MemoryTable(latency_ms)
+    module.tien_do_hoc_tap_repo = _MemoryTable(latency_ms)
+    module.sync_fingerprint_repo = _MemoryFingerprints(latency_ms)
+    sys.modules["Supabase"] = module
+
+
+# ---------- Mock portal + sessions ----------
+
+def start_mock_portal(port: int, latency_ms: float, jitter_ms: float) -> subprocess.Popen:
+    """Chạy mock_portal.py ở process riêng (không tính vào memory của benchmark)"""
+    process = subprocess.Popen(
+        [sys.executable, str(SCRAPER_DIR / "mock_portal.py"), "--port", str(port),
+         "--latency-ms", str(latency_ms), "--jitter-ms", str(jitter_ms)],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/__mock/stats", timeout=0.5)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock portal không khởi động được")
+
+
+def create_sessions(portal_url: str, count: int, directory: Path) -> List[Path]:
+    """Đăng nhập vào mock portal cho N sinh viên, lưu storage state như session_get.py"""
+    host = urlparse(portal_url).hostname
+    paths = []
+    with httpx.Client(base_url=portal_url) as client:
+        for index in range(count):
+            data = client.get("/__mock/login", params={"student_id": f"BENCH{index:04d}"}).json()
+            cookie = {**data["cookie"], "domain": host, "expires": -1,
+                      "httpOnly": True, "secure": False, "sameSite": "Lax"}
+            path = directory / f"session_{index:04d}.json"
+            path.write_text(json.dumps({"cookies": [cookie], "origins": []}), encoding="utf-8")
+            paths.append(path)
+    return paths
+
+
+# ---------- Benchmark ----------
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile theo nearest-rank"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_benchmark(sessions: List[Path], runs: int, concurrency: int, verbose: bool) -> Dict[str, Any]:
+    from scraper import VKUScraperManager
+
+    def _one(index: int) -> Dict[str, Any]:
+        session = sessions[index % len(sessions)]
+        manager = VKUScraperManager(session_path=str(session), user_id=f"bench-{session.stem}")
+        started = time.perf_counter()
+        result = manager.scrape_and_sync(force=True)
+        return {"ok": bool(result.get("success")), "seconds": time.perf_counter() - started,
+                "message": result.get("message")}
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(_one, range(runs)))
+    wall = time.perf_counter() - started
+
+    latencies = [outcome["seconds"] for outcome in outcomes]
+    failures = [outcome["message"] for outcome in outcomes if not outcome["ok"]]
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "succeeded": runs - len(failures),
+        "failed": len(failures),
+        "failure_samples": sorted(set(failures))[:5],
+        "wall_seconds": round(wall, 3),
+        "throughput_per_sec": round(runs / wall, 2),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "latency_max_ms": round(max(latencies) * 1000, 1),
+        # ru_maxrss trên Linux tính bằng KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end scrape_and_sync với mock portal")
+    parser.add_argument("--runs", type=int, default=40, help="Tổng số lần scrape_and_sync")
+    parser.add_argument("--concurrency", type=int, default=8, help="Số lần sync chạy đồng thời")
+    parser.add_argument("--students", type=int, default=None, help="Số session khác nhau (mặc định = runs)")
+    parser.add_argument("--portal-url", help="Dùng mock portal đang chạy thay vì tự khởi động")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Độ trễ mỗi request của mock portal")
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=30, help="Độ trễ mỗi lệnh của DB in-memory")
+    parser.add_argument("--supabase", action="store_true", help="Ghi vào Supabase thật thay vì in-memory")
+    parser.add_argument("--archive", action="store_true", help="Bật lưu snapshot HTML như production")
+    parser.add_argument("--verbose", action="store_true", help="Hiện log của scraper")
+    parser.add_argument("--json", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+
+    portal = None
+    portal_url = args.portal_url
+    if not portal_url:
+        portal = start_mock_portal(args.port, args.latency_ms, args.jitter_ms)
+        portal_url = f"http://127.0.0.1:{args.port}"
+
+    workdir = tempfile.TemporaryDirectory(prefix="vku-bench-")
+    try:
+        # Cấu hình phải có trước khi import vku_scraper/scraper (đọc env lúc import)
+        os.environ["VKU_PORTAL_URL"] = portal_url
+        os.environ["SCRAPE_CACHE_TTL"] = "0"
+        os.environ["SYNC_CHECKPOINT_DIR"] = str(Path(workdir.name) / "checkpoints")
+        os.environ["SCRAPE_ARCHIVE_DIR"] = str(Path(workdir.name) / "archive")
+        os.environ["SCRAPE_ARCHIVE_ENABLED"] = "1" if args.archive else "0"
+        if not args.supabase:
+            install_memory_db(args.db_latency_ms)
+
+        sessions = create_sessions(portal_url, args.students or args.runs, Path(workdir.name))
+        print(f"🧪 {args.runs} lần sync, {args.concurrency} đồng thời, portal {portal_url} "
+              f"({'Supabase' if args.supabase else 'DB in-memory'})")
+
+        report = run_benchmark(sessions, args.runs, max(1, args.concurrency), args.verbose)
+        report["portal"] = httpx.get(f"{portal_url}/__mock/stats").json()
+
+        print(f"  - Thành công: {report['succeeded']}/{report['runs']}")
+        for message in report["failure_samples"]:
+            print(f"  - ❌ {message}")
+        print(f"  - Throughput: {report['throughput_per_sec']} sync/s ({report['wall_seconds']}s)")
+        print(f"  - Latency: p50 {report['latency_p50_ms']}ms, p95 {report['latency_p95_ms']}ms, "
+              f"max {report['latency_max_ms']}ms")
+        print(f"  - Peak RSS: {report['peak_rss_mb']} MB")
+
+        if args.json:
+            Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+            print(f"📝 Đã ghi {args.json}")
+    finally:
+        workdir.cleanup()
+        if portal is not None:
+            portal.terminate()
+            portal.wait()
@@ -0,0 +1,204 @@
+"""
+Bench Parsers - Kiểm tra hồi quy + benchmark các parser của vku_scraper trên HTML mẫu (offline)
+
+Fixture nằm trong fixtures/, đặt tên <page>__<case>.html với page là một trang trong
+PORTAL_PAGES (profile, diem, tien_do). Mỗi fixture có golden output tương ứng trong
+fixtures/golden/<page>__<case>.json = kết quả của mọi extractor dùng trang đó.
+HTML mẫu là dữ liệu giả (đã ẩn danh), giữ nguyên cấu trúc DOM của portal.
+
+Usage:
+    python bench_parsers.py                   # so golden rồi benchmark
+    python bench_parsers.py --check           # chỉ so golden (CI), exit 1 nếu lệch
+    python bench_parsers.py --update-golden   # ghi lại golden sau khi sửa parser có chủ đích
+    python bench_parsers.py --iterations 200 --json bench.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from vku_scraper import SNAPSHOT_EXTRACTORS, _BS4_PARSER, _make_soup
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+GOLDEN_DIR = FIXTURES_DIR / "golden"
+
+
+def load_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> List[Tuple[str, str, str]]:
+    """
+    Returns:
+        [(fixture_name, page_name, html), ...]
+    """
+    fixtures = []
+    for path in sorted(fixtures_dir.glob("*__*.html")):
+        page_name = path.stem.split("__", 1)[0]
+        fixtures.append((path.stem, page_name, path.read_text(encoding="utf-8")))
+    return fixtures
+
+
+def extractors_for(page_name: str) -> Dict[str, Callable[[Any], Any]]:
+    """Các extractor (section -> parser) đọc trang page_name"""
+    return {
+        section: parser
+        for section, (source_page, parser) in SNAPSHOT_EXTRACTORS.items()
+        if source_page == page_name
+    }
+
+
+def run_extractors(page_name: str, html: str) -> Dict[str, Any]:
+    soup = _make_soup(html)
+    return {section: parser(soup) for section, parser in extractors_for(page_name).items()}
+
+
+# ---------- Regression (golden) ----------
+
+def _normalize(value: Any) -> Any:
+    """Qua JSON một lượt để so sánh giống hệt nội dung file golden"""
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+def check_golden(fixtures: List[Tuple[str, str, str]], update: bool = False) -> List[str]:
+    """
+    So output hiện tại với golden (hoặc ghi lại golden nếu update=True)
+
+    Returns:
+        Danh sách lỗi (rỗng = khớp hết)
+    """
+    errors = []
+    GOLDEN_DIR.mkdir(parents=True, exist_ok=True)
+
+    for name, page_name, html in fixtures:
+        actual = _normalize(run_extractors(page_name, html))
+        golden_path = GOLDEN_DIR / f"{name}.json"
+
+        if update:
+            golden_path.write_text(json.dumps(actual, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            print(f"📝 Đã ghi golden: {golden_path.name}")
+            continue
+
+        if not golden_path.exists():
+            errors.append(f"{name}: thiếu golden ({golden_path.name}) - chạy --update-golden")
+            continue
+
+        expected = json.loads(golden_path.read_text(encoding="utf-8"))
+        for section in sorted(set(expected) | set(actual)):
+            if section not in actual or section not in expected:
+                errors.append(f"{name}/{section}: section chỉ có ở một phía")
+                continue
+            got, want = actual[section], expected[section]
+            if got == want:
+                continue
+            if isinstance(want, list) and isinstance(got, list):
+                if len(got) != len(want):
+                    errors.append(f"{name}/{section}: {len(got)} dòng, golden có {len(want)} dòng")
+                for index, (got_row, want_row) in enumerate(zip(got, want)):
+                    if got_row != want_row:
+                        errors.append(f"{name}/{section}[{index}]: {got_row} != {want_row}")
+                        break
+            else:
+                errors.append(f"{name}/{section}: {got} != {want}")
+
+    return errors
+
+
+# ---------- Benchmark ----------
+
+def _time_ms(fn: Callable[[], Any], iterations: int) -> Tuple[float, Any]:
+    """Median thời gian (ms) của fn qua N lần chạy, kèm kết quả lần cuối"""
+    samples = []
+    output = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        output = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), output
+
+
+def benchmark(fixtures: List[Tuple[str, str, str]], iterations: int) -> List[Dict[str, Any]]:
+    """
+    Đo cho mỗi fixture:
+    - parse_ms: HTML -> soup (làm một lần mỗi trang trong PortalSnapshot)
+    - mỗi extractor: thời gian trên soup có sẵn và số dòng/giây
+    - page_ms: tổng thời gian một trang (parse + mọi extractor), như trong extract_snapshot
+    """
+    report = []
+    for name, page_name, html in fixtures:
+        parse_ms, soup = _time_ms(lambda: _make_soup(html), iterations)
+        entry = {
+            "fixture": name,
+            "page": page_name,
+            "bytes": len(html.encode("utf-8")),
+            "parse_ms": round(parse_ms, 3),
+            "extractors": {},
+        }
+        for section, parser in extractors_for(page_name).items():
+            extract_ms, output = _time_ms(lambda: parser(soup), iterations)
+            rows = len(output) if isinstance(output, list) else int(bool(output))
+            entry["extractors"][section] = {
+                "rows": rows,
+                "ms": round(extract_ms, 3),
+                "rows_per_sec": round(rows / (extract_ms / 1000)) if extract_ms > 0 else None,
+            }
+        page_ms, _ = _time_ms(lambda: run_extractors(page_name, html), iterations)
+        entry["page_ms"] = round(page_ms, 3)
+        report.append(entry)
+    return report
+
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    print(f"\n⏱️ Benchmark parser (BeautifulSoup '{_BS4_PARSER}', median)")
+    print(f"{'fixture':<24}{'section':<14}{'rows':>6}{'ms':>10}{'rows/s':>12}")
+    print("-" * 66)
+    for entry in report:
+        print(f"{entry['fixture']:<24}{'(parse)':<14}{'':>6}{entry['parse_ms']:>10.3f}{'':>12}")
+        for section, stats in entry["extractors"].items():
+            rows_per_sec = stats["rows_per_sec"] if stats["rows_per_sec"] is not None else "-"
+            print(f"{'':<24}{section:<14}{stats['rows']:>6}{stats['ms']:>10.3f}{rows_per_sec:>12}")
+        print(f"{'':<24}{'= page':<14}{'':>6}{entry['page_ms']:>10.3f}{'':>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kiểm tra golden + benchmark parser của vku_scraper")
+    parser.add_argument("--check", action="store_true", help="Chỉ so golden, không benchmark")
+    parser.add_argument("--update-golden", action="store_true", help="Ghi lại golden từ parser hiện tại")
+    parser.add_argument("--iterations", type=int, default=50, help="Số lần chạy mỗi phép đo")
+    parser.add_argument("--max-page-ms", type=float, default=None,
+                        help="Báo lỗi nếu một trang (parse + extractor) chậm hơn N ms")
+    parser.add_argument("--json", help="Ghi kết quả benchmark ra file JSON")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"❌ Không có fixture nào trong {FIXTURES_DIR}")
+        sys.exit(1)
+
+    errors = check_golden(fixtures, update=args.update_golden)
+    if args.update_golden:
+        sys.exit(0)
+    if errors:
+        print(f"❌ {len(errors)} khác biệt so với golden:")
+        for error in errors:
+            print(f"  - {error}")
+        sys.exit(1)
+    print(f"✅ {len(fixtures)} fixture khớp golden")
+
+    if args.check:
+        sys.exit(0)
+
+    report = benchmark(fixtures, max(1, args.iterations))
+    print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"bs4_parser": _BS4_PARSER, "fixtures": report}, indent=2), encoding="utf-8")
+        print(f"\n📝 Đã ghi {args.json}")
+
+    if args.max_page_ms is not None:
+        slow = [entry for entry in report if entry["page_ms"] > args.max_page_ms]
+        for entry in slow:
+            print(f"❌ {entry['fixture']}: {entry['page_ms']:.1f}ms > {args.max_page_ms:.1f}ms")
+        sys.exit(1 if slow else 0)
@@ -0,0 +1,274 @@
+"""
+Browser Pool - Giữ sẵn các Chromium instance sống lâu cho scraper
+
+Playwright sync API gắn chặt với thread đã tạo ra nó, nên mỗi browser
+được sở hữu bởi một worker thread riêng. Các job (fn(browser)) được đẩy
+vào hàng đợi chung; worker nào rảnh sẽ nhận job, tạo context riêng cho
+user rồi đóng lại khi xong. Số worker = số context chạy đồng thời tối đa.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from playwright.sync_api import sync_playwright, Browser
+
+# psutil là optional - không có thì bỏ qua kiểm tra bộ nhớ
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_STOP = object()
+
+
+def _tree_memory_mb(process: Any) -> Optional[float]:
+    """RSS (MB) của một process và mọi process con, None nếu process đã chết"""
+    try:
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return round(total / (1024 * 1024), 1)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+class _BrowserWorker(threading.Thread):
+    """Worker thread sở hữu một Playwright driver + một Chromium"""
+
+    def __init__(self, pool: "BrowserPool", index: int):
+        super().__init__(name=f"browser-pool-{index}", daemon=True)
+        self.pool = pool
+        self.index = index
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        # Process Chromium chính của browser này (psutil.Process), None nếu không xác định được
+        self.browser_process = None
+        self.uses = 0
+        self.recycles = 0
+        self.busy = False
+
+    # ---------- Browser lifecycle ----------
+
+    def _launch(self) -> Browser:
+        # Launch lần lượt để Chromium mới xuất hiện giữa 2 lần chụp là của worker này
+        with self.pool._launch_lock:
+            before = self.pool._browser_pids()
+            if self.playwright is None:
+                self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(
+                headless=self.pool.headless,
+                args=self.pool.launch_args,
+            )
+            self.browser_process = self.pool._new_browser_process(before)
+        self.uses = 0
+        print(f"🌐 [{self.name}] Đã khởi động Chromium")
+        return self.browser
+
+    def _close_browser(self) -> None:
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception as e:
+                print(f"⚠️ [{self.name}] Lỗi khi đóng browser: {e}")
+            self.browser = None
+            self.browser_process = None
+
+    def _shutdown(self) -> None:
+        self._close_browser()
+        if self.playwright is not None:
+            try:
+                self.playwright.stop()
+            except Exception as e:
+                print(f"⚠️ [{self.name}] Lỗi khi dừng Playwright: {e}")
+            self.playwright = None
+
+    def _should_recycle(self) -> bool:
+        if self.browser is None:
+            return False
+        if not self.browser.is_connected():
+            return True
+        if self.pool.max_uses and self.uses >= self.pool.max_uses:
+            return True
+        if self.pool.max_memory_mb:
+            memory_mb = self.memory_mb()
+            return memory_mb is not None and memory_mb > self.pool.max_memory_mb
+        return False
+
+    def memory_mb(self) -> Optional[float]:
+        """RSS (MB) của Chromium của worker này (cả renderer/GPU process), None nếu không đo được"""
+        if psutil is None or self.browser_process is None:
+            return None
+        return _tree_memory_mb(self.browser_process)
+
+    def _recycle(self) -> None:
+        print(f"♻️ [{self.name}] Recycle Chromium sau {self.uses} lần dùng")
+        self._close_browser()
+        self.recycles += 1
+
+    # ---------- Main loop ----------
+
+    def run(self) -> None:
+        while True:
+            task = self.pool._tasks.get()
+            if task is _STOP:
+                break
+
+            fn, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            self.busy = True
+            try:
+                browser = self.browser if self.browser is not None else self._launch()
+                future.set_result(fn(browser))
+            except BaseException as e:
+                future.set_exception(e)
+                # Browser có thể đã crash - launch lại ở job sau
+                if self.browser is not None and not self.browser.is_connected():
+                    self._close_browser()
+            finally:
+                self.uses += 1
+                self.busy = False
+                if self._should_recycle():
+                    self._recycle()
+
+        self._shutdown()
+
+
+class BrowserPool:
+    """
+    Pool Chromium dùng chung cho các lần scrape
+
+    Usage:
+        pool = BrowserPool(size=2)
+        pool.start()
+        result = pool.run(lambda browser: scrape_in_browser(browser, session_file, result))
+        pool.stop()
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        headless: bool = True,
+        max_uses: int = 50,
+        max_memory_mb: Optional[int] = None,
+        task_timeout: float = 120.0,
+        launch_args: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            size: Số Chromium (cũng là số context chạy đồng thời tối đa)
+            headless: Chạy ẩn browser
+            max_uses: Recycle browser sau N lần dùng (0 = không giới hạn)
+            max_memory_mb: Recycle browser khi RSS của nó (cả process con) vượt ngưỡng (cần psutil)
+            task_timeout: Thời gian tối đa chờ một job (giây)
+        """
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.task_timeout = task_timeout
+        self.launch_args = launch_args or []
+        self.workers: List[_BrowserWorker] = []
+        self._tasks: "queue.Queue[Any]" = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        self._launch_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Khởi động các worker thread (Chromium chỉ được launch khi có job đầu tiên)"""
+        with self._lock:
+            if self._started:
+                return
+            self.workers = [_BrowserWorker(self, i) for i in range(self.size)]
+            for worker in self.workers:
+                worker.start()
+            self._started = True
+        print(f"🌐 Browser pool started ({self.size} browsers)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Đóng tất cả browser và dừng worker"""
+        with self._lock:
+            if not self._started:
+                return
+            for _ in self.workers:
+                self._tasks.put(_STOP)
+            for worker in self.workers:
+                worker.join(timeout=timeout)
+            self.workers = []
+            self._started = False
+        print("🌐 Browser pool stopped")
+
+    def submit(self, fn: Callable[[Browser], Any]) -> "Future[Any]":
+        """Đẩy job vào pool, trả về Future"""
+        if not self._started:
+            self.start()
+        future: "Future[Any]" = Future()
+        self._tasks.put((fn, future))
+        return future
+
+    def run(self, fn: Callable[[Browser], Any], timeout: Optional[float] = None) -> Any:
+        """Chạy fn(browser) trên một browser của pool và chờ kết quả"""
+        return self.submit(fn).result(timeout=timeout or self.task_timeout)
+
+    def _browser_pids(self) -> Set[int]:
+        """
+        PID các process Chromium chính do Playwright driver của process này launch
+
+        Driver (node) là process con trực tiếp của server, Chromium là con của driver.
+        Chromium của session_get.py (uv -> python -> driver) nằm sâu hơn nên không bị tính.
+        """
+        if psutil is None:
+            return set()
+        pids = set()
+        try:
+            for driver in psutil.Process().children():
+                try:
+                    for child in driver.children():
+                        if "chrom" in child.name().lower():
+                            pids.add(child.pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except Exception:
+            pass
+        return pids
+
+    def _new_browser_process(self, before: Set[int]) -> Any:
+        """Process Chromium vừa được launch (so với before), None nếu không xác định được"""
+        new_pids = self._browser_pids() - before
+        if len(new_pids) != 1:
+            return None
+        try:
+            return psutil.Process(new_pids.pop())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def browser_memory_mb(self) -> Optional[float]:
+        """Tổng RSS (MB) của các browser trong pool, None nếu không có psutil"""
+        if psutil is None:
+            return None
+        return round(sum(w.memory_mb() or 0 for w in self.workers), 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Trạng thái pool (dùng cho endpoint debug/monitoring)"""
+        return {
+            "size": self.size,
+            "queued": self._tasks.qsize(),
+            "busy": sum(1 for w in self.workers if w.busy),
+            "memory_mb": self.browser_memory_mb(),
+            "browsers": [
+                {
+                    "name": w.name,
+                    "launched": w.browser is not None,
+                    "uses": w.uses,
+                    "recycles": w.recycles,
+                    "memory_mb": w.memory_mb(),
+                }
+                for w in self.workers
+            ],
+        }
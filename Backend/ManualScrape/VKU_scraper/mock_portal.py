@@ -0,0 +1,205 @@
+"""
+Mock Portal - Server HTTP giả lập portal đào tạo VKU để benchmark/test scraper ở local
+
+- /sv/hoso, /sv/diem, /sv/hoc-phan-con-lai trả HTML từ fixtures/ (cùng cấu trúc DOM với portal),
+  thay mã SV/họ tên theo session để mỗi "sinh viên" có dữ liệu riêng
+- Auth bằng cookie laravel_session: thiếu/sai/hết hạn -> 302 về /login (giống portal thật)
+- Độ trễ mỗi request cấu hình được (latency + jitter)
+- /__mock/login?student_id=... cấp cookie mới, /__mock/stats trả số request đã phục vụ
+
+Chạy scraper với portal giả:
+    python mock_portal.py --port 8765 --latency-ms 150
+    VKU_PORTAL_URL=http://127.0.0.1:8765 python vku_scraper.py
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SESSION_COOKIE = "laravel_session"
+
+# Trang portal -> fixture dùng để render
+PAGE_FIXTURES = {
+    "/sv/hoso": "profile__basic.html",
+    "/sv/diem": "diem__full.html",
+    "/sv/hoc-phan-con-lai": "tien_do__full.html",
+}
+# Giá trị trong fixture được thay theo sinh viên của session
+FIXTURE_STUDENT_ID = "21IT000"
+FIXTURE_STUDENT_NAME = "Nguyễn Văn   An"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html lang="vi"><head><meta charset="utf-8"><title>Đăng nhập | Đào tạo VKU</title></head>
+<body><a class="btn btn-google" href="/auth/google">Đăng nhập bằng Google</a></body></html>
+"""
+
+
+class MockPortalState:
+    """Session đã cấp và thống kê request, dùng chung giữa các thread của server"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, session_ttl: float = 0):
+        """
+        Args:
+            latency_ms: Độ trễ cố định mỗi request
+            jitter_ms: Độ trễ ngẫu nhiên thêm vào (0..jitter_ms)
+            session_ttl: Session hết hạn sau N giây (0 = không hết hạn)
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.session_ttl = session_ttl
+        self.templates = {path: (FIXTURES_DIR / name).read_text(encoding="utf-8") for path, name in PAGE_FIXTURES.items()}
+        self._sessions: Dict[str, Tuple[str, float]] = {}
+        self._stats = {"pages": 0, "redirects": 0, "logins": 0, "other": 0}
+        self._lock = threading.Lock()
+
+    def delay(self) -> None:
+        latency = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def login(self, student_id: str) -> str:
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._sessions[token] = (student_id, time.time())
+            self._stats["logins"] += 1
+        return token
+
+    def student_for(self, token: Optional[str]) -> Optional[str]:
+        if not token:
+            return None
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            student_id, issued_at = entry
+            if self.session_ttl and time.time() - issued_at > self.session_ttl:
+                del self._sessions[token]
+                return None
+            return student_id
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "sessions": len(self._sessions)}
+
+    def render(self, path: str, student_id: str) -> str:
+        return (
+            self.templates[path]
+            .replace(FIXTURE_STUDENT_ID, student_id)
+            .replace(FIXTURE_STUDENT_NAME, f"Sinh Viên {student_id}")
+        )
+
+
+class MockPortalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, giống portal thật (httpx dùng lại connection)
+    server_version = "nginx"
+    state: MockPortalState = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: str = "", content_type: str = "text/html; charset=UTF-8",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _session_token(self) -> Optional[str]:
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                return value
+        return None
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        path = url.path.rstrip("/") or "/"
+
+        if path == "/__mock/login":
+            student_id = parse_qs(url.query).get("student_id", [FIXTURE_STUDENT_ID])[0]
+            token = self.state.login(student_id)
+            cookie = {"name": SESSION_COOKIE, "value": token, "path": "/"}
+            self._send(200, json.dumps({"cookie": cookie, "student_id": student_id}),
+                       content_type="application/json",
+                       headers={"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+            return
+
+        if path == "/__mock/stats":
+            self._send(200, json.dumps(self.state.stats()), content_type="application/json")
+            return
+
+        self.state.delay()
+
+        if path == "/login":
+            self.state.count("other")
+            self._send(200, LOGIN_PAGE)
+            return
+
+        if path == "/sv" or path in PAGE_FIXTURES:
+            student_id = self.state.student_for(self._session_token())
+            if student_id is None:
+                self.state.count("redirects")
+                self._send(302, headers={"Location": f"/login?redirect={path}"})
+                return
+            if path == "/sv":
+                self._send(302, headers={"Location": "/sv/hoso"})
+                return
+            self.state.count("pages")
+            self._send(200, self.state.render(path, student_id))
+            return
+
+        # CSS/JS/ảnh của layout: trả nội dung rỗng để browser không treo chờ
+        self.state.count("other")
+        self._send(200 if path.startswith(("/vendors/", "/build/", "/images/")) else 404, "",
+                   content_type="text/plain")
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    session_ttl: float = 0
+) -> ThreadingHTTPServer:
+    """Tạo server (chưa chạy) - gọi serve_forever() hoặc chạy trong thread riêng"""
+    state = MockPortalState(latency_ms=latency_ms, jitter_ms=jitter_ms, session_ttl=session_ttl)
+    handler = type("BoundMockPortalHandler", (MockPortalHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Portal VKU giả lập cho benchmark scraper")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Độ trễ mỗi request (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Độ trễ ngẫu nhiên thêm (ms)")
+    parser.add_argument("--session-ttl", type=float, default=0, help="Session hết hạn sau N giây (0 = không)")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency_ms, args.jitter_ms, args.session_ttl)
+    print(f"🧪 Mock portal: http://{args.host}:{server.server_port} "
+          f"(latency {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,112 @@
+"""
+Normalize - Chuẩn hóa dữ liệu đã scrape thành record sẵn sàng ghi vào Supabase
+
+Thay vì copy từng dict rồi chạy regex từng dòng, danh sách scrape được dựng thành
+DataFrame, ép kiểu theo cột (vectorized) với pattern biên dịch sẵn, lọc dòng
+không hợp lệ trong một lượt, rồi xuất ra list record slots (records.py: GradeRecord,
+ProgressRecord) với kiểu Python thuần (None thay cho NaN/NA). Repository đổi record
+sang dict ngay lúc bulk insert.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import pandas as pd
+
+from records import GradeRecord, ProgressRecord
+
+_NUMBER_PATTERN = re.compile(r"(\d+)")
+
+# Thứ tự cột = thứ tự field của GradeRecord/ProgressRecord (record dựng theo vị trí)
+GRADE_COLUMNS = ("TenHocPhan", "SoTC", "DiemT10", "HocKy")
+TIEN_DO_COLUMNS = ("TenHocPhan", "HocKy", "BatBuoc", "SoTC", "DiemT4", "DiemChu")
+
+Records = List[Dict[str, Any]]
+
+
+def _extract_int(series: pd.Series) -> pd.Series:
+    """Lấy số nguyên đầu tiên trong mỗi ô ("Học kỳ 3" -> 3, 4 -> 4), không có số -> NA"""
+    digits = series.astype("string").str.extract(_NUMBER_PATTERN, expand=False)
+    return pd.to_numeric(digits, errors="coerce").astype("Int64")
+
+
+def _clean_text(series: pd.Series) -> pd.Series:
+    """Strip khoảng trắng, chuỗi rỗng -> NA"""
+    text = series.astype("string").str.strip()
+    return text.mask(text == "")
+
+
+def _to_records(df: pd.DataFrame, columns: Sequence[str], record_type: Type) -> List[Any]:
+    """DataFrame -> list record với int/float/str/None thuần Python (JSON-serializable)"""
+    values = [
+        df[column].astype(object).where(df[column].notna(), None).tolist()
+        for column in columns
+    ]
+    return [record_type(*row) for row in zip(*values)]
+
+
+def _add_owner(df: pd.DataFrame, columns: List[str], student_id: str, user_id: Optional[str]) -> None:
+    df["StudentID"] = student_id
+    columns.append("StudentID")
+    if user_id:
+        df["user_id"] = user_id
+        columns.append("user_id")
+
+
+def normalize_grades(
+    grades: Records,
+    student_id: str,
+    user_id: Optional[str] = None
+) -> Tuple[List[GradeRecord], int]:
+    """
+    Chuẩn hóa danh sách điểm (parse_student_grades) cho bảng Diem
+
+    Returns:
+        (records, số dòng bị loại vì thiếu TenHocPhan/HocKy)
+    """
+    if not grades:
+        return [], 0
+
+    df = pd.DataFrame.from_records(grades, columns=GRADE_COLUMNS)
+    df["TenHocPhan"] = _clean_text(df["TenHocPhan"])
+    df["HocKy"] = _clean_text(df["HocKy"])
+    df["SoTC"] = _extract_int(df["SoTC"]).fillna(0)
+    df["DiemT10"] = pd.to_numeric(df["DiemT10"], errors="coerce")
+
+    valid = df["TenHocPhan"].notna() & df["HocKy"].notna()
+    df = df[valid].copy()
+
+    columns = list(GRADE_COLUMNS)
+    _add_owner(df, columns, student_id, user_id)
+    return _to_records(df, columns, GradeRecord), int((~valid).sum())
+
+
+def normalize_tien_do(
+    tien_do: Records,
+    student_id: str,
+    user_id: Optional[str] = None
+) -> Tuple[List[ProgressRecord], int]:
+    """
+    Chuẩn hóa tiến độ học tập (parse_tien_do_hoc_tap) cho bảng TienDoHocTap
+
+    Returns:
+        (records, số dòng bị loại vì thiếu TenHocPhan/HocKy)
+    """
+    if not tien_do:
+        return [], 0
+
+    df = pd.DataFrame.from_records(tien_do, columns=TIEN_DO_COLUMNS)
+    df["TenHocPhan"] = _clean_text(df["TenHocPhan"])
+    df["HocKy"] = _extract_int(df["HocKy"])
+    df["SoTC"] = _extract_int(df["SoTC"]).fillna(0)
+    df["BatBuoc"] = pd.to_numeric(df["BatBuoc"], errors="coerce").fillna(0).astype(bool)
+    df["DiemT4"] = _extract_int(df["DiemT4"])
+    df["DiemChu"] = _clean_text(df["DiemChu"])
+
+    # HocKy = 0 cũng bị loại (giống check "not HocKy" trước đây)
+    valid = df["TenHocPhan"].notna() & df["HocKy"].fillna(0).gt(0)
+    df = df[valid].copy()
+
+    columns = list(TIEN_DO_COLUMNS)
+    _add_owner(df, columns, student_id, user_id)
+    return _to_records(df, columns, ProgressRecord), int((~valid).sum())
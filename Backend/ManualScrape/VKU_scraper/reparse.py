@@ -0,0 +1,122 @@
+"""
+Reparse - Dựng lại dữ liệu Diem và TienDoHocTap từ snapshot HTML đã archive
+
+Dùng sau khi sửa bug parser trong vku_scraper.py: parse lại HTML đã lưu bằng parser
+hiện tại (song song, nhiều process), không cần mạng hay Chromium, rồi ghi lại vào Supabase.
+
+Usage:
+    python reparse.py                       # snapshot mới nhất của mọi user
+    python reparse.py --user <user_id>      # chỉ một user
+    python reparse.py --dry-run             # chỉ parse và in số dòng, không ghi DB
+    python reparse.py --workers 4
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from snapshot_archive import SnapshotArchive, snapshot_archive
+from vku_scraper import PortalSnapshot, extract_snapshot, validate_student_info, validate_grades
+
+
+def parse_snapshot_file(path: str) -> Dict[str, Any]:
+    """
+    Parse một file snapshot bằng parser hiện tại (chạy trong process con)
+
+    Returns:
+        {"path": ..., "user_id": ..., "student_id": ..., "student_info": {...},
+         "grades": [...], "tien_do": [...], "captured_at": ...}
+    """
+    record = SnapshotArchive.load(Path(path))
+    extracted = extract_snapshot(PortalSnapshot(record["pages"], record.get("source", "archive")))
+    return {
+        "path": path,
+        "user_id": record.get("user_id"),
+        "student_id": extracted["student_info"].get("StudentID") or record.get("student_id"),
+        "captured_at": record.get("captured_at"),
+        **extracted,
+    }
+
+
+def write_parsed(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Ghi lại Diem + TienDoHocTap của một sinh viên và cập nhật fingerprint"""
+    # Import muộn: chỉ cần Supabase khi thật sự ghi (dry-run chạy được không cần .env)
+    from scraper import VKUScraperManager, compute_fingerprint
+    from Supabase import sync_fingerprint_repo
+
+    manager = VKUScraperManager(user_id=parsed["user_id"])
+    student_id = parsed["student_id"]
+    grades_result = manager._insert_grades(student_id, parsed["grades"])
+    tien_do_result = manager._insert_tien_do_hoc_tap(student_id, parsed["tien_do"])
+
+    fingerprints = {}
+    if not grades_result["failed"]:
+        fingerprints["grades"] = compute_fingerprint(parsed["grades"])
+    if not tien_do_result["failed"]:
+        fingerprints["tien_do"] = compute_fingerprint(parsed["tien_do"])
+    if fingerprints:
+        sync_fingerprint_repo.save_fingerprints(student_id, fingerprints, parsed["user_id"])
+
+    return {"grades": grades_result, "tien_do": tien_do_result}
+
+
+def reparse_archive(
+    archive: SnapshotArchive,
+    user_keys: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Parse lại snapshot mới nhất của từng user (song song) và ghi lại vào DB
+
+    Returns:
+        Danh sách report cho từng user
+    """
+    keys = user_keys or archive.user_keys()
+    paths = [str(path) for path in (archive.latest(key) for key in keys) if path]
+    if not paths:
+        print("⚠️ Không có snapshot nào trong archive")
+        return []
+
+    print(f"🔁 Parse lại {len(paths)} snapshot...")
+    reports = []
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Kết quả về theo thứ tự: vừa parse các snapshot sau vừa ghi snapshot trước
+        for parsed in executor.map(parse_snapshot_file, paths):
+            report = {
+                "path": parsed["path"],
+                "student_id": parsed["student_id"],
+                "grades": len(parsed["grades"]),
+                "tien_do": len(parsed["tien_do"]),
+            }
+            if not validate_student_info(parsed["student_info"]) or not validate_grades(parsed["grades"]):
+                report["status"] = "invalid"
+            elif dry_run:
+                report["status"] = "parsed"
+            else:
+                report["written"] = write_parsed(parsed)
+                report["status"] = "written"
+            print(f"  - {report['student_id']}: {report['grades']} điểm, "
+                  f"{report['tien_do']} tiến độ ({report['status']})")
+            reports.append(report)
+
+    print(f"✅ Xong {len(reports)} snapshot trong {time.perf_counter() - started:.2f}s")
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse lại snapshot HTML đã archive và ghi lại Diem/TienDoHocTap")
+    parser.add_argument("--user", action="append", help="user_id (lặp lại để chọn nhiều user)")
+    parser.add_argument("--workers", type=int, default=None, help="Số process parse song song")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ parse, không ghi DB")
+    args = parser.parse_args()
+
+    user_keys = [SnapshotArchive.user_dir_name(user) for user in args.user] if args.user else None
+    reparse_archive(snapshot_archive, user_keys=user_keys, workers=args.workers, dry_run=args.dry_run)
@@ -0,0 +1,194 @@
+"""
+Route Policy - Chặn tài nguyên không cần thiết khi scrape bằng Playwright
+
+Scraper chỉ đọc text trong bảng, nên ảnh, font, CSS và script của bên thứ ba
+chỉ tốn băng thông và làm chậm việc tải trang. Policy được gắn vào
+BrowserContext qua context.route() và đếm số request bị chặn cho mỗi lần scrape.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext, Route
+from playwright.async_api import BrowserContext as AsyncBrowserContext, Route as AsyncRoute
+
+from vku_http import PORTAL_BASE_URL
+
+PORTAL_HOST = urlparse(PORTAL_BASE_URL).hostname or ""
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "font", "stylesheet", "media")
+
+DEFAULT_BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+    "hotjar.com",
+)
+
+# Kích thước trung bình (bytes) dùng để ước lượng băng thông tiết kiệm được -
+# request bị abort thì không có response nên không biết kích thước thật
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 40_000,
+    "font": 60_000,
+    "stylesheet": 30_000,
+    "media": 200_000,
+    "script": 50_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+def _split_env(name: str) -> Optional[list]:
+    value = os.environ.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class RoutePolicy:
+    """Cấu hình chặn request cho scraper context"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        blocked_resource_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        blocked_hosts: Iterable[str] = DEFAULT_BLOCKED_HOSTS,
+        block_third_party: bool = True,
+        allowed_hosts: Iterable[str] = (PORTAL_HOST,)
+    ):
+        """
+        Args:
+            enabled: Tắt hẳn policy nếu False
+            blocked_resource_types: Loại resource (theo Playwright) luôn bị chặn
+            blocked_hosts: Host (và subdomain) luôn bị chặn
+            block_third_party: Chặn mọi sub-resource không thuộc allowed_hosts
+            allowed_hosts: Host của portal, không bao giờ bị chặn theo rule third-party
+        """
+        self.enabled = enabled
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.blocked_hosts = tuple(blocked_hosts)
+        self.block_third_party = block_third_party
+        self.allowed_hosts = tuple(allowed_hosts)
+
+    @classmethod
+    def from_env(cls) -> "RoutePolicy":
+        """
+        Đọc cấu hình từ biến môi trường:
+            SCRAPER_BLOCK_REQUESTS=0            -> tắt policy
+            SCRAPER_BLOCK_RESOURCE_TYPES=image,font,stylesheet,media
+            SCRAPER_BLOCK_HOSTS=google-analytics.com,...
+            SCRAPER_BLOCK_THIRD_PARTY=1
+        """
+        resource_types = _split_env("SCRAPER_BLOCK_RESOURCE_TYPES")
+        hosts = _split_env("SCRAPER_BLOCK_HOSTS")
+        return cls(
+            enabled=os.environ.get("SCRAPER_BLOCK_REQUESTS", "1") != "0",
+            blocked_resource_types=resource_types if resource_types is not None else DEFAULT_BLOCKED_RESOURCE_TYPES,
+            blocked_hosts=hosts if hosts is not None else DEFAULT_BLOCKED_HOSTS,
+            block_third_party=os.environ.get("SCRAPER_BLOCK_THIRD_PARTY", "1") != "0",
+        )
+
+    @staticmethod
+    def _host_matches(host: str, patterns: Iterable[str]) -> bool:
+        return any(host == p or host.endswith("." + p) for p in patterns)
+
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """Trả về lý do chặn (resource type / host), None nếu cho qua"""
+        if not self.enabled or resource_type == "document":
+            # Không bao giờ chặn document - navigation (kể cả redirect đăng nhập) phải chạy được
+            return None
+
+        if resource_type in self.blocked_resource_types:
+            return resource_type
+
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return None
+        if self._host_matches(host, self.blocked_hosts):
+            return "tracker"
+        if self.block_third_party and not self._host_matches(host, self.allowed_hosts):
+            return "third_party"
+        return None
+
+
+class RouteStats:
+    """Bộ đếm request bị chặn trong một lần scrape"""
+
+    def __init__(self):
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.estimated_bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def record_blocked(self, reason: str, resource_type: str) -> None:
+        with self._lock:
+            self.blocked += 1
+            self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+            self.estimated_bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    def record_allowed(self) -> None:
+        with self._lock:
+            self.allowed += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed_requests": self.allowed,
+            "blocked_requests": self.blocked,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+        }
+
+
+def apply_route_policy(context: BrowserContext, policy: Optional[RoutePolicy] = None) -> RouteStats:
+    """
+    Gắn policy vào context, trả về RouteStats được cập nhật trong lúc scrape
+    """
+    policy = policy or RoutePolicy.from_env()
+    stats = RouteStats()
+
+    if not policy.enabled:
+        return stats
+
+    def _handle(route: Route) -> None:
+        request = route.request
+        reason = policy.block_reason(request.resource_type, request.url)
+        if reason:
+            stats.record_blocked(reason, request.resource_type)
+            route.abort()
+        else:
+            stats.record_allowed()
+            route.continue_()
+
+    context.route("**/*", _handle)
+    return stats
+
+
+async def apply_route_policy_async(
+    context: AsyncBrowserContext,
+    policy: Optional[RoutePolicy] = None
+) -> RouteStats:
+    """Bản async của apply_route_policy (cho vku_scraper_async.py)"""
+    policy = policy or RoutePolicy.from_env()
+    stats = RouteStats()
+
+    if not policy.enabled:
+        return stats
+
+    async def _handle(route: AsyncRoute) -> None:
+        request = route.request
+        reason = policy.block_reason(request.resource_type, request.url)
+        if reason:
+            stats.record_blocked(reason, request.resource_type)
+            await route.abort()
+        else:
+            stats.record_allowed()
+            await route.continue_()
+
+    await context.route("**/*", _handle)
+    return stats
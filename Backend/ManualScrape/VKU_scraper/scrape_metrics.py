@@ -0,0 +1,145 @@
+"""
+Scrape Metrics - Thời gian từng bước của scrape_and_sync, giữ trong một cửa sổ trượt in-memory
+
+Mỗi lần sync ghi lại thời gian (ms) của từng bước: tải từng trang, launch/acquire browser,
+extract, validate, ghi từng bảng... ScrapeMetrics giữ N giá trị gần nhất của mỗi bước
+để tính p50/p95, cộng danh sách các lần sync gần đây (kèm path trace nếu chạy chậm).
+
+summary() mặc định bỏ user và path trace khỏi các lần sync gần đây: trace Playwright
+chứa cookie session + HTML portal, chỉ xem trên server, không trả qua HTTP.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+class StepTimer:
+    """
+    Thu thời gian các bước của MỘT lần sync
+
+    Usage:
+        timer = StepTimer()
+        with timer.step("validate"):
+            ...
+        timer.add("page.diem", 0.42)   # giây, VD: lấy từ scraped_data["timings"]
+    """
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+        self.trace: Optional[str] = None   # Path Playwright trace của lần sync này (nếu có)
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: Optional[float]) -> None:
+        if seconds is not None:
+            self.steps[name] = round(seconds * 1000, 1)
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 1)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    index = max(0, math.ceil(len(ordered) * pct / 100) - 1)
+    return ordered[index]
+
+
+class ScrapeMetrics:
+    """Cửa sổ trượt thời gian từng bước của các lần sync gần nhất (dùng chung cả process)"""
+
+    def __init__(self, window: int = 500, recent_runs: int = 20):
+        """
+        Args:
+            window: Số giá trị gần nhất giữ lại cho mỗi bước
+            recent_runs: Số lần sync gần nhất giữ lại đầy đủ (để xem lần nào chậm ở bước nào)
+        """
+        self.window = window
+        self._steps: Dict[str, Deque[float]] = {}
+        self._runs: Deque[Dict[str, Any]] = deque(maxlen=recent_runs)
+        self._total_runs = 0
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        timer: StepTimer,
+        success: bool,
+        source: Optional[str] = None,
+        user_key: Optional[str] = None,
+        trace: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Ghi một lần sync (gồm bước "total"), trả về bản ghi của lần đó"""
+        steps = {**timer.steps, "total": timer.elapsed_ms()}
+        run = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "user": user_key,
+            "success": success,
+            "source": source,
+            "steps": steps,
+            "trace": trace,
+        }
+        with self._lock:
+            for name, value in steps.items():
+                self._steps.setdefault(name, deque(maxlen=self.window)).append(value)
+            self._runs.append(run)
+            self._total_runs += 1
+        return run
+
+    def summary(self, include_private: bool = False) -> Dict[str, Any]:
+        """
+        Args:
+            include_private: Giữ "user" và "trace" trong các lần sync gần đây (chỉ dùng trong process,
+                không trả qua API)
+
+        Returns:
+            {
+                "runs": 123,            # tổng số lần sync từ lúc process chạy
+                "window": 500,
+                "steps": {"page.diem": {"count": 100, "p50_ms": 410.0, "p95_ms": 980.5, "max_ms": 1500.2, "last_ms": 380.1}, ...},
+                "recent": [{...}, ...]  # mới nhất trước, "traced": có trace hay không
+            }
+        """
+        with self._lock:
+            snapshot = {name: list(values) for name, values in self._steps.items()}
+            recent = list(reversed(self._runs))
+            total_runs = self._total_runs
+
+        if not include_private:
+            recent = [
+                {**{key: value for key, value in run.items() if key not in ("user", "trace")},
+                 "traced": run["trace"] is not None}
+                for run in recent
+            ]
+
+        steps = {}
+        for name, values in sorted(snapshot.items()):
+            ordered = sorted(values)
+            steps[name] = {
+                "count": len(values),
+                "p50_ms": _percentile(ordered, 50),
+                "p95_ms": _percentile(ordered, 95),
+                "max_ms": ordered[-1],
+                "last_ms": values[-1],
+            }
+        return {"runs": total_runs, "window": self.window, "steps": steps, "recent": recent}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._steps.clear()
+            self._runs.clear()
+            self._total_runs = 0
+
+
+# Metrics dùng chung cho cả process
+scrape_metrics = ScrapeMetrics(window=int(os.environ.get("SCRAPE_METRICS_WINDOW", "500")))
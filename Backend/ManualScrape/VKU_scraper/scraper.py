@@ -2,9 +2,16 @@
 VKU Scraper Manager - Quản lý scrape + insert Supabase
 """
 
+import os
 import sys
+import copy
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Union
 
 # Add paths
 backend_path = Path(__file__).parent.parent.parent
@@ -17,7 +24,97 @@ from vku_scraper import (
     validate_student_info,
     validate_grades
 )
-from Supabase import sinh_vien_repo, diem_repo, tien_do_hoc_tap_repo
+from vku_scraper_async import scrape_vku_data_async, AsyncBrowserPool
+from browser_pool import BrowserPool
+from normalize import normalize_grades, normalize_tien_do
+from snapshot_archive import snapshot_archive
+from sync_checkpoint import sync_checkpoints, TABLE_DONE, TABLE_SKIPPED, TABLE_FAILED
+from scrape_metrics import StepTimer, scrape_metrics
+from Supabase import sinh_vien_repo, diem_repo, tien_do_hoc_tap_repo, sync_fingerprint_repo
+
+# Các section được hash để phát hiện thay đổi giữa các lần sync
+SYNC_SECTIONS = ("student_info", "grades", "tien_do", "summary")
+
+# Các section được ghi vào bảng riêng (bước 3-5), theo thứ tự ghi
+WRITE_SECTIONS = ("student_info", "grades", "tien_do")
+
+# Key trong scraped_data["timings"] -> tên bước trong scrape_metrics (các trang còn lại: "page.<tên>")
+SCRAPE_TIMING_STEPS = {
+    "total": "page.all",
+    "extract": "extract",
+    "launch": "browser.launch",
+    "acquire": "browser.acquire",
+}
+
+
+def compute_fingerprint(section_data: Any) -> str:
+    """
+    Hash nội dung một section (không phụ thuộc thứ tự dòng / thứ tự key)
+    """
+    if isinstance(section_data, list):
+        canonical = sorted(
+            json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+            for item in section_data
+        )
+    else:
+        canonical = section_data
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScrapeResultCache:
+    """
+    Cache kết quả scrape_vku_data gần nhất của mỗi user trong một khoảng thời gian (TTL)
+    Dùng chung giữa các VKUScraperManager để bấm "sync" liên tục không scrape lại portal
+    """
+    
+    def __init__(self, ttl: float = 300):
+        """
+        Args:
+            ttl: Thời gian (giây) kết quả còn được coi là mới, 0 = tắt cache
+        """
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """
+        Returns:
+            (scraped_data, age_seconds) nếu còn mới, None nếu không có/đã hết hạn
+        """
+        if not key or self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            age = time.time() - stored_at
+            if age > self.ttl:
+                del self._entries[key]
+                return None
+        # Trả bản sao để bước ghi DB không sửa vào dữ liệu trong cache
+        return copy.deepcopy(data), age
+    
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        if not key or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), copy.deepcopy(data))
+    
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# Cache dùng chung cho cả process
+scrape_result_cache = ScrapeResultCache(ttl=float(os.environ.get("SCRAPE_CACHE_TTL", "300")))
+
+# Executor dùng chung cho bước ghi DB song song (giới hạn số request Supabase đồng thời của cả process)
+_write_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("SYNC_WRITE_WORKERS", "4")),
+    thread_name_prefix="sync-write"
+)
 
 
 class VKUScraperManager:
@@ -25,22 +122,104 @@ class VKUScraperManager:
     Manager class để scrape dữ liệu VKU và lưu vào Supabase
     """
     
-    def __init__(self, session_path: str = None, headless: bool = True, user_id: str = None):
+    def __init__(
+        self,
+        session_path: str = None,
+        headless: bool = True,
+        user_id: str = None,
+        browser_pool: Optional[Union[BrowserPool, AsyncBrowserPool]] = None,
+        progress_callback: Optional[Callable[[int, str], None]] = None
+    ):
         """
         Args:
             session_path: Đường dẫn đến file session.json (nếu có thì sử dụng, nếu không thì đăng nhập mới)
             headless: Có ẩn browser không (default True)
             user_id: UUID của user (từ Supabase Auth) - để link data với user
+            browser_pool: BrowserPool / AsyncBrowserPool dùng chung (nếu có) - tránh launch Chromium mới mỗi lần scrape
+            progress_callback: Hàm (step, message) được gọi khi bắt đầu mỗi bước (VD: ScrapeJob.report)
         """
         self.session_path = session_path
         self.headless = headless
         self.user_id = user_id
+        self.browser_pool = browser_pool
+        self.progress_callback = progress_callback
         self.last_scraped_data = None
     
-    def scrape_and_sync(self) -> Dict[str, Any]:
+    def _start_step(self, step: int, title: str) -> None:
+        """In tiêu đề bước và báo tiến độ cho progress_callback (nếu có)"""
+        print("\n" + "=" * 60)
+        print(title)
+        print("=" * 60)
+        
+        if self.progress_callback:
+            try:
+                self.progress_callback(step, title)
+            except Exception as e:
+                print(f"⚠️ Lỗi progress callback: {e}")
+    
+    def _cache_key(self) -> Optional[str]:
+        return self.user_id or self.session_path
+    
+    def _scrape(self, force: bool, result: Dict[str, Any], timer: StepTimer) -> Dict[str, Any]:
+        """Lấy dữ liệu từ cache (nếu còn mới và không force) hoặc scrape portal"""
+        cache_key = self._cache_key()
+        if not force:
+            cached = scrape_result_cache.get(cache_key)
+            if cached is not None:
+                scraped_data, age = cached
+                print(f"♻️ Dùng kết quả scrape trong cache ({age:.0f}s trước)")
+                result["data"]["from_cache"] = True
+                result["data"]["cache_age"] = round(age, 1)
+                result["data"]["source"] = "cache"
+                return scraped_data
+        
+        if isinstance(self.browser_pool, AsyncBrowserPool):
+            # Scrape chạy trên event loop của server, thread này chỉ chờ kết quả
+            scraped_data = self.browser_pool.run_threadsafe(scrape_vku_data_async(
+                headless=self.headless,
+                session_file=self.session_path,
+                browser_pool=self.browser_pool
+            ))
+        else:
+            scraped_data = scrape_vku_data(
+                headless=self.headless,
+                session_file=self.session_path,
+                browser_pool=self.browser_pool
+            )
+        # HTML thô chỉ dùng để archive, trace chỉ thuộc về lần scrape này - không giữ trong cache/kết quả.
+        # Path trace (chứa cookie session) chỉ vào scrape_metrics, API chỉ biết có trace hay không
+        pages = scraped_data.pop("pages", None)
+        timer.trace = scraped_data.pop("trace", None)
+        result["data"]["traced"] = timer.trace is not None
+        result["data"]["source"] = scraped_data.get("source")
+        if scraped_data.get("success"):
+            self._archive_pages(pages, scraped_data)
+            scrape_result_cache.put(cache_key, scraped_data)
+        return scraped_data
+    
+    def _archive_pages(self, pages: Optional[Dict[str, str]], scraped_data: Dict[str, Any]) -> None:
+        """Lưu HTML thô vào snapshot archive (lỗi archive không làm hỏng lần sync)"""
+        try:
+            path = snapshot_archive.save(
+                self._cache_key() or "anonymous",
+                pages,
+                source=scraped_data.get("source") or "unknown",
+                student_id=scraped_data.get("student_info", {}).get("StudentID"),
+                user_id=self.user_id
+            )
+            if path:
+                print(f"🗄️ Đã lưu snapshot HTML: {path.name}")
+        except Exception as e:
+            print(f"⚠️ Lỗi khi lưu snapshot HTML: {e}")
+    
+    def scrape_and_sync(self, force: bool = False, resume: bool = False) -> Dict[str, Any]:
         """
         Scrape dữ liệu từ VKU và đồng bộ vào Supabase
         
+        Args:
+            force: Bỏ qua cache, luôn scrape lại portal
+            resume: Lần sync trước lỗi giữa chừng (data.resumable) - ghi tiếp từ checkpoint thay vì scrape lại
+        
         Returns:
             {
                 "success": True/False,
@@ -50,7 +229,18 @@ class VKUScraperManager:
                     "grades_inserted": 0,
                     "grades_failed": 0,
                     "tien_do_inserted": 0,
-                    "tien_do_failed": 0
+                    "tien_do_failed": 0,
+                    "changed_sections": ["grades", ...],
+                    "unchanged_sections": ["student_info", ...],
+                    "from_cache": False,
+                    "cache_age": None,
+                    "write_timings": {"student_info": 0.1, "grades": 0.4, "tien_do": 0.3, "grades+tien_do": 0.4},
+                    "step_timings": {"scrape": 950.2, "page.diem": 610.0, "extract": 48.1, "validate": 80.3,
+                                     "write.grades": 400.5, "total": 1620.7},   # ms
+                    "source": "http" | "browser" | "cache" | "checkpoint",
+                    "traced": False,       # Có lưu Playwright trace vì tải chậm (SCRAPE_TRACE_SLOW_MS)
+                    "resumed": False,      # Tiếp tục từ checkpoint, không scrape lại
+                    "resumable": False     # Có bước ghi lỗi - gọi lại với resume=True để tiếp tục từ bước đó
                 }
             }
         """
@@ -62,26 +252,61 @@ class VKUScraperManager:
                 "grades_inserted": 0,
                 "grades_failed": 0,
                 "tien_do_inserted": 0,
-                "tien_do_failed": 0
+                "tien_do_failed": 0,
+                "changed_sections": [],
+                "unchanged_sections": [],
+                "from_cache": False,
+                "cache_age": None,
+                "write_timings": {},
+                "step_timings": {},
+                "source": None,
+                "traced": False,
+                "resumed": False,
+                "resumable": False
             },
             "error": None
         }
         
+        timer = StepTimer()
         try:
-            # Step 1: Scrape dữ liệu
-            print("\n" + "=" * 60)
-            print("📡 BƯỚC 1: Scrape dữ liệu từ VKU")
-            print("=" * 60)
-            
-            scraped_data = scrape_vku_data(
-                headless=self.headless,
-                session_file=self.session_path
-            )
-            
-            if not scraped_data.get("success"):
-                result["message"] = "❌ Lỗi khi scrape dữ liệu"
-                result["error"] = scraped_data.get("error")
-                return result
+            return self._sync(force, resume, result, timer)
+        finally:
+            self._record_metrics(timer, result)
+    
+    def _sync(self, force: bool, resume: bool, result: Dict[str, Any], timer: StepTimer) -> Dict[str, Any]:
+        """Các bước của scrape_and_sync, timer ghi thời gian từng bước"""
+        cache_key = self._cache_key()
+        
+        try:
+            # Step 1: Scrape dữ liệu (hoặc tiếp tục từ checkpoint của lần sync lỗi trước)
+            self._start_step(1, "📡 BƯỚC 1: Scrape dữ liệu từ VKU")
+            
+            checkpoint = sync_checkpoints.resume(cache_key) if resume and not force else None
+            if checkpoint:
+                pending = [
+                    section for section in WRITE_SECTIONS
+                    if checkpoint["tables"].get(section, {}).get("status") not in (TABLE_DONE, TABLE_SKIPPED)
+                ]
+                print(f"🔁 Tiếp tục lần sync dang dở (scrape lúc {checkpoint['created_at']}, "
+                      f"lần resume {checkpoint['resume_attempts']}) - còn: {', '.join(pending)}")
+                result["data"]["resumed"] = True
+                result["data"]["source"] = "checkpoint"
+                scraped_data = checkpoint["scraped"]
+            else:
+                sync_checkpoints.clear(cache_key)
+                with timer.step("scrape"):
+                    scraped_data = self._scrape(force, result, timer)
+                if not result["data"]["from_cache"]:
+                    for name, seconds in scraped_data.get("timings", {}).items():
+                        timer.add(SCRAPE_TIMING_STEPS.get(name, f"page.{name}"), seconds)
+                
+                if not scraped_data.get("success"):
+                    result["message"] = "❌ Lỗi khi scrape dữ liệu"
+                    result["error"] = scraped_data.get("error")
+                    return result
+                
+                checkpoint = {"scraped": scraped_data, "validated": None, "tables": {}}
+                sync_checkpoints.save(cache_key, checkpoint)
             
             self.last_scraped_data = scraped_data
             
@@ -90,48 +315,78 @@ class VKUScraperManager:
             tien_do = scraped_data.get("tien_do", [])
             
             # Step 2: Validate dữ liệu
-            print("\n" + "=" * 60)
-            print("✓ BƯỚC 2: Kiểm tra dữ liệu")
-            print("=" * 60)
-            
-            if not validate_student_info(student_info):
-                result["message"] = "❌ Thông tin sinh viên không hợp lệ"
-                return result
-            
-            if not validate_grades(grades):
-                result["message"] = "❌ Dữ liệu điểm không hợp lệ"
-                return result
-            
-            # Step 3: Insert sinh viên
-            print("\n" + "=" * 60)
-            print("💾 BƯỚC 3: Lưu thông tin sinh viên")
-            print("=" * 60)
-            
-            student_result = self._insert_student(student_info)
-            if not student_result:
+            self._start_step(2, "✓ BƯỚC 2: Kiểm tra dữ liệu")
+            
+            if checkpoint["validated"] is None:
+                with timer.step("validate"):
+                    if not validate_student_info(student_info):
+                        sync_checkpoints.clear(cache_key)
+                        result["message"] = "❌ Thông tin sinh viên không hợp lệ"
+                        return result
+                    
+                    if not validate_grades(grades):
+                        sync_checkpoints.clear(cache_key)
+                        result["message"] = "❌ Dữ liệu điểm không hợp lệ"
+                        return result
+                    
+                    # So sánh fingerprint với lần sync trước - section nào không đổi thì bỏ qua ghi DB
+                    student_id = student_info.get("StudentID")
+                    fingerprints = {section: compute_fingerprint(scraped_data.get(section, [])) for section in SYNC_SECTIONS}
+                    checkpoint["validated"] = {
+                        "student_id": student_id,
+                        "fingerprints": fingerprints,
+                        "changed": sorted(self._detect_changed_sections(student_id, fingerprints)),
+                    }
+                    sync_checkpoints.save(cache_key, checkpoint)
+            
+            student_id = checkpoint["validated"]["student_id"]
+            fingerprints = checkpoint["validated"]["fingerprints"]
+            changed = set(checkpoint["validated"]["changed"])
+            result["data"]["changed_sections"] = [section for section in SYNC_SECTIONS if section in changed]
+            result["data"]["unchanged_sections"] = [section for section in SYNC_SECTIONS if section not in changed]
+            print(f"🔎 Section thay đổi: {result['data']['changed_sections'] or 'không có'}")
+            
+            # Step 3: Lưu sinh viên
+            self._start_step(3, "💾 BƯỚC 3: Lưu thông tin sinh viên")
+            
+            student_states, write_timings = self._write_sections(checkpoint, [
+                ("student_info", "student_info" in changed, lambda: self._insert_student(student_info)),
+            ])
+            student_state = student_states["student_info"]
+            result["data"]["write_timings"] = write_timings
+            result["data"]["student_info"] = student_info
+            if student_state["status"] == TABLE_FAILED:
+                # Điểm/tiến độ tham chiếu SinhVien - không ghi tiếp khi chưa có SV
+                self._save_written_fingerprints(student_id, fingerprints, changed, checkpoint)
                 result["message"] = "❌ Lỗi khi lưu sinh viên"
+                result["data"]["resumable"] = self._keep_checkpoint(cache_key, checkpoint)
                 return result
             
-            result["data"]["student_info"] = student_info
-            
-            # Step 4: Insert điểm
-            print("\n" + "=" * 60)
-            print("💾 BƯỚC 4: Lưu dữ liệu điểm")
-            print("=" * 60)
-            
-            student_id = student_info.get("StudentID")
-            grades_result = self._insert_grades(student_id, grades)
-            result["data"]["grades_inserted"] = grades_result.get("inserted", 0)
-            result["data"]["grades_failed"] = grades_result.get("failed", 0)
-            
-            # Step 5: Insert tiến độ học tập
-            print("\n" + "=" * 60)
-            print("💾 BƯỚC 5: Lưu dữ liệu tiến độ học tập")
-            print("=" * 60)
+            # Step 4-5: Lưu điểm + tiến độ học tập song song (hai bảng độc lập, chỉ cần SV đã có)
+            self._start_step(4, "💾 BƯỚC 4-5: Lưu dữ liệu điểm và tiến độ học tập (song song)")
+            
+            table_states, table_timings = self._write_sections(checkpoint, [
+                ("grades", "grades" in changed, lambda: self._insert_grades(student_id, grades)),
+                ("tien_do", "tien_do" in changed, lambda: self._insert_tien_do_hoc_tap(student_id, tien_do)),
+            ])
+            write_timings.update(table_timings)
+            for section in ("grades", "tien_do"):
+                result["data"][f"{section}_inserted"] = table_states[section].get("inserted", 0)
+                result["data"][f"{section}_failed"] = table_states[section].get("failed", 0)
+            
+            self._save_written_fingerprints(student_id, fingerprints, changed, checkpoint)
+            
+            failed_sections = [
+                section for section in WRITE_SECTIONS
+                if checkpoint["tables"][section]["status"] == TABLE_FAILED
+            ]
+            if failed_sections:
+                # Giữ checkpoint: lần resume sau chỉ ghi lại các bảng lỗi, không scrape lại
+                result["message"] = f"⚠️ Lưu chưa xong: {', '.join(failed_sections)}"
+                result["data"]["resumable"] = self._keep_checkpoint(cache_key, checkpoint)
+                return result
             
-            tien_do_result = self._insert_tien_do_hoc_tap(student_id, tien_do)
-            result["data"]["tien_do_inserted"] = tien_do_result.get("inserted", 0)
-            result["data"]["tien_do_failed"] = tien_do_result.get("failed", 0)
+            sync_checkpoints.clear(cache_key)
             
             # Final result
             result["success"] = True
@@ -142,6 +397,9 @@ class VKUScraperManager:
             print(f"  - StudentID: {student_id}")
             print(f"  - Grades: {result['data']['grades_inserted']}/{len(grades)} inserted")
             print(f"  - TienDo: {result['data']['tien_do_inserted']}/{len(tien_do)} inserted")
+            print(f"  - Không đổi: {', '.join(result['data']['unchanged_sections']) or 'không có'}")
+            for name, elapsed in write_timings.items():
+                print(f"  - ⏱️ Ghi {name}: {elapsed:.2f}s")
             print("=" * 60)
             
             return result
@@ -151,38 +409,142 @@ class VKUScraperManager:
             result["message"] = f"❌ Lỗi: {str(e)}"
             return result
     
-    def _delete_old_data(self, student_id: str) -> bool:
-        """Delete old data for student before re-scraping"""
+    def _keep_checkpoint(self, cache_key: Optional[str], checkpoint: Dict[str, Any]) -> bool:
+        """Sau khi có bảng ghi lỗi: giữ checkpoint nếu còn lượt resume, hết lượt thì bỏ (lần sau scrape lại)"""
+        if sync_checkpoints.can_resume(checkpoint):
+            return True
+        sync_checkpoints.clear(cache_key)
+        return False
+    
+    def _record_metrics(self, timer: StepTimer, result: Dict[str, Any]) -> None:
+        """Đưa thời gian từng bước của lần sync vào scrape_metrics và result["data"]["step_timings"]"""
+        for name, seconds in result["data"].get("write_timings", {}).items():
+            timer.add(f"write.{name}", seconds)
         try:
-            if not self.user_id:
-                return True
-            
-            print(f"🗑️ Xóa dữ liệu cũ của sinh viên {student_id}...")
-            
-            # Delete old grades (cascade will handle it, but explicit is better)
-            # Since we have ON DELETE CASCADE on StudentID, deleting student will auto-delete grades
-            # But we can also check if student exists first
-            existing = sinh_vien_repo.get_student_by_id_and_user(student_id, self.user_id)
-            
-            if existing:
-                # Delete will cascade to Diem and TienDoHocTap
-                success = sinh_vien_repo.delete_student(student_id)
-                if success:
-                    print(f"✅ Đã xóa dữ liệu cũ")
-                    return True
-                else:
-                    print(f"⚠️ Không thể xóa dữ liệu cũ, sẽ thử cập nhật")
-                    return False
+            run = scrape_metrics.record(
+                timer,
+                success=result["success"],
+                source=result["data"].get("source"),
+                user_key=self._cache_key(),
+                trace=timer.trace
+            )
+            result["data"]["step_timings"] = run["steps"]
+        except Exception as e:
+            print(f"⚠️ Lỗi khi ghi metrics: {e}")
+    
+    def _write_sections(
+        self,
+        checkpoint: Dict[str, Any],
+        writes: List[tuple]
+    ) -> tuple:
+        """
+        Ghi các bảng độc lập song song (qua _write_executor) và lưu trạng thái vào checkpoint
+        Bảng đã ghi xong ở lần trước (hoặc không đổi) thì bỏ qua
+        
+        Args:
+            writes: [(section, is_changed, write_fn), ...]
+        
+        Returns:
+            (
+                {section: {"status": "done" | "skipped" | "failed", "inserted": 0, "failed": 0}},
+                {section: elapsed_seconds, ..., "<a>+<b>": wall time của cả nhóm}
+            )
+        """
+        states = {}
+        pending = []
+        for section, is_changed, write in writes:
+            state = checkpoint["tables"].get(section)
+            if state and state["status"] in (TABLE_DONE, TABLE_SKIPPED):
+                if state["status"] == TABLE_DONE:
+                    print(f"⏭️ {section} đã ghi xong ở lần sync trước - bỏ qua")
+                states[section] = state
+            elif not is_changed:
+                print(f"⏭️ {section} không đổi - bỏ qua")
+                states[section] = checkpoint["tables"][section] = {"status": TABLE_SKIPPED, "inserted": 0, "failed": 0}
             else:
-                print(f"ℹ️ Không có dữ liệu cũ")
-                return True
-                
+                pending.append((section, write))
+        
+        timings = {}
+        started = time.perf_counter()
+        if len(pending) == 1:
+            section, write = pending[0]
+            outcomes = [(section, self._timed_write(section, write))]
+        else:
+            futures = {_write_executor.submit(self._timed_write, section, write): section for section, write in pending}
+            outcomes = ((futures[future], future.result()) for future in as_completed(futures))
+        
+        # Checkpoint chỉ được cập nhật/lưu ở thread này (không ghi đồng thời từ các worker)
+        for section, (state, elapsed) in outcomes:
+            states[section] = checkpoint["tables"][section] = state
+            timings[section] = elapsed
+            sync_checkpoints.save(self._cache_key(), checkpoint)
+        
+        if len(pending) > 1:
+            timings["+".join(section for section, _ in pending)] = round(time.perf_counter() - started, 3)
+        elif not pending:
+            sync_checkpoints.save(self._cache_key(), checkpoint)
+        return states, timings
+    
+    def _timed_write(self, section: str, write: Callable[[], Any]) -> tuple:
+        """Chạy một bước ghi, trả về (state, thời gian ghi tính bằng giây)"""
+        started = time.perf_counter()
+        try:
+            outcome = write()
         except Exception as e:
-            print(f"❌ Lỗi khi xóa dữ liệu cũ: {e}")
-            return False
+            print(f"❌ Lỗi khi ghi {section}: {e}")
+            outcome = False
+        if isinstance(outcome, bool):
+            outcome = {"inserted": int(outcome), "failed": int(not outcome)}
+        state = {
+            "status": TABLE_DONE if outcome.get("failed", 0) == 0 else TABLE_FAILED,
+            "inserted": outcome.get("inserted", 0),
+            "failed": outcome.get("failed", 0),
+        }
+        elapsed = round(time.perf_counter() - started, 3)
+        print(f"⏱️ Ghi {section}: {elapsed:.2f}s")
+        return state, elapsed
+    
+    def _save_written_fingerprints(
+        self,
+        student_id: str,
+        fingerprints: Dict[str, str],
+        changed: set,
+        checkpoint: Dict[str, Any]
+    ) -> None:
+        """Lưu fingerprint cho các section đã thay đổi và ghi thành công"""
+        written = {
+            section: fingerprints[section]
+            for section in WRITE_SECTIONS
+            if section in changed and checkpoint["tables"].get(section, {}).get("status") == TABLE_DONE
+        }
+        # Summary chưa lưu DB - chỉ ghi nhận fingerprint
+        if "summary" in changed:
+            written["summary"] = fingerprints["summary"]
+        
+        if written:
+            sync_fingerprint_repo.save_fingerprints(student_id, written, self.user_id)
+    
+    def _get_existing_student(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """Lấy SV đã lưu (của user hiện tại nếu có user_id)"""
+        if self.user_id:
+            return sinh_vien_repo.get_student_by_id_and_user(student_id, self.user_id)
+        return sinh_vien_repo.get_student_by_id(student_id)
+    
+    def _detect_changed_sections(self, student_id: str, fingerprints: Dict[str, str]) -> set:
+        """So sánh fingerprint mới với fingerprint đã lưu, trả về các section đã thay đổi"""
+        try:
+            # Chưa có SV trong DB (hoặc đã bị xóa) -> ghi lại toàn bộ
+            if not self._get_existing_student(student_id):
+                return set(fingerprints)
+            
+            stored = sync_fingerprint_repo.get_fingerprints(student_id, self.user_id)
+            return {section for section, fp in fingerprints.items() if stored.get(section) != fp}
+        except Exception as e:
+            print(f"⚠️ Không đọc được fingerprint, sẽ ghi lại toàn bộ: {e}")
+            return set(fingerprints)
     
     def _insert_student(self, student_info: Dict[str, str]) -> bool:
-        """Insert sinh viên vào Supabase (với user_id)"""
+        """Thêm hoặc cập nhật sinh viên trong Supabase (với user_id)"""
         try:
             student_id = student_info.get("StudentID")
             
@@ -190,21 +552,24 @@ class VKUScraperManager:
             if self.user_id:
                 student_info["user_id"] = self.user_id
             
-            # Delete old data first (if re-scraping)
-            self._delete_old_data(student_id)
+            existing = self._get_existing_student(student_id)
+            if existing:
+                # Cập nhật tại chỗ - không xóa SV để giữ nguyên điểm/tiến độ của các section không đổi
+                print(f"✏️ Cập nhật dữ liệu: {student_id}")
+                result = sinh_vien_repo.update_student(student_id, student_info)
+            else:
+                print(f"➕ Thêm dữ liệu mới: {student_id}")
+                result = sinh_vien_repo.create_student(student_info)
             
-            # Insert new student data
-            print(f"➕ Thêm dữ liệu mới: {student_id}")
-            result = sinh_vien_repo.create_student(student_info)
             if result:
-                print(f"✅ Thêm SV thành công: {student_id}")
+                print(f"✅ Lưu SV thành công: {student_id}")
                 return True
             else:
-                print(f"❌ Lỗi thêm SV")
+                print(f"❌ Lỗi lưu SV: {student_id}")
                 return False
                     
         except Exception as e:
-            print(f"❌ Lỗi khi insert SV: {e}")
+            print(f"❌ Lỗi khi lưu SV: {e}")
             return False
     
     def _insert_grades(self, student_id: str, grades: List[Dict[str, Any]]) -> Dict[str, int]:
@@ -212,14 +577,16 @@ class VKUScraperManager:
         result = {"inserted": 0, "failed": 0}
         
         try:
-            # Thêm StudentID và user_id vào mỗi bản ghi
-            grades_data = []
-            for grade in grades:
-                grade_copy = grade.copy()
-                grade_copy["StudentID"] = student_id
-                if self.user_id:
-                    grade_copy["user_id"] = self.user_id
-                grades_data.append(grade_copy)
+            # Ghi đè (xóa hết rồi insert lại) để chạy lại bước này không nhân đôi dòng.
+            # Không xóa được thì không insert - tránh trùng điểm
+            if not diem_repo.delete_by_student(student_id):
+                result["failed"] = len(grades)
+                return result
+            
+            # Chuẩn hóa + thêm StudentID và user_id (theo cột, một lượt)
+            grades_data, dropped = normalize_grades(grades, student_id, self.user_id)
+            if dropped:
+                print(f"⚠️ Bỏ qua {dropped} điểm thiếu tên học phần/học kỳ")
             
             # Insert batch
             inserted = diem_repo.bulk_insert_grades(grades_data)
@@ -243,48 +610,19 @@ class VKUScraperManager:
         result = {"inserted": 0, "failed": 0}
         
         try:
+            # Ghi đè (xóa hết rồi insert lại) để chạy lại bước này không nhân đôi dòng
+            if not tien_do_hoc_tap_repo.delete_by_student(student_id):
+                result["failed"] = len(tien_do)
+                return result
+            
             if not tien_do:
                 print("⚠️ Không có dữ liệu tiến độ học tập")
                 return result
             
-            # Thêm StudentID và user_id vào mỗi bản ghi + validate data types
-            tien_do_data = []
-            for item in tien_do:
-                try:
-                    item_copy = item.copy()
-                    item_copy["StudentID"] = student_id
-                    if self.user_id:
-                        item_copy["user_id"] = self.user_id
-                    
-                    # Validate and convert HocKy to int
-                    if "HocKy" in item_copy:
-                        hoc_ky = item_copy["HocKy"]
-                        if isinstance(hoc_ky, str):
-                            # Extract number from string
-                            import re
-                            match = re.search(r'(\d+)', hoc_ky)
-                            item_copy["HocKy"] = int(match.group(1)) if match else None
-                        elif not isinstance(hoc_ky, int):
-                            item_copy["HocKy"] = int(hoc_ky) if hoc_ky else None
-                    
-                    # Validate and convert SoTC to int
-                    if "SoTC" in item_copy:
-                        so_tc = item_copy["SoTC"]
-                        if isinstance(so_tc, str):
-                            import re
-                            match = re.search(r'(\d+)', so_tc)
-                            item_copy["SoTC"] = int(match.group(1)) if match else 0
-                        elif not isinstance(so_tc, int):
-                            item_copy["SoTC"] = int(so_tc) if so_tc else 0
-                    
-                    # Skip if missing required fields
-                    if not item_copy.get("HocKy") or not item_copy.get("TenHocPhan"):
-                        continue
-                        
-                    tien_do_data.append(item_copy)
-                except Exception as e:
-                    print(f"⚠️ Skip invalid record: {e}")
-                    continue
+            # Chuẩn hóa kiểu dữ liệu (HocKy, SoTC -> int) + thêm StudentID và user_id
+            tien_do_data, dropped = normalize_tien_do(tien_do, student_id, self.user_id)
+            if dropped:
+                print(f"⚠️ Bỏ qua {dropped} tiến độ thiếu tên học phần/học kỳ")
             
             # Insert batch
             inserted = tien_do_hoc_tap_repo.bulk_insert_academic_progress(tien_do_data)
@@ -5,14 +5,19 @@ from pathlib import Path
 import sys
 import time
 
+from vku_http import PORTAL_BASE_URL
+
 # Set UTF-8 encoding for output
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-# Save session to Frontend/Sessions folder
-sessions_dir = Path(__file__).parent.parent.parent.parent / "Frontend" / "Sessions"
-sessions_dir.mkdir(parents=True, exist_ok=True)
-session_file = sessions_dir / "session.json"
+# Usage: python session_get.py [output_path]
+# Backend truyền path session của từng user; chạy tay thì mặc định lưu vào Frontend/Sessions/session.json
+if len(sys.argv) > 1:
+    session_file = Path(sys.argv[1])
+else:
+    session_file = Path(__file__).parent.parent.parent.parent / "Frontend" / "Sessions" / "session.json"
+session_file.parent.mkdir(parents=True, exist_ok=True)
 
 print(f"Session will be saved to: {session_file}")
 
@@ -22,7 +27,7 @@ with sync_playwright() as p:
 
     # Open VKU login page
     page = context.new_page()
-    page.goto("https://daotao.vku.udn.vn/sv")
+    page.goto(f"{PORTAL_BASE_URL}/sv")
 
     print("Waiting for login...")
     
@@ -0,0 +1,197 @@
+"""
+Snapshot Archive - Lưu HTML thô của mỗi lần scrape (nén) để parse lại mà không cần scrape lại
+
+- Mỗi lần scrape thành công lưu một file: <base_dir>/<user_key>/<UTC timestamp>-<source>.json.zst
+  (zstd nếu có cài zstandard, không thì gzip)
+- Retention: xóa snapshot cũ hơn retention_days và chỉ giữ keep_per_user bản mới nhất mỗi user
+- Khi sửa bug parser trong vku_scraper.py, chạy reparse.py để dựng lại dữ liệu từ archive
+"""
+
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# zstandard là optional - không có thì dùng gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent / "archive"
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%fZ"
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Cần cài zstandard để đọc snapshot .zst")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotArchive:
+    """
+    Kho HTML thô của các lần scrape
+
+    Usage:
+        archive = SnapshotArchive.from_env()
+        archive.save(user_id, pages, source="http", student_id="21IT001")
+        record = archive.load(archive.latest(user_id))
+    """
+
+    def __init__(
+        self,
+        base_dir: Path = DEFAULT_ARCHIVE_DIR,
+        enabled: bool = True,
+        retention_days: float = 30,
+        keep_per_user: int = 20,
+        codec: Optional[str] = None
+    ):
+        """
+        Args:
+            base_dir: Thư mục lưu archive
+            enabled: Tắt hẳn việc lưu nếu False
+            retention_days: Xóa snapshot cũ hơn N ngày (0 = không giới hạn)
+            keep_per_user: Giữ tối đa N snapshot mới nhất mỗi user (0 = không giới hạn)
+            codec: "zst" hoặc "gz" (mặc định zst nếu có zstandard)
+        """
+        self.base_dir = Path(base_dir)
+        self.enabled = enabled
+        self.retention_days = retention_days
+        self.keep_per_user = keep_per_user
+        self.codec = codec or ("zst" if zstandard is not None else "gz")
+
+    @classmethod
+    def from_env(cls) -> "SnapshotArchive":
+        """
+        Đọc cấu hình từ biến môi trường:
+            SCRAPE_ARCHIVE_ENABLED=1
+            SCRAPE_ARCHIVE_DIR=...
+            SCRAPE_ARCHIVE_RETENTION_DAYS=30
+            SCRAPE_ARCHIVE_KEEP=20
+        """
+        return cls(
+            base_dir=Path(os.environ.get("SCRAPE_ARCHIVE_DIR") or DEFAULT_ARCHIVE_DIR),
+            enabled=os.environ.get("SCRAPE_ARCHIVE_ENABLED", "1") != "0",
+            retention_days=float(os.environ.get("SCRAPE_ARCHIVE_RETENTION_DAYS", "30")),
+            keep_per_user=int(os.environ.get("SCRAPE_ARCHIVE_KEEP", "20")),
+        )
+
+    @staticmethod
+    def user_dir_name(user_key: str) -> str:
+        """user_id (hoặc path session khi chạy tay) -> tên thư mục an toàn"""
+        return _SAFE_KEY.sub("_", user_key).strip("_")[-64:] or "anonymous"
+
+    # ---------- Ghi ----------
+
+    def save(
+        self,
+        user_key: str,
+        pages: Dict[str, str],
+        source: str,
+        student_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Optional[Path]:
+        """
+        Lưu HTML các trang của một lần scrape (atomic), rồi dọn snapshot cũ của user
+
+        Returns:
+            Path file đã lưu, None nếu archive bị tắt
+        """
+        if not self.enabled or not pages:
+            return None
+
+        captured_at = datetime.now(timezone.utc)
+        user_dir = self.base_dir / self.user_dir_name(user_key)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        path = user_dir / f"{captured_at.strftime(TIMESTAMP_FORMAT)}-{source}.json.{self.codec}"
+
+        record = {
+            "captured_at": captured_at.isoformat(),
+            "source": source,
+            "user_id": user_id,
+            "student_id": student_id,
+            "pages": pages,
+        }
+        payload = _compress(json.dumps(record, ensure_ascii=False).encode("utf-8"), self.codec)
+
+        fd, tmp_path = tempfile.mkstemp(dir=str(user_dir), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        self.prune(user_key)
+        return path
+
+    def prune(self, user_key: Optional[str] = None) -> int:
+        """Xóa snapshot hết hạn / vượt quá keep_per_user, trả về số file đã xóa"""
+        if user_key is not None:
+            user_dirs = [self.base_dir / self.user_dir_name(user_key)]
+        elif self.base_dir.exists():
+            user_dirs = [d for d in self.base_dir.iterdir() if d.is_dir()]
+        else:
+            user_dirs = []
+
+        removed = 0
+        cutoff = time.time() - self.retention_days * 86400 if self.retention_days else None
+        for user_dir in user_dirs:
+            snapshots = self._snapshots_in(user_dir)
+            for index, path in enumerate(snapshots):
+                too_many = self.keep_per_user and index >= self.keep_per_user
+                too_old = cutoff is not None and path.stat().st_mtime < cutoff
+                if too_many or too_old:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    # ---------- Đọc ----------
+
+    @staticmethod
+    def _snapshots_in(user_dir: Path) -> List[Path]:
+        """Snapshot của một user, mới nhất trước (tên file bắt đầu bằng timestamp)"""
+        if not user_dir.exists():
+            return []
+        return sorted(
+            (p for p in user_dir.iterdir() if p.name.endswith((".json.zst", ".json.gz"))),
+            reverse=True
+        )
+
+    def user_keys(self) -> List[str]:
+        """Tên thư mục của các user có snapshot"""
+        if not self.base_dir.exists():
+            return []
+        return sorted(d.name for d in self.base_dir.iterdir() if d.is_dir())
+
+    def snapshots(self, user_key: str) -> List[Path]:
+        return self._snapshots_in(self.base_dir / self.user_dir_name(user_key))
+
+    def latest(self, user_key: str) -> Optional[Path]:
+        snapshots = self.snapshots(user_key)
+        return snapshots[0] if snapshots else None
+
+    @staticmethod
+    def load(path: Path) -> Dict[str, Any]:
+        """
+        Returns:
+            {"captured_at": ..., "source": ..., "user_id": ..., "student_id": ..., "pages": {...}}
+        """
+        path = Path(path)
+        codec = path.name.rsplit(".", 1)[-1]
+        return json.loads(_decompress(path.read_bytes(), codec).decode("utf-8"))
+
+
+# Archive dùng chung cho cả process
+snapshot_archive = SnapshotArchive.from_env()
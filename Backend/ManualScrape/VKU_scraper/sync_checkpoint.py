@@ -0,0 +1,152 @@
+"""
+Sync Checkpoint - Lưu tiến độ từng bước của VKUScraperManager.scrape_and_sync
+
+Mỗi user có một file checkpoint (JSON) chứa:
+- scraped: dữ liệu đã scrape (bước 1)
+- validated: StudentID, fingerprint và các section thay đổi (bước 2)
+- tables: trạng thái ghi từng bảng (bước 3-5)
+
+Nếu một bước ghi DB lỗi, lần sync gọi lại với resume=True tiếp tục từ bước đó với dữ liệu
+đã lưu thay vì scrape lại portal. Sync thường (không resume) luôn bỏ checkpoint và scrape mới.
+Checkpoint bị xóa khi sync xong toàn bộ, khi hết hạn (ttl, tính từ lúc scrape) hoặc sau
+max_resumes lần resume vẫn lỗi.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CHECKPOINT_DIR = Path(__file__).parent / "checkpoints"
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9_-]+")
+
+# Trạng thái ghi của một bảng trong checkpoint["tables"]
+TABLE_DONE = "done"
+TABLE_SKIPPED = "skipped"
+TABLE_FAILED = "failed"
+
+
+class SyncCheckpointStore:
+    """
+    Kho checkpoint của scrape_and_sync, một file cho mỗi user
+
+    Usage:
+        checkpoint = sync_checkpoints.resume(user_id)   # None nếu không có / hết hạn / hết lượt
+        sync_checkpoints.save(user_id, checkpoint)
+        sync_checkpoints.clear(user_id)
+    """
+
+    def __init__(self, base_dir: Path = DEFAULT_CHECKPOINT_DIR, ttl: float = 300, max_resumes: int = 3):
+        """
+        Args:
+            base_dir: Thư mục lưu checkpoint
+            ttl: Checkpoint scrape cách đây hơn N giây bị bỏ (dữ liệu đã quá cũ để ghi), 0 = tắt checkpoint
+            max_resumes: Số lần resume tối đa của một checkpoint, hết lượt thì bỏ để scrape lại
+        """
+        self.base_dir = Path(base_dir)
+        self.ttl = ttl
+        self.max_resumes = max_resumes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SyncCheckpointStore":
+        """
+        Đọc cấu hình từ biến môi trường:
+            SYNC_CHECKPOINT_DIR=...
+            SYNC_CHECKPOINT_TTL=300
+            SYNC_CHECKPOINT_MAX_RESUMES=3
+        """
+        return cls(
+            base_dir=Path(os.environ.get("SYNC_CHECKPOINT_DIR") or DEFAULT_CHECKPOINT_DIR),
+            ttl=float(os.environ.get("SYNC_CHECKPOINT_TTL", "300")),
+            max_resumes=int(os.environ.get("SYNC_CHECKPOINT_MAX_RESUMES", "3")),
+        )
+
+    def path_for(self, key: str) -> Path:
+        name = _SAFE_KEY.sub("_", key).strip("_")[-64:] or "anonymous"
+        return self.base_dir / f"{name}.json"
+
+    def load(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            {"created_at": ..., "updated_at": ..., "resume_attempts": 0, "scraped": {...},
+             "validated": {...} | None,
+             "tables": {"grades": {"status": "done", "inserted": 10, "failed": 0}, ...}}
+            None nếu không có, đã hết hạn hoặc file hỏng
+        """
+        if not key or self.ttl <= 0:
+            return None
+
+        path = self.path_for(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    checkpoint = json.load(f)
+                # Tuổi tính từ lúc scrape (created_at), không phải lần ghi checkpoint gần nhất
+                created_at = datetime.fromisoformat(checkpoint["created_at"])
+                if (datetime.now(timezone.utc) - created_at).total_seconds() > self.ttl:
+                    path.unlink(missing_ok=True)
+                    return None
+                return checkpoint
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Checkpoint hỏng, bỏ qua: {path.name} ({e})")
+                path.unlink(missing_ok=True)
+                return None
+
+    def resume(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Lấy checkpoint để chạy lại các bước ghi lỗi, tính là một lần resume
+
+        Returns:
+            Checkpoint, hoặc None nếu không có / hết hạn / đã resume max_resumes lần (checkpoint bị xóa)
+        """
+        checkpoint = self.load(key)
+        if checkpoint is None:
+            return None
+        if not self.can_resume(checkpoint):
+            print(f"⚠️ Đã resume {checkpoint.get('resume_attempts', 0)} lần vẫn lỗi - bỏ checkpoint, scrape lại")
+            self.clear(key)
+            return None
+        checkpoint["resume_attempts"] = checkpoint.get("resume_attempts", 0) + 1
+        self.save(key, checkpoint)
+        return checkpoint
+
+    def can_resume(self, checkpoint: Dict[str, Any]) -> bool:
+        """Checkpoint còn lượt resume không"""
+        return self.ttl > 0 and checkpoint.get("resume_attempts", 0) < self.max_resumes
+
+    def save(self, key: Optional[str], checkpoint: Dict[str, Any]) -> None:
+        """Ghi checkpoint (atomic) - lỗi ghi chỉ làm mất khả năng resume, không làm hỏng sync"""
+        if not key or self.ttl <= 0:
+            return
+
+        now = datetime.now(timezone.utc).isoformat()
+        checkpoint.setdefault("created_at", now)
+        checkpoint["updated_at"] = now
+
+        path = self.path_for(key)
+        with self._lock:
+            try:
+                self.base_dir.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=str(self.base_dir), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(checkpoint, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"⚠️ Không lưu được checkpoint: {e}")
+
+    def clear(self, key: Optional[str]) -> None:
+        if not key:
+            return
+        with self._lock:
+            self.path_for(key).unlink(missing_ok=True)
+
+
+# Checkpoint store dùng chung cho cả process
+sync_checkpoints = SyncCheckpointStore.from_env()
@@ -0,0 +1,279 @@
+"""
+VKU HTTP Fetcher - Lấy HTML các trang portal bằng httpx, không cần browser
+Dùng cookies trong session.json (storage state do session_get.py lưu)
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+
+import httpx
+
+# Base URL của portal - trỏ sang mock_portal.py khi benchmark/test ở local
+PORTAL_BASE_URL = os.environ.get("VKU_PORTAL_URL", "https://daotao.vku.udn.vn").rstrip("/")
+
+# Portal đôi khi trả 200 kèm trang đăng nhập thay vì redirect khi session hết hạn
+LOGIN_PATH = "/login"
+LOGIN_PAGE_MARKERS = ("/auth/google",)
+
+DEFAULT_TIMEOUT = 20.0
+PROBE_TIMEOUT = 5.0
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "vi-VN,vi;q=0.9,en;q=0.8",
+}
+
+
+class LoginRedirectError(Exception):
+    """Portal redirect về trang đăng nhập - session đã hết hạn"""
+
+    def __init__(self, url: str, location: str = ""):
+        self.url = url
+        self.location = location
+        super().__init__(f"{url} redirect tới trang đăng nhập ({location or 'không rõ'})")
+
+
+# ---------- Cookies ----------
+
+def read_storage_cookies(session_file: str) -> List[Dict[str, Any]]:
+    """
+    Đọc danh sách cookies từ file session
+    Handle cả 2 format: direct array hoặc storage state với "cookies" key
+    """
+    if not session_file or not os.path.exists(session_file):
+        return []
+
+    with open(session_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    return data["cookies"] if isinstance(data, dict) and "cookies" in data else data
+
+
+def build_cookie_jar(cookies: List[Dict[str, Any]]) -> httpx.Cookies:
+    """Chuyển cookies của Playwright sang httpx.Cookies, bỏ qua cookie đã hết hạn"""
+    jar = httpx.Cookies()
+    now = time.time()
+
+    for cookie in cookies:
+        expires = cookie.get("expires", -1)
+        if expires and expires > 0 and expires < now:
+            continue
+        jar.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+        )
+
+    return jar
+
+
+def earliest_expiry(cookies: List[Dict[str, Any]]) -> Optional[float]:
+    """Thời điểm (epoch) cookie có hạn sớm nhất hết hạn, None nếu chỉ có session cookie"""
+    expiries = [c["expires"] for c in cookies if c.get("expires") and c["expires"] > 0]
+    return min(expiries) if expiries else None
+
+
+def merge_refreshed_cookies(
+    cookies: List[Dict[str, Any]],
+    jar: httpx.Cookies
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Cập nhật value/expires của cookies (format Playwright) theo cookie mới
+    portal trả về qua Set-Cookie
+
+    Returns:
+        (cookies đã cập nhật, số cookie thay đổi)
+    """
+    fresh = {(c.name, c.domain.lstrip("."), c.path): c for c in jar.jar}
+    merged = []
+    changed = 0
+
+    for cookie in cookies:
+        key = (cookie["name"], cookie.get("domain", "").lstrip("."), cookie.get("path", "/"))
+        new = fresh.get(key)
+        if new is None:
+            merged.append(cookie)
+            continue
+        expires = new.expires if new.expires is not None else cookie.get("expires", -1)
+        if new.value != cookie["value"] or expires != cookie.get("expires", -1):
+            cookie = {**cookie, "value": new.value, "expires": expires}
+            changed += 1
+        merged.append(cookie)
+
+    return merged, changed
+
+
+def create_client(session_file: str, timeout: float = DEFAULT_TIMEOUT) -> httpx.Client:
+    """
+    Tạo httpx.Client mang cookies của session
+    Các trang trong cùng một lần scrape dùng chung connection pool của client này
+    """
+    return httpx.Client(
+        cookies=build_cookie_jar(read_storage_cookies(session_file)),
+        headers=DEFAULT_HEADERS,
+        timeout=timeout,
+        follow_redirects=False,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+    )
+
+
+def create_async_client(session_file: str, timeout: float = DEFAULT_TIMEOUT) -> httpx.AsyncClient:
+    """Bản async của create_client, dùng trên event loop của server"""
+    return httpx.AsyncClient(
+        cookies=build_cookie_jar(read_storage_cookies(session_file)),
+        headers=DEFAULT_HEADERS,
+        timeout=timeout,
+        follow_redirects=False,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+    )
+
+
+# ---------- Fetch ----------
+
+def is_login_page(response: httpx.Response) -> bool:
+    """Response 200 nhưng là trang đăng nhập (theo URL hoặc nội dung form đăng nhập)"""
+    if response.url.path.rstrip("/").endswith(LOGIN_PATH):
+        return True
+    text = response.text
+    return any(marker in text for marker in LOGIN_PAGE_MARKERS)
+
+
+def _check_response(url: str, response: httpx.Response) -> str:
+    # Các trang /sv/* render phía server, khi đã đăng nhập sẽ trả 200 trực tiếp
+    if response.is_redirect or response.status_code in (401, 403):
+        raise LoginRedirectError(url, response.headers.get("location", ""))
+
+    response.raise_for_status()
+    if is_login_page(response):
+        raise LoginRedirectError(url, str(response.url))
+    return response.text
+
+
+def fetch_page(client: httpx.Client, url: str) -> str:
+    """
+    GET một trang portal và trả về HTML
+
+    Raises:
+        LoginRedirectError: Nếu portal redirect hoặc trả trang đăng nhập (session hết hạn / chưa đăng nhập)
+        httpx.HTTPError: Lỗi mạng hoặc HTTP status lỗi
+    """
+    return _check_response(url, client.get(url))
+
+
+async def fetch_page_async(client: httpx.AsyncClient, url: str) -> str:
+    """Bản async của fetch_page"""
+    return _check_response(url, await client.get(url))
+
+
+def fetch_pages(
+    urls: Dict[str, str],
+    session_file: str,
+    timeout: float = DEFAULT_TIMEOUT
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Lấy HTML của nhiều trang song song bằng cookies trong session_file
+
+    Args:
+        urls: {"profile": "https://.../sv/hoso", ...}
+        session_file: Path đến file session
+
+    Returns:
+        (
+            {"profile": "<html>...", ...},
+            {"profile": 0.42, ...}   # thời gian tải từng trang (giây)
+        )
+    """
+    pages = {}
+    timings = {}
+
+    def _fetch(name: str, url: str) -> None:
+        started = time.perf_counter()
+        pages[name] = fetch_page(client, url)
+        timings[name] = round(time.perf_counter() - started, 3)
+
+    # httpx.Client thread-safe: các trang dùng chung connection pool
+    with create_client(session_file, timeout=timeout) as client:
+        with ThreadPoolExecutor(max_workers=len(urls) or 1) as executor:
+            futures = [executor.submit(_fetch, name, url) for name, url in urls.items()]
+            for future in futures:
+                future.result()
+
+    return pages, timings
+
+
+async def fetch_pages_async(
+    urls: Dict[str, str],
+    session_file: str,
+    timeout: float = DEFAULT_TIMEOUT
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Bản async của fetch_pages: các trang được tải đồng thời bằng asyncio.gather, không cần thread"""
+    pages = {}
+    timings = {}
+    started = time.perf_counter()
+
+    async def _fetch(name: str, url: str) -> None:
+        pages[name] = await fetch_page_async(client, url)
+        timings[name] = round(time.perf_counter() - started, 3)
+
+    async with create_async_client(session_file, timeout=timeout) as client:
+        await asyncio.gather(*(_fetch(name, url) for name, url in urls.items()))
+
+    return pages, timings
+
+
+def probe_session(
+    session_file: str,
+    url: str,
+    timeout: float = PROBE_TIMEOUT
+) -> Dict[str, Any]:
+    """
+    Kiểm tra nhanh session còn đăng nhập được không bằng một request GET
+    (không follow redirect - bị đẩy về trang đăng nhập nghĩa là session đã hết hạn)
+
+    Returns:
+        {
+            "valid": True | False | None,   # None = không xác định (lỗi mạng)
+            "reason": "ok" | "no_session" | "login_redirect" | "network_error",
+            "elapsed_ms": 85.2,
+            "expires_at": 1735689600.0,     # cookie có hạn sớm nhất, None nếu không có
+            "cookies": [...]                # cookies đã cập nhật theo Set-Cookie (nếu có)
+            "refreshed": 1                  # số cookie portal đã gia hạn/đổi
+        }
+    """
+    cookies = read_storage_cookies(session_file)
+    result = {
+        "valid": False,
+        "reason": "no_session",
+        "elapsed_ms": 0.0,
+        "expires_at": earliest_expiry(cookies),
+        "cookies": cookies,
+        "refreshed": 0,
+    }
+    if not cookies:
+        return result
+
+    started = time.perf_counter()
+    with create_client(session_file, timeout=timeout) as client:
+        try:
+            response = client.get(url)
+            _check_response(url, response)
+            result.update(valid=True, reason="ok")
+        except LoginRedirectError:
+            result.update(valid=False, reason="login_redirect")
+        except httpx.HTTPError as e:
+            result.update(valid=None, reason="network_error", error=str(e))
+
+        if result["valid"]:
+            merged, changed = merge_refreshed_cookies(cookies, client.cookies)
+            result.update(cookies=merged, refreshed=changed, expires_at=earliest_expiry(merged))
+
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
@@ -3,12 +3,19 @@ VKU Scraper Module - Pure Functions
 Chứa tất cả logic scrape, không có dependency vào main
 """
 
-from playwright.sync_api import sync_playwright, Page, BrowserContext
+from playwright.sync_api import sync_playwright, Browser, Page, BrowserContext
+from bs4 import BeautifulSoup, Tag
 import json
 import os
 import time
 import re
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any, TYPE_CHECKING
+
+from vku_http import fetch_pages, LoginRedirectError, PORTAL_BASE_URL
+from route_policy import RoutePolicy, apply_route_policy
+
+if TYPE_CHECKING:
+    from browser_pool import BrowserPool
 
 # ---------- Session Management ----------
 
@@ -43,17 +50,61 @@ def load_session(context: BrowserContext, session_file: str = "session.json") ->
 
 # ---------- Login & Auth ----------
 
-def login_with_browser(profile_url: str = "https://daotao.vku.udn.vn/sv/hoso") -> None:
+def login_with_browser(profile_url: str = f"{PORTAL_BASE_URL}/sv/hoso") -> None:
     """Mở browser để user đăng nhập Google"""
     print("\n🔐 Vui lòng đăng nhập bằng Google...")
     print("👉 Sau khi đăng nhập thành công, nhấn Enter để tiếp tục...")
     input()
 
-# ---------- Crawl Thông tin cá nhân ----------
+# ---------- HTML Parsing ----------
 
-def crawl_student_info(page: Page) -> Dict[str, str]:
+# Dùng lxml nếu có (nhanh hơn nhiều), nếu không thì fallback về html.parser có sẵn
+try:
+    import lxml  # noqa: F401
+    _BS4_PARSER = "lxml"
+except ImportError:
+    _BS4_PARSER = "html.parser"
+
+HtmlSource = Union[str, BeautifulSoup]
+
+def _make_soup(html: HtmlSource) -> BeautifulSoup:
+    # Cho phép truyền soup đã parse sẵn (VD: từ PortalSnapshot) để không parse lại HTML
+    if isinstance(html, BeautifulSoup):
+        return html
+    return BeautifulSoup(html, _BS4_PARSER)
+
+def _node_text(node: Tag) -> str:
+    """Text của node, gộp khoảng trắng giống innerText"""
+    return " ".join(node.get_text(" ").split())
+
+def extract_table_rows(html: HtmlSource, row_selector: str) -> List[List[Dict[str, Any]]]:
+    """
+    Lấy tất cả các dòng khớp row_selector, mỗi dòng là list các ô
+    
+    Returns:
+        [
+            [{"text": "...", "html": "...", "checked": False}, ...],
+            ...
+        ]
+    """
+    soup = _make_soup(html)
+    rows = []
+    for row in soup.select(row_selector):
+        cols = []
+        for td in row.find_all("td"):
+            cols.append({
+                "text": _node_text(td),
+                "html": td.decode_contents(),
+                "checked": td.select_one("input[type='checkbox'][checked]") is not None
+            })
+        rows.append(cols)
+    return rows
+
+# ---------- Parse Thông tin cá nhân ----------
+
+def parse_student_info(html: HtmlSource) -> Dict[str, str]:
     """
-    Lấy thông tin cá nhân sinh viên từ profile page
+    Parse thông tin cá nhân sinh viên từ HTML trang profile (/sv/hoso)
     
     Returns:
         {
@@ -67,29 +118,25 @@ def crawl_student_info(page: Page) -> Dict[str, str]:
     """
     info = {}
     try:
-        # Wait for page load
-        page.wait_for_selector("div.profile-usertitle", timeout=20000)
-        time.sleep(2)
+        soup = _make_soup(html)
         
-        # Extract info
-        info["ho_va_ten"] = page.query_selector("div.profile-usertitle-name").inner_text().strip()
-        info["StudentID"] = page.query_selector("div.profile-usertitle-job").inner_text().replace("MÃ SV:", "").strip()
-        info["lop"] = page.query_selector("div.profile-usertitle-job + div").inner_text().replace("LỚP:", "").strip()
-        info["khoa_hoc"] = page.query_selector("div.profile-usertitle-job + div + div").inner_text().replace("KHÓA:", "").strip()
-        info["chuyen_nganh"] = page.query_selector("div.profile-usertitle-job + div + div + div").inner_text().strip()
-        info["khoa"] = page.query_selector("div.profile-usertitle-job + div + div + div + div").inner_text().strip()
+        info["ho_va_ten"] = _node_text(soup.select_one("div.profile-usertitle-name"))
+        info["StudentID"] = _node_text(soup.select_one("div.profile-usertitle-job")).replace("MÃ SV:", "").strip()
+        info["lop"] = _node_text(soup.select_one("div.profile-usertitle-job + div")).replace("LỚP:", "").strip()
+        info["khoa_hoc"] = _node_text(soup.select_one("div.profile-usertitle-job + div + div")).replace("KHÓA:", "").strip()
+        info["chuyen_nganh"] = _node_text(soup.select_one("div.profile-usertitle-job + div + div + div"))
+        info["khoa"] = _node_text(soup.select_one("div.profile-usertitle-job + div + div + div + div"))
         
-        print(f"✅ Lấy thông tin SV: {info['StudentID']} - {info['ho_va_ten']}")
         return info
     except Exception as e:
         print(f"❌ Lỗi khi lấy thông tin: {e}")
         return {}
 
-# ---------- Crawl Điểm ----------
+# ---------- Parse Điểm ----------
 
-def crawl_student_grades(page: Page) -> List[Dict[str, Any]]:
+def parse_student_grades(html: HtmlSource) -> List[Dict[str, Any]]:
     """
-    Lấy danh sách điểm từ trang điểm
+    Parse danh sách điểm từ HTML trang điểm (/sv/diem)
     
     Returns:
         [
@@ -102,31 +149,23 @@ def crawl_student_grades(page: Page) -> List[Dict[str, Any]]:
             ...
         ]
     """
-    print("🔍 Đang trích xuất dữ liệu điểm...")
-    
     try:
-        page.wait_for_selector("table", timeout=20000)
-        time.sleep(3)
-        
-        rows = page.locator("table tr.even.pointer")
+        rows = extract_table_rows(html, "table tr.even.pointer")
         data = []
         hoc_ky = ""
         
-        for i in range(rows.count()):
-            row = rows.nth(i)
-            cols = row.locator("td")
-            
-            if cols.count() >= 10:
+        for i, cols in enumerate(rows):
+            if len(cols) >= 10:
                 try:
-                    ten_hp = cols.nth(1).inner_text().strip()
+                    ten_hp = cols[1]["text"].strip()
                     
                     # Nếu là dòng học kỳ, cập nhật hoc_ky
                     if "Học kỳ" in ten_hp:
                         hoc_ky = ten_hp
                         continue
                     
-                    so_tc_str = cols.nth(2).inner_text().strip()
-                    diem_t10_str = cols.nth(8).inner_text().strip()
+                    so_tc_str = cols[2]["text"].strip()
+                    diem_t10_str = cols[8]["text"].strip()
                     
                     # Parse số TC
                     try:
@@ -156,17 +195,16 @@ def crawl_student_grades(page: Page) -> List[Dict[str, Any]]:
                 except Exception as e:
                     print(f"⚠️ Lỗi khi đọc dòng {i}: {e}")
         
-        print(f"✅ Đã lấy {len(data)} môn học.")
         return data
     except Exception as e:
         print(f"❌ Lỗi khi lấy điểm: {e}")
         return []
 
-# ---------- Crawl Tiến độ học tập ----------
+# ---------- Parse Tiến độ học tập ----------
 
-def crawl_tien_do_hoc_tap(page: Page) -> List[Dict[str, Any]]:
+def parse_tien_do_hoc_tap(html: HtmlSource) -> List[Dict[str, Any]]:
     """
-    Lấy tiến độ học tập (lộ trình học của sinh viên)
+    Parse tiến độ học tập (lộ trình học của sinh viên) từ HTML trang /sv/hoc-phan-con-lai
     
     HTML Structure:
     <tr>
@@ -191,30 +229,22 @@ def crawl_tien_do_hoc_tap(page: Page) -> List[Dict[str, Any]]:
             ...
         ]
     """
-    print("🔍 Đang trích xuất dữ liệu tiến độ học tập...")
-    
     try:
-        page.wait_for_selector("table.jambo_table tbody tr", timeout=20000)
-        time.sleep(2)
-        
-        rows = page.locator("table.jambo_table tbody tr")
+        rows = extract_table_rows(html, "table.jambo_table tbody tr")
         data = []
         
-        for i in range(rows.count()):
+        for i, cols in enumerate(rows):
             try:
-                row = rows.nth(i)
-                cols = row.locator("td")
-                
-                if cols.count() < 6:
+                if len(cols) < 6:
                     continue
                 
                 # Cột 1: Tên học phần
-                ten_hp = cols.nth(1).inner_text().strip()
+                ten_hp = cols[1]["text"].strip()
                 if not ten_hp:
                     continue
                 
                 # Cột 2: Học kỳ - extract số học kỳ
-                hoc_ky_text = cols.nth(2).inner_text().strip()
+                hoc_ky_text = cols[2]["text"].strip()
                 # Parse học kỳ: chỉ lấy số, bỏ qua text như "Số TC tự chọn: 6"
                 hoc_ky_match = re.search(r'(\d+)', hoc_ky_text)
                 if not hoc_ky_match:
@@ -223,24 +253,23 @@ def crawl_tien_do_hoc_tap(page: Page) -> List[Dict[str, Any]]:
                 hoc_ky = int(hoc_ky_match.group(1))
                 
                 # Cột 3: Bắt buộc (checkbox hoặc <code>HP Tự chọn</code>)
-                col3_html = cols.nth(3).inner_html()
+                col3_html = cols[3]["html"]
                 if "HP Tự chọn" in col3_html:
                     bat_buoc = 0  # HP tự chọn = không bắt buộc
                 else:
                     # Kiểm tra checkbox
-                    checkbox_elem = cols.nth(3).locator("input[type='checkbox'][checked]")
-                    bat_buoc = 1 if checkbox_elem.count() > 0 else 0
+                    bat_buoc = 1 if cols[3]["checked"] else 0
                 
                 # Cột 4: Số TC (loại bỏ HTML tags và parse số)
-                so_tc_html = cols.nth(4).inner_html()
+                so_tc_html = cols[4]["html"]
                 so_tc_text = re.sub(r'<[^>]+>', '', so_tc_html).strip()
                 # Extract số từ text (có thể có dạng "3" hoặc "Số TC: 3")
                 so_tc_match = re.search(r'(\d+)', so_tc_text)
                 so_tc = int(so_tc_match.group(1)) if so_tc_match else 0
                 
                 # Cột 5: Tình trạng + Điểm
-                status_html = cols.nth(5).inner_html()
-                status_text = cols.nth(5).inner_text().strip()
+                status_html = cols[5]["html"]
+                status_text = cols[5]["text"].strip()
                 
                 diem_t4 = None
                 diem_chu = None
@@ -274,18 +303,17 @@ def crawl_tien_do_hoc_tap(page: Page) -> List[Dict[str, Any]]:
                 print(f"⚠️ Lỗi khi đọc dòng {i}: {e}")
                 continue
         
-        print(f"✅ Đã lấy {len(data)} học phần tiến độ học tập.")
         return data
         
     except Exception as e:
         print(f"❌ Lỗi khi lấy tiến độ học tập: {e}")
         return []
 
-# ---------- Crawl Điểm Tổng kết ----------
+# ---------- Parse Điểm Tổng kết ----------
 
-def crawl_grades_summary(page: Page) -> List[Dict[str, Any]]:
+def parse_grades_summary(html: HtmlSource) -> List[Dict[str, Any]]:
     """
-    Lấy bảng tổng kết điểm theo học kỳ (future use)
+    Parse bảng tổng kết điểm theo học kỳ (future use)
     
     Returns:
         [
@@ -299,31 +327,23 @@ def crawl_grades_summary(page: Page) -> List[Dict[str, Any]]:
             ...
         ]
     """
-    print("🔍 Đang trích xuất dữ liệu tổng kết...")
-    
     try:
-        page.wait_for_selector("table", timeout=20000)
-        time.sleep(3)
-        
-        rows = page.locator("table tr.even.pointer")
+        rows = extract_table_rows(html, "table tr.even.pointer")
         data = []
         
-        for i in range(rows.count()):
-            row = rows.nth(i)
-            cols = row.locator("td")
-            
-            if cols.count() >= 12:
+        for i, cols in enumerate(rows):
+            if len(cols) >= 12:
                 try:
-                    hoc_ky = cols.nth(1).inner_text().strip()
+                    hoc_ky = cols[1]["text"].strip()
                     
                     # Skip nếu không phải dòng học kỳ
                     if not hoc_ky.startswith("Học kỳ"):
                         continue
                     
-                    diem_4 = cols.nth(4).inner_text().strip()
-                    diem_10 = cols.nth(5).inner_text().strip()
-                    xep_loai = cols.nth(8).inner_text().strip()
-                    tc_tich_luy = cols.nth(11).inner_text().strip()
+                    diem_4 = cols[4]["text"].strip()
+                    diem_10 = cols[5]["text"].strip()
+                    xep_loai = cols[8]["text"].strip()
+                    tc_tich_luy = cols[11]["text"].strip()
                     
                     data.append({
                         "HocKy": hoc_ky,
@@ -335,30 +355,416 @@ def crawl_grades_summary(page: Page) -> List[Dict[str, Any]]:
                 except Exception as e:
                     print(f"⚠️ Lỗi khi đọc dòng {i}: {e}")
         
-        print(f"✅ Đã lấy {len(data)} học kỳ tổng kết.")
         return data
     except Exception as e:
         print(f"❌ Lỗi khi lấy tổng kết: {e}")
         return []
 
+# ---------- Crawl (Playwright adapters) ----------
+# Mỗi crawl_* chỉ đợi trang sẵn sàng, lấy page.content() MỘT lần rồi giao cho parse_*
+
+PAGE_READY_TIMEOUT = 20000
+PROFILE_READY_SELECTOR = "div.profile-usertitle-name"
+GRADES_READY_SELECTOR = "table tr.even.pointer"
+TIEN_DO_READY_SELECTOR = "table.jambo_table tbody tr"
+
+def crawl_student_info(page: Page) -> Dict[str, str]:
+    """Lấy thông tin cá nhân sinh viên từ profile page đang mở"""
+    try:
+        # Wait for page load
+        page.wait_for_selector(PROFILE_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy thông tin: {e}")
+        return {}
+    
+    info = parse_student_info(page.content())
+    if info:
+        print(f"✅ Lấy thông tin SV: {info['StudentID']} - {info['ho_va_ten']}")
+    return info
+
+def crawl_student_grades(page: Page) -> List[Dict[str, Any]]:
+    """Lấy danh sách điểm từ trang điểm đang mở"""
+    print("🔍 Đang trích xuất dữ liệu điểm...")
+    
+    try:
+        page.wait_for_selector(GRADES_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy điểm: {e}")
+        return []
+    
+    data = parse_student_grades(page.content())
+    print(f"✅ Đã lấy {len(data)} môn học.")
+    return data
+
+def crawl_tien_do_hoc_tap(page: Page) -> List[Dict[str, Any]]:
+    """Lấy tiến độ học tập từ trang học phần còn lại đang mở"""
+    print("🔍 Đang trích xuất dữ liệu tiến độ học tập...")
+    
+    try:
+        page.wait_for_selector(TIEN_DO_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy tiến độ học tập: {e}")
+        return []
+    
+    data = parse_tien_do_hoc_tap(page.content())
+    print(f"✅ Đã lấy {len(data)} học phần tiến độ học tập.")
+    return data
+
+def crawl_grades_summary(page: Page) -> List[Dict[str, Any]]:
+    """Lấy bảng tổng kết điểm theo học kỳ từ trang điểm (/sv/diem) đang mở"""
+    print("🔍 Đang trích xuất dữ liệu tổng kết...")
+    
+    try:
+        page.wait_for_selector(GRADES_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy tổng kết: {e}")
+        return []
+    
+    data = parse_grades_summary(page.content())
+    print(f"✅ Đã lấy {len(data)} học kỳ tổng kết.")
+    return data
+
 # ---------- Main Scraper Function ----------
 
+# Đổi portal bằng biến môi trường VKU_PORTAL_URL (VD: http://127.0.0.1:8765 của mock_portal.py)
+PROFILE_URL = f"{PORTAL_BASE_URL}/sv/hoso"
+DIEM_URL = f"{PORTAL_BASE_URL}/sv/diem"
+TIEN_DO_URL = f"{PORTAL_BASE_URL}/sv/hoc-phan-con-lai"
+
+PORTAL_PAGES = {
+    "profile": PROFILE_URL,
+    "diem": DIEM_URL,
+    "tien_do": TIEN_DO_URL,
+}
+
+# Điều kiện sẵn sàng của từng trang: chính bảng/khối dữ liệu cần đọc đã có trong DOM
+PAGE_READY_SELECTORS = {
+    "profile": PROFILE_READY_SELECTOR,
+    "diem": GRADES_READY_SELECTOR,
+    "tien_do": TIEN_DO_READY_SELECTOR,
+}
+
+# Trình tự điều hướng trong page mới (about:blank) - không chờ load như page.goto,
+# nhờ vậy cả 3 trang được tải song song trong cùng một context
+_NAVIGATE_JS = "(url) => { setTimeout(() => { window.location.href = url; }, 0); }"
+
+# Khoảng nghỉ giữa các lượt kiểm tra trang nào đã sẵn sàng (ms)
+PAGE_POLL_INTERVAL = 50
+
+def _page_ready(page: Page, selector: str) -> bool:
+    try:
+        return page.query_selector(selector) is not None
+    except Exception:
+        # Trang đang điều hướng (execution context bị thay) - lượt sau kiểm tra lại
+        return False
+
+def load_pages_concurrently(
+    context: BrowserContext,
+    urls: Dict[str, str],
+    timeout: int = PAGE_READY_TIMEOUT
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Mở mỗi URL trong một page riêng của context, tải đồng thời và lấy HTML
+    khi bảng dữ liệu của trang đã sẵn sàng
+    
+    Sync API không chờ được nhiều page cùng lúc, nên các trang được kiểm tra xoay vòng
+    (mỗi PAGE_POLL_INTERVAL ms): trang nào thấy bảng dữ liệu lần đầu thì ghi thời gian ngay
+    lúc đó, không phụ thuộc trang khác. timeout là deadline chung của cả lượt tải.
+    
+    Returns:
+        (
+            {"profile": "<html>...", ...},
+            {"profile": 1.23, ...}   # thời gian từ lúc trang bắt đầu điều hướng đến khi sẵn sàng (giây)
+        )
+    """
+    deadline = time.perf_counter() + timeout / 1000
+    pages = {}
+    navigated_at = {}
+    for name, url in urls.items():
+        page = context.new_page()
+        navigated_at[name] = time.perf_counter()
+        page.evaluate(_NAVIGATE_JS, url)
+        pages[name] = page
+    
+    timings = {}
+    pending = dict(pages)
+    while pending:
+        for name, page in list(pending.items()):
+            if _page_ready(page, PAGE_READY_SELECTORS[name]):
+                timings[name] = round(time.perf_counter() - navigated_at[name], 3)
+                del pending[name]
+        if not pending or time.perf_counter() >= deadline:
+            break
+        # wait_for_timeout vẫn xử lý event của Playwright nên các trang tiếp tục tải
+        next(iter(pending.values())).wait_for_timeout(PAGE_POLL_INTERVAL)
+    
+    for name in pending:
+        # Trang không có dữ liệu (VD: SV mới chưa có điểm) - vẫn parse phần đã có
+        print(f"⚠️ Trang {name} chưa sẵn sàng sau {timeout}ms")
+        timings[name] = round(time.perf_counter() - navigated_at[name], 3)
+    
+    html = {}
+    for name, page in pages.items():
+        try:
+            # Playwright coi timeout=0 là không giới hạn - còn ít nhất 1ms
+            remaining = max(1, int((deadline - time.perf_counter()) * 1000))
+            page.wait_for_load_state("domcontentloaded", timeout=remaining)
+        except Exception as e:
+            print(f"⚠️ Trang {name} chưa tải xong: {e}")
+        html[name] = page.content()
+        page.close()
+    
+    return html, timings
+
+# ---------- Trace ----------
+
+# Playwright trace (opt-in): ghi trace cho các lần tải trang bằng browser chậm hơn ngưỡng
+TRACE_SLOW_MS = float(os.environ.get("SCRAPE_TRACE_SLOW_MS", "0"))
+TRACE_DIR = os.environ.get("SCRAPE_TRACE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+
+def trace_path(label: str = "scrape") -> str:
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    return os.path.join(TRACE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{label}-{os.getpid()}-{time.perf_counter_ns()}.zip")
+
+def start_trace(context: BrowserContext) -> bool:
+    """Bật tracing cho context nếu SCRAPE_TRACE_SLOW_MS > 0"""
+    if TRACE_SLOW_MS <= 0:
+        return False
+    try:
+        context.tracing.start(snapshots=True, screenshots=False)
+        return True
+    except Exception as e:
+        print(f"⚠️ Không bật được trace: {e}")
+        return False
+
+def finish_trace(context: BrowserContext, elapsed: float, result: Dict[str, Any]) -> None:
+    """Lưu trace nếu lần tải chậm hơn ngưỡng, không thì bỏ"""
+    try:
+        if elapsed * 1000 >= TRACE_SLOW_MS:
+            path = trace_path()
+            context.tracing.stop(path=path)
+            result["trace"] = path
+            print(f"🐢 Tải trang chậm ({elapsed:.2f}s) - đã lưu trace: {path}")
+        else:
+            context.tracing.stop()
+    except Exception as e:
+        print(f"⚠️ Lỗi khi lưu trace: {e}")
+
+# ---------- Portal Snapshot ----------
+
+class PortalSnapshot:
+    """
+    HTML của các trang portal trong một lần scrape - mỗi trang chỉ tải MỘT lần
+    và được dùng chung cho mọi extractor cần nó (VD: /sv/diem cho cả điểm và tổng kết)
+    """
+    
+    def __init__(self, pages: Dict[str, str], source: str, timings: Optional[Dict[str, float]] = None):
+        self.pages = pages
+        self.source = source
+        self.timings = timings or {}
+        self._soups: Dict[str, BeautifulSoup] = {}
+    
+    def html(self, name: str) -> str:
+        return self.pages.get(name, "")
+    
+    def soup(self, name: str) -> BeautifulSoup:
+        """Soup của trang (parse lần đầu rồi cache)"""
+        if name not in self._soups:
+            self._soups[name] = _make_soup(self.html(name))
+        return self._soups[name]
+
+# Mỗi section lấy từ trang nào, bằng parser nào
+SNAPSHOT_EXTRACTORS: Dict[str, Tuple[str, Callable[[HtmlSource], Any]]] = {
+    "student_info": ("profile", parse_student_info),
+    "grades": ("diem", parse_student_grades),
+    "summary": ("diem", parse_grades_summary),
+    "tien_do": ("tien_do", parse_tien_do_hoc_tap),
+}
+
+def extract_snapshot(snapshot: PortalSnapshot) -> Dict[str, Any]:
+    """
+    Chạy tất cả extractor trên snapshot
+    
+    Returns:
+        {"student_info": {...}, "grades": [...], "summary": [...], "tien_do": [...]}
+    """
+    return {
+        section: parser(snapshot.soup(page_name))
+        for section, (page_name, parser) in SNAPSHOT_EXTRACTORS.items()
+    }
+
+def _fill_result(snapshot: PortalSnapshot, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Trích xuất snapshot và điền vào result"""
+    result["source"] = snapshot.source
+    # Giữ thời gian launch/acquire browser đã ghi trước đó
+    result["timings"] = {**result.get("timings", {}), **snapshot.timings}
+    result["pages"] = snapshot.pages
+    
+    started = time.perf_counter()
+    extracted = extract_snapshot(snapshot)
+    result["timings"]["extract"] = round(time.perf_counter() - started, 3)
+    if not extracted["student_info"]:
+        print("❌ Không lấy được thông tin sinh viên!")
+        return result
+    
+    result.update(extracted)
+    result["success"] = True
+    
+    _print_summary(result)
+    return result
+
+def _print_summary(result: Dict[str, Any]) -> None:
+    print("\n" + "=" * 60)
+    print(f"✅ SCRAPE THÀNH CÔNG! (qua {result.get('source')})")
+    print(f"  - Student: {result['student_info'].get('StudentID')}")
+    print(f"  - Grades: {len(result['grades'])} môn")
+    print(f"  - Tiến độ: {len(result['tien_do'])} học phần")
+    print(f"  - Summary: {len(result['summary'])} học kỳ")
+    for name, elapsed in result.get("timings", {}).items():
+        print(f"  - ⏱️ {name}: {elapsed:.2f}s")
+    if result.get("requests"):
+        requests_stats = result["requests"]
+        print(f"  - 🚫 Chặn {requests_stats['blocked_requests']} request "
+              f"(~{requests_stats['estimated_bytes_saved'] // 1024} KB)")
+    print("=" * 60)
+
+def ensure_profile_page(pages: Dict[str, str]) -> None:
+    """
+    Trang hồ sơ khi đã đăng nhập luôn có khối tên sinh viên - thiếu nghĩa là portal trả
+    trang khác (VD: đăng nhập) với status 200 mà vku_http không nhận ra
+    
+    Raises:
+        LoginRedirectError
+    """
+    if "profile-usertitle-name" not in pages.get("profile", ""):
+        raise LoginRedirectError(PROFILE_URL, "trang hồ sơ không có thông tin sinh viên")
+
+def scrape_with_http(session_file: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scrape bằng httpx với cookies trong session_file (không mở browser)
+    
+    Raises:
+        LoginRedirectError: Nếu session không còn hợp lệ
+    """
+    print("\n🌐 Đang lấy dữ liệu qua HTTP...")
+    started = time.perf_counter()
+    pages, timings = fetch_pages(PORTAL_PAGES, session_file)
+    timings["total"] = round(time.perf_counter() - started, 3)
+    ensure_profile_page(pages)
+    
+    return _fill_result(PortalSnapshot(pages, "http", timings), result)
+
+def new_session_context(browser: Browser, session_file: str) -> Optional[BrowserContext]:
+    """
+    Tạo BrowserContext riêng cho một session (cookies + localStorage)
+    
+    Returns:
+        None nếu không có session file
+    """
+    if not session_file or not os.path.exists(session_file):
+        print(f"⚠️ Session file không tồn tại: {session_file}")
+        return None
+    
+    with open(session_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    
+    # Storage state (session_get.py) nạp thẳng vào context, format cũ (array cookies) thì add_cookies
+    if isinstance(data, dict) and "cookies" in data:
+        return browser.new_context(storage_state=data)
+    
+    context = browser.new_context()
+    load_session(context, session_file)
+    return context
+
+def scrape_in_browser(
+    browser: Browser,
+    session_file: str,
+    result: Dict[str, Any],
+    allow_login: bool = False,
+    route_policy: Optional[RoutePolicy] = None
+) -> Dict[str, Any]:
+    """
+    Scrape bằng một browser đã mở sẵn (VD: lấy từ BrowserPool)
+    Context được tạo riêng cho session này và đóng lại khi xong
+    
+    Args:
+        allow_login: Nếu True và chưa có session, mở trang để user đăng nhập (chỉ dùng khi chạy tay)
+        route_policy: Policy chặn ảnh/font/CSS/tracker (mặc định đọc từ env)
+    """
+    context = new_session_context(browser, session_file)
+    route_stats = None
+    tracing = False
+    
+    try:
+        if context is not None:
+            route_stats = apply_route_policy(context, route_policy)
+            tracing = start_trace(context)
+        else:
+            if not allow_login:
+                print("❌ Chưa có session - không thể scrape")
+                return result
+            
+            print("\n⚠️ Session mới - Yêu cầu đăng nhập")
+            context = browser.new_context()
+            page = context.new_page()
+            page.goto(PROFILE_URL)
+            login_with_browser(PROFILE_URL)
+            save_session(context, session_file)
+        
+        print("\n📋 Đang tải đồng thời trang hồ sơ, điểm và tiến độ học tập...")
+        started = time.perf_counter()
+        pages, timings = load_pages_concurrently(context, PORTAL_PAGES)
+        timings["total"] = round(time.perf_counter() - started, 3)
+        if tracing:
+            finish_trace(context, timings["total"], result)
+    finally:
+        if context is not None:
+            context.close()
+    
+    if route_stats is not None:
+        result["requests"] = route_stats.to_dict()
+    return _fill_result(PortalSnapshot(pages, "browser", timings), result)
+
+def scrape_with_browser(headless: bool, session_file: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Scrape bằng một Chromium mới (fallback khi HTTP bị redirect về trang đăng nhập)"""
+    with sync_playwright() as p:
+        started = time.perf_counter()
+        browser = p.chromium.launch(headless=headless)
+        result["timings"]["launch"] = round(time.perf_counter() - started, 3)
+        try:
+            return scrape_in_browser(browser, session_file, result, allow_login=True)
+        finally:
+            browser.close()
+
 def scrape_vku_data(
     headless: bool = False,
-    session_file: str = "session.json"
+    session_file: str = "session.json",
+    use_http: bool = True,
+    browser_pool: Optional["BrowserPool"] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Main function - Scrape tất cả dữ liệu từ VKU
     
+    Mặc định lấy HTML qua HTTP bằng cookies của session (nhanh, không cần browser),
+    chỉ mở Chromium khi portal redirect về trang đăng nhập.
+    
     Args:
-        headless: Nếu True, chạy ẩn browser
+        headless: Nếu True, chạy ẩn browser (khi phải fallback sang Playwright)
         session_file: Path đến file session
+        use_http: Nếu False, luôn dùng Playwright
+        browser_pool: Nếu có, fallback Playwright dùng browser trong pool thay vì launch mới
     
     Returns:
         {
             "student_info": {...},
             "grades": [...],
+            "tien_do": [...],
             "summary": [...],
+            "source": "http" | "browser",
+            "timings": {"profile": 0.4, "diem": 0.6, "tien_do": 0.5, "total": 0.6, "extract": 0.05},
+                                                   # + "launch"/"acquire" khi dùng browser
+            "pages": {"profile": "<html>...", ...},   # HTML thô (cho snapshot archive)
+            "trace": "traces/...zip",                 # chỉ có khi tải bằng browser chậm hơn SCRAPE_TRACE_SLOW_MS
             "success": True
         }
     """
@@ -366,71 +772,34 @@ def scrape_vku_data(
     print("🚀 VKU SCRAPER - LẤY DỮ LIỆU")
     print("=" * 60)
     
-    profile_url = "https://daotao.vku.udn.vn/sv/hoso"
-    diem_url = "https://daotao.vku.udn.vn/sv/diem"
-    
     result = {
         "student_info": {},
         "grades": [],
+        "tien_do": [],
         "summary": [],
+        "source": None,
+        "timings": {},
         "success": False
     }
     
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=headless)
-            context = browser.new_context()
-            
-            # Load hoặc tạo session mới
-            if not load_session(context, session_file):
-                print("\n⚠️ Session mới - Yêu cầu đăng nhập")
-                page = context.new_page()
-                page.goto(profile_url)
-                login_with_browser(profile_url)
-                save_session(context, session_file)
-            
-            # Crawl thông tin cá nhân
-            print("\n📋 Đang lấy thông tin cá nhân...")
-            page = context.new_page()
-            page.goto(profile_url)
-            student_info = crawl_student_info(page)
-            
-            if not student_info:
-                print("❌ Không lấy được thông tin sinh viên!")
-                browser.close()
-                return result
-            
-            result["student_info"] = student_info
-            
-            # Crawl điểm
-            print("\n📊 Đang lấy dữ liệu điểm...")
-            page.goto(diem_url)
-            grades = crawl_student_grades(page)
-            result["grades"] = grades
-            
-            # Crawl tiến độ học tập
-            print("\n📈 Đang lấy dữ liệu tiến độ học tập...")
-            tien_do_url = "https://daotao.vku.udn.vn/sv/hoc-phan-con-lai"
-            page.goto(tien_do_url)
-            tien_do = crawl_tien_do_hoc_tap(page)
-            result["tien_do"] = tien_do
-            
-            # Crawl tổng kết (nếu cần)
-            print("\n📋 Đang lấy dữ liệu tổng kết...")
-            summary = crawl_grades_summary(page)
-            result["summary"] = summary
-            
-            result["success"] = True
+        if use_http:
+            try:
+                return scrape_with_http(session_file, result)
+            except LoginRedirectError as e:
+                print(f"⚠️ {e} - chuyển sang Playwright")
+        
+        if browser_pool is not None:
+            requested = time.perf_counter()
             
-            print("\n" + "=" * 60)
-            print("✅ SCRAPE THÀNH CÔNG!")
-            print(f"  - Student: {student_info.get('StudentID')}")
-            print(f"  - Grades: {len(grades)} môn")
-            print(f"  - Tiến độ: {len(tien_do)} học phần")
-            print(f"  - Summary: {len(summary)} học kỳ")
-            print("=" * 60)
+            def _run(browser: Browser) -> Dict[str, Any]:
+                # Thời gian chờ browser của pool (xếp hàng + launch nếu chưa có)
+                result["timings"]["acquire"] = round(time.perf_counter() - requested, 3)
+                return scrape_in_browser(browser, session_file, result)
             
-            browser.close()
+            return browser_pool.run(_run)
+        
+        return scrape_with_browser(headless, session_file, result)
             
     except Exception as e:
         print(f"\n❌ Lỗi: {e}")
@@ -0,0 +1,495 @@
+"""
+VKU Scraper Async - Bản playwright.async_api của pipeline scrape
+
+Chạy trên event loop của server: nhiều lần scrape dùng chung một (hoặc vài) Chromium,
+mỗi lần scrape chỉ là một coroutine + một BrowserContext, không cần một OS thread riêng.
+Parser (parse_*), PortalSnapshot và các hằng số dùng chung với vku_scraper.py;
+bản sync vẫn giữ nguyên cho UI_main.py và chạy tay.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Tuple, TypeVar
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+from vku_http import fetch_pages_async, LoginRedirectError
+from route_policy import RoutePolicy, apply_route_policy_async
+from vku_scraper import (
+    parse_student_info,
+    parse_student_grades,
+    parse_tien_do_hoc_tap,
+    parse_grades_summary,
+    PAGE_READY_TIMEOUT,
+    PROFILE_READY_SELECTOR,
+    GRADES_READY_SELECTOR,
+    TIEN_DO_READY_SELECTOR,
+    PORTAL_PAGES,
+    PAGE_READY_SELECTORS,
+    ensure_profile_page,
+    PortalSnapshot,
+    TRACE_SLOW_MS,
+    trace_path,
+    _fill_result,
+)
+
+T = TypeVar("T")
+
+# ---------- Crawl (async Playwright adapters) ----------
+
+async def crawl_student_info(page: Page) -> Dict[str, str]:
+    """Lấy thông tin cá nhân sinh viên từ profile page đang mở"""
+    try:
+        await page.wait_for_selector(PROFILE_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy thông tin: {e}")
+        return {}
+
+    info = parse_student_info(await page.content())
+    if info:
+        print(f"✅ Lấy thông tin SV: {info['StudentID']} - {info['ho_va_ten']}")
+    return info
+
+async def crawl_student_grades(page: Page) -> List[Dict[str, Any]]:
+    """Lấy danh sách điểm từ trang điểm đang mở"""
+    print("🔍 Đang trích xuất dữ liệu điểm...")
+
+    try:
+        await page.wait_for_selector(GRADES_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy điểm: {e}")
+        return []
+
+    data = parse_student_grades(await page.content())
+    print(f"✅ Đã lấy {len(data)} môn học.")
+    return data
+
+async def crawl_tien_do_hoc_tap(page: Page) -> List[Dict[str, Any]]:
+    """Lấy tiến độ học tập từ trang học phần còn lại đang mở"""
+    print("🔍 Đang trích xuất dữ liệu tiến độ học tập...")
+
+    try:
+        await page.wait_for_selector(TIEN_DO_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy tiến độ học tập: {e}")
+        return []
+
+    data = parse_tien_do_hoc_tap(await page.content())
+    print(f"✅ Đã lấy {len(data)} học phần tiến độ học tập.")
+    return data
+
+async def crawl_grades_summary(page: Page) -> List[Dict[str, Any]]:
+    """Lấy bảng tổng kết điểm theo học kỳ từ trang điểm (/sv/diem) đang mở"""
+    print("🔍 Đang trích xuất dữ liệu tổng kết...")
+
+    try:
+        await page.wait_for_selector(GRADES_READY_SELECTOR, timeout=PAGE_READY_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Lỗi khi lấy tổng kết: {e}")
+        return []
+
+    data = parse_grades_summary(await page.content())
+    print(f"✅ Đã lấy {len(data)} học kỳ tổng kết.")
+    return data
+
+# ---------- Trace ----------
+
+async def start_trace(context: BrowserContext) -> bool:
+    """Bản async của vku_scraper.start_trace"""
+    if TRACE_SLOW_MS <= 0:
+        return False
+    try:
+        await context.tracing.start(snapshots=True, screenshots=False)
+        return True
+    except Exception as e:
+        print(f"⚠️ Không bật được trace: {e}")
+        return False
+
+async def finish_trace(context: BrowserContext, elapsed: float, result: Dict[str, Any]) -> None:
+    """Bản async của vku_scraper.finish_trace"""
+    try:
+        if elapsed * 1000 >= TRACE_SLOW_MS:
+            path = trace_path()
+            await context.tracing.stop(path=path)
+            result["trace"] = path
+            print(f"🐢 Tải trang chậm ({elapsed:.2f}s) - đã lưu trace: {path}")
+        else:
+            await context.tracing.stop()
+    except Exception as e:
+        print(f"⚠️ Lỗi khi lưu trace: {e}")
+
+# ---------- Page loading ----------
+
+async def load_pages_concurrently(
+    context: BrowserContext,
+    urls: Dict[str, str],
+    timeout: int = PAGE_READY_TIMEOUT
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Mở mỗi URL trong một page riêng của context và tải đồng thời (asyncio.gather),
+    lấy HTML khi bảng dữ liệu của trang đã sẵn sàng. timeout là deadline chung của cả
+    goto lẫn chờ bảng dữ liệu, không cộng dồn
+
+    Returns:
+        (
+            {"profile": "<html>...", ...},
+            {"profile": 1.23, ...}   # thời gian từ lúc trang bắt đầu điều hướng đến khi sẵn sàng (giây)
+        )
+    """
+    deadline = time.perf_counter() + timeout / 1000
+    html = {}
+    timings = {}
+
+    def _remaining_ms() -> int:
+        # Playwright coi timeout=0 là không giới hạn - còn ít nhất 1ms
+        return max(1, int((deadline - time.perf_counter()) * 1000))
+
+    async def _load(name: str, url: str) -> None:
+        page = await context.new_page()
+        started = time.perf_counter()
+        try:
+            try:
+                # wait_until="commit": không chờ load, chỉ chờ bảng dữ liệu xuất hiện
+                await page.goto(url, wait_until="commit", timeout=_remaining_ms())
+                await page.wait_for_selector(PAGE_READY_SELECTORS[name], timeout=_remaining_ms())
+            except Exception as e:
+                # Trang không có dữ liệu (VD: SV mới chưa có điểm) - vẫn parse phần đã có
+                print(f"⚠️ Trang {name} chưa sẵn sàng: {e}")
+            timings[name] = round(time.perf_counter() - started, 3)
+            html[name] = await page.content()
+        finally:
+            await page.close()
+
+    await asyncio.gather(*(_load(name, url) for name, url in urls.items()))
+    return html, timings
+
+# ---------- Browser pool ----------
+
+class _BrowserSlot:
+    """Một Chromium trong AsyncBrowserPool, dùng chung cho nhiều context"""
+
+    def __init__(self, index: int):
+        self.name = f"async-browser-{index}"
+        self.browser: Optional[Browser] = None
+        self.uses = 0
+        self.active = 0          # Context đang mở trên self.browser
+        self.recycles = 0
+        # Browser đã bị thay (VD: Chromium crash) nhưng còn job đang mở context -> số context còn lại
+        self.retired: Dict[Browser, int] = {}
+        self.lock = asyncio.Lock()
+
+class AsyncBrowserPool:
+    """
+    Pool Chromium trên event loop của server
+
+    Mỗi Chromium phục vụ đồng thời nhiều BrowserContext (mỗi lần scrape một context).
+    Job sync (VD: VKUScraperManager chạy trong worker thread) gửi coroutine về
+    event loop qua run_threadsafe.
+
+    Usage:
+        pool = AsyncBrowserPool(size=1, max_concurrency=8)
+        await pool.start()
+        result = await pool.run(lambda browser: scrape_in_browser(browser, session_file, result))
+        await pool.stop()
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_concurrency: int = 8,
+        headless: bool = True,
+        max_uses: int = 50,
+        task_timeout: float = 120.0,
+        launch_args: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            size: Số Chromium
+            max_concurrency: Số context (lần scrape) chạy đồng thời tối đa trên cả pool
+            headless: Chạy ẩn browser
+            max_uses: Recycle browser sau N lần dùng, khi không còn context nào đang mở (0 = không giới hạn)
+            task_timeout: Thời gian tối đa cho một job (giây)
+        """
+        self.size = max(1, size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.headless = headless
+        self.max_uses = max_uses
+        self.task_timeout = task_timeout
+        self.launch_args = launch_args or []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.slots: List[_BrowserSlot] = []
+        self._playwright: Optional[Playwright] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    async def start(self) -> None:
+        """Khởi động Playwright driver (Chromium chỉ được launch khi có job đầu tiên)"""
+        if self._playwright is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._playwright = await async_playwright().start()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.slots = [_BrowserSlot(i) for i in range(self.size)]
+        print(f"🌐 Async browser pool started ({self.size} browsers, {self.max_concurrency} contexts)")
+
+    async def stop(self) -> None:
+        """Đóng tất cả browser và dừng Playwright driver"""
+        if self._playwright is None:
+            return
+        for slot in self.slots:
+            await self._close_browser(slot)
+            for browser in list(slot.retired):
+                await self._close_retired(slot, browser)
+        await self._playwright.stop()
+        self._playwright = None
+        self.slots = []
+        print("🌐 Async browser pool stopped")
+
+    async def _close_browser(self, slot: _BrowserSlot) -> None:
+        if slot.browser is not None:
+            try:
+                await slot.browser.close()
+            except Exception as e:
+                print(f"⚠️ [{slot.name}] Lỗi khi đóng browser: {e}")
+            slot.browser = None
+
+    async def _close_retired(self, slot: _BrowserSlot, browser: Browser) -> None:
+        slot.retired.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception as e:
+            print(f"⚠️ [{slot.name}] Lỗi khi đóng browser cũ: {e}")
+
+    async def _acquire(self) -> Tuple[_BrowserSlot, Browser]:
+        """Chọn Chromium đang ít context nhất, launch/recycle nếu cần"""
+        slot = min(self.slots, key=lambda s: s.active)
+        async with slot.lock:
+            if slot.browser is not None and not slot.browser.is_connected():
+                # Chromium crash: job mới dùng browser mới ngay, không chờ các job đang mở context
+                # trên browser cũ - browser cũ được đóng khi job cuối cùng của nó trả về (_release)
+                print(f"♻️ [{slot.name}] Chromium mất kết nối - thay browser mới ({slot.active} job còn trên browser cũ)")
+                if slot.active:
+                    slot.retired[slot.browser] = slot.active
+                    slot.browser = None
+                else:
+                    await self._close_browser(slot)
+                slot.active = 0
+                slot.recycles += 1
+            elif slot.browser is not None and slot.active == 0 and self.max_uses and slot.uses >= self.max_uses:
+                print(f"♻️ [{slot.name}] Recycle Chromium sau {slot.uses} lần dùng")
+                await self._close_browser(slot)
+                slot.recycles += 1
+            if slot.browser is None:
+                slot.browser = await self._playwright.chromium.launch(
+                    headless=self.headless,
+                    args=self.launch_args,
+                )
+                slot.uses = 0
+                print(f"🌐 [{slot.name}] Đã khởi động Chromium")
+            slot.active += 1
+            return slot, slot.browser
+
+    async def _release(self, slot: _BrowserSlot, browser: Browser) -> None:
+        """Job xong: trả context về browser hiện tại, hoặc đóng browser cũ khi job cuối của nó xong"""
+        async with slot.lock:
+            if browser is slot.browser:
+                slot.active -= 1
+                slot.uses += 1
+                return
+            remaining = slot.retired.get(browser, 1) - 1
+            if remaining > 0:
+                slot.retired[browser] = remaining
+                return
+            await self._close_retired(slot, browser)
+
+    async def run(self, fn: Callable[[Browser], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Chạy await fn(browser) trên một browser của pool"""
+        if self._playwright is None:
+            await self.start()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            slot, browser = await self._acquire()
+            try:
+                return await asyncio.wait_for(fn(browser), timeout=timeout or self.task_timeout)
+            finally:
+                await self._release(slot, browser)
+        finally:
+            self._semaphore.release()
+
+    def run_threadsafe(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Chạy coroutine trên event loop của pool từ một thread khác và chờ kết quả
+        (VD: VKUScraperManager.scrape_and_sync chạy trong worker của ScrapeJobManager)
+        """
+        if self.loop is None:
+            coro.close()
+            raise RuntimeError("AsyncBrowserPool chưa được start trên event loop")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            coro.close()
+            raise RuntimeError("run_threadsafe không được gọi từ chính event loop của pool (dùng await)")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout=(timeout or self.task_timeout) + 30)
+
+    def stats(self) -> Dict[str, Any]:
+        """Trạng thái pool (dùng cho endpoint debug/monitoring)"""
+        return {
+            "mode": "async",
+            "size": self.size,
+            "max_concurrency": self.max_concurrency,
+            "queued": self._waiting,
+            "busy": sum(slot.active + sum(slot.retired.values()) for slot in self.slots),
+            "browsers": [
+                {
+                    "name": slot.name,
+                    "launched": slot.browser is not None,
+                    "active_contexts": slot.active,
+                    "retired_contexts": sum(slot.retired.values()),
+                    "uses": slot.uses,
+                    "recycles": slot.recycles,
+                }
+                for slot in self.slots
+            ],
+        }
+
+# ---------- Main Scraper Function ----------
+
+async def new_session_context(browser: Browser, session_file: str) -> Optional[BrowserContext]:
+    """
+    Tạo BrowserContext riêng cho một session (cookies + localStorage)
+
+    Returns:
+        None nếu không có session file
+    """
+    if not session_file or not os.path.exists(session_file):
+        print(f"⚠️ Session file không tồn tại: {session_file}")
+        return None
+
+    with open(session_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Storage state (session_get.py) nạp thẳng vào context, format cũ (array cookies) thì add_cookies
+    if isinstance(data, dict) and "cookies" in data:
+        return await browser.new_context(storage_state=data)
+
+    context = await browser.new_context()
+    await context.add_cookies(data)
+    return context
+
+async def scrape_with_http(session_file: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scrape bằng httpx.AsyncClient với cookies trong session_file (không mở browser)
+
+    Raises:
+        LoginRedirectError: Nếu session không còn hợp lệ
+    """
+    print("\n🌐 Đang lấy dữ liệu qua HTTP (async)...")
+    started = time.perf_counter()
+    pages, timings = await fetch_pages_async(PORTAL_PAGES, session_file)
+    timings["total"] = round(time.perf_counter() - started, 3)
+    ensure_profile_page(pages)
+
+    # Parse HTML tốn CPU - chạy ngoài event loop để không chặn các request khác
+    return await asyncio.to_thread(_fill_result, PortalSnapshot(pages, "http", timings), result)
+
+async def scrape_in_browser(
+    browser: Browser,
+    session_file: str,
+    result: Dict[str, Any],
+    route_policy: Optional[RoutePolicy] = None
+) -> Dict[str, Any]:
+    """
+    Scrape bằng một browser đã mở sẵn (VD: lấy từ AsyncBrowserPool)
+    Context được tạo riêng cho session này và đóng lại khi xong
+    """
+    context = await new_session_context(browser, session_file)
+    if context is None:
+        print("❌ Chưa có session - không thể scrape")
+        return result
+
+    try:
+        route_stats = await apply_route_policy_async(context, route_policy)
+        tracing = await start_trace(context)
+        print("\n📋 Đang tải đồng thời trang hồ sơ, điểm và tiến độ học tập...")
+        started = time.perf_counter()
+        pages, timings = await load_pages_concurrently(context, PORTAL_PAGES)
+        timings["total"] = round(time.perf_counter() - started, 3)
+        if tracing:
+            await finish_trace(context, timings["total"], result)
+    finally:
+        await context.close()
+
+    result["requests"] = route_stats.to_dict()
+    return await asyncio.to_thread(_fill_result, PortalSnapshot(pages, "browser", timings), result)
+
+async def scrape_vku_data_async(
+    headless: bool = True,
+    session_file: str = "session.json",
+    use_http: bool = True,
+    browser_pool: Optional[AsyncBrowserPool] = None
+) -> Dict[str, Any]:
+    """
+    Bản async của vku_scraper.scrape_vku_data - cùng format kết quả
+
+    Mặc định lấy HTML qua HTTP (async), chỉ dùng Chromium khi portal redirect về trang đăng nhập.
+
+    Args:
+        headless: Chạy ẩn browser (khi không có pool và phải launch Chromium riêng)
+        session_file: Path đến file session
+        use_http: Nếu False, luôn dùng Playwright
+        browser_pool: Nếu có, dùng Chromium trong pool thay vì launch mới
+    """
+    print("=" * 60)
+    print("🚀 VKU SCRAPER (ASYNC) - LẤY DỮ LIỆU")
+    print("=" * 60)
+
+    result = {
+        "student_info": {},
+        "grades": [],
+        "tien_do": [],
+        "summary": [],
+        "source": None,
+        "timings": {},
+        "success": False
+    }
+
+    try:
+        if use_http:
+            try:
+                return await scrape_with_http(session_file, result)
+            except LoginRedirectError as e:
+                print(f"⚠️ {e} - chuyển sang Playwright")
+
+        if browser_pool is not None:
+            requested = time.perf_counter()
+
+            async def _run(browser: Browser) -> Dict[str, Any]:
+                # Thời gian chờ browser của pool (chờ semaphore + launch nếu chưa có)
+                result["timings"]["acquire"] = round(time.perf_counter() - requested, 3)
+                return await scrape_in_browser(browser, session_file, result)
+
+            return await browser_pool.run(_run)
+
+        async with async_playwright() as p:
+            started = time.perf_counter()
+            browser = await p.chromium.launch(headless=headless)
+            result["timings"]["launch"] = round(time.perf_counter() - started, 3)
+            try:
+                return await scrape_in_browser(browser, session_file, result)
+            finally:
+                await browser.close()
+
+    except Exception as e:
+        print(f"\n❌ Lỗi: {e}")
+
+    return result
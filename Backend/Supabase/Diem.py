@@ -25,8 +25,8 @@ class DiemRepository(BaseRepository):
         """
         return self.insert_one(grade_data)
     
-    def bulk_insert_grades(self, grades_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Thêm nhiều bản ghi điểm"""
+    def bulk_insert_grades(self, grades_list: List[Any]) -> List[Dict[str, Any]]:
+        """Thêm nhiều bản ghi điểm (GradeRecord hoặc dict)"""
         return self.insert_many(grades_list)
     
     def update_grade(self, grade_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
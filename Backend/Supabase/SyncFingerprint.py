@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from .base import BaseRepository
+
+class SyncFingerprintRepository(BaseRepository):
+    """Repository cho bảng SyncFingerprint (hash nội dung lần sync gần nhất theo từng section)"""
+    
+    def __init__(self):
+        super().__init__("SyncFingerprint")
+    
+    def get_fingerprints(self, student_id: str, user_id: Optional[str] = None) -> Dict[str, str]:
+        """Lấy fingerprint của các section đã sync
+        
+        Returns:
+            {"student_info": "<sha256>", "grades": "<sha256>", ...}
+        """
+        try:
+            query = self.client.table(self.table_name).select("section, fingerprint").eq("StudentID", student_id)
+            if user_id:
+                query = query.eq("user_id", user_id)
+            response = query.execute()
+            return {row["section"]: row["fingerprint"] for row in (response.data or [])}
+        except Exception as e:
+            print(f"❌ Lỗi khi lấy fingerprint: {e}")
+            return {}
+    
+    def save_fingerprints(self, student_id: str, fingerprints: Dict[str, str], user_id: Optional[str] = None) -> bool:
+        """Lưu (upsert) fingerprint của các section vừa ghi xong"""
+        if not fingerprints:
+            return True
+        
+        now = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for section, fingerprint in fingerprints.items():
+            row = {
+                "StudentID": student_id,
+                "section": section,
+                "fingerprint": fingerprint,
+                "updated_at": now
+            }
+            if user_id:
+                row["user_id"] = user_id
+            rows.append(row)
+        
+        return len(self.upsert_many(rows, on_conflict="StudentID,section")) > 0
+    
+    def delete_by_student(self, student_id: str) -> bool:
+        """Xóa fingerprint của sinh viên (lần sync sau sẽ ghi lại toàn bộ)"""
+        return self.delete("StudentID", student_id)
+
+# Singleton instance
+sync_fingerprint_repo = SyncFingerprintRepository()
@@ -36,8 +36,8 @@ class TienDoHocTapRepository(BaseRepository):
         """
         return self.insert_one(progress_data)
     
-    def bulk_insert_academic_progress(self, progress_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Thêm nhiều bản ghi tiến độ học tập"""
+    def bulk_insert_academic_progress(self, progress_list: List[Any]) -> List[Dict[str, Any]]:
+        """Thêm nhiều bản ghi tiến độ học tập (ProgressRecord hoặc dict)"""
         return self.insert_many(progress_list)
     
     def update_academic_progress(self, progress_id: int, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -10,6 +10,7 @@ from .TienDoHocTap import tien_do_hoc_tap_repo, TienDoHocTapRepository
 from .DanhSachLopHP import danh_sach_lop_hp_repo, DanhSachLopHPRepository
 from .auth import auth_repo, AuthRepository
 from .course_schedule import course_schedule_repo, CourseScheduleRepository
+from .SyncFingerprint import sync_fingerprint_repo, SyncFingerprintRepository
 
 __all__ = [
     'supabase_client',
@@ -25,4 +26,6 @@ __all__ = [
     'AuthRepository',
     'course_schedule_repo',
     'CourseScheduleRepository',
+    'sync_fingerprint_repo',
+    'SyncFingerprintRepository',
 ]
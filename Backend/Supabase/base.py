@@ -1,6 +1,12 @@
 from typing import List, Dict, Optional, Any
 from .client import supabase_client
 
+
+def to_wire(data_list: List[Any]) -> List[Dict[str, Any]]:
+    """Record (records.py, có to_row) -> dict; dict giữ nguyên"""
+    return [row if isinstance(row, dict) else row.to_row() for row in data_list]
+
+
 class BaseRepository:
     """Base class cho các repository"""
     
@@ -39,10 +45,10 @@ class BaseRepository:
             print(f"❌ Lỗi khi thêm bản ghi vào {self.table_name}: {error_msg}")
             return None
     
-    def insert_many(self, data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Thêm nhiều bản ghi"""
+    def insert_many(self, data_list: List[Any]) -> List[Dict[str, Any]]:
+        """Thêm nhiều bản ghi (dict hoặc record trong records.py)"""
         try:
-            response = self.client.table(self.table_name).insert(data_list).execute()
+            response = self.client.table(self.table_name).insert(to_wire(data_list)).execute()
             print(f"✅ Đã thêm {len(data_list)} bản ghi vào {self.table_name}")
             return response.data if response.data else []
         except Exception as e:
@@ -52,6 +58,19 @@ class BaseRepository:
             print(f"❌ Lỗi khi thêm nhiều bản ghi vào {self.table_name}: {error_msg}")
             return []
     
+    def upsert_many(self, data_list: List[Any], on_conflict: str = "") -> List[Dict[str, Any]]:
+        """Thêm hoặc cập nhật nhiều bản ghi (theo khóa on_conflict, dict hoặc record)"""
+        try:
+            response = self.client.table(self.table_name).upsert(to_wire(data_list), on_conflict=on_conflict).execute()
+            print(f"✅ Đã upsert {len(data_list)} bản ghi vào {self.table_name}")
+            return response.data if response.data else []
+        except Exception as e:
+            error_msg = str(e)
+            if hasattr(e, 'message'):
+                error_msg = e.message
+            print(f"❌ Lỗi khi upsert bản ghi vào {self.table_name}: {error_msg}")
+            return []
+    
     def update(self, column: str, value: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Cập nhật bản ghi"""
         try:
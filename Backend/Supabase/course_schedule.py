@@ -1,5 +1,5 @@
 from typing import List, Dict, Optional, Any
-from .base import BaseRepository
+from .base import BaseRepository, to_wire
 
 class CourseScheduleRepository(BaseRepository):
     """Repository cho bảng course_schedule"""
@@ -52,5 +52,52 @@ class CourseScheduleRepository(BaseRepository):
             print(f"❌ Error getting courses by day: {e}")
             return []
 
+    # ---------- Import (course_schedule_importer.py) ----------
+    
+    def get_all_courses_paged(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Lấy toàn bộ lớp học phần theo từng trang (PostgREST giới hạn số dòng mỗi lần select)
+        
+        Raises:
+            Exception: Lỗi khi đọc - importer cần biết để không diff trên dữ liệu thiếu
+        """
+        rows = []
+        start = 0
+        while True:
+            response = (
+                self.client.table(self.table_name)
+                .select("*")
+                .order("stt_id")
+                .order("course_name")
+                .range(start, start + page_size - 1)
+                .execute()
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            start += page_size
+    
+    def upsert_courses(self, courses: List[Any]) -> None:
+        """
+        Thêm hoặc cập nhật lớp học phần theo khóa (stt_id, course_name)
+        
+        Args:
+            courses: CourseSection (records.py) hoặc dict
+        
+        Raises:
+            Exception: Nếu upsert lỗi
+        """
+        self.client.table(self.table_name).upsert(to_wire(courses), on_conflict="stt_id,course_name").execute()
+    
+    def delete_courses(self, course_name: str, stt_ids: List[int]) -> None:
+        """
+        Xóa các lớp của một môn theo danh sách stt_id
+        
+        Raises:
+            Exception: Nếu xóa lỗi
+        """
+        self.client.table(self.table_name).delete().eq("course_name", course_name).in_("stt_id", stt_ids).execute()
+
 # Khởi tạo repository instance
 course_schedule_repo = CourseScheduleRepository()
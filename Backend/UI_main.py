@@ -25,8 +25,8 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), 'ManualScrape/VKU_scraper'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'Supabase'))
 
-from vku_scraper import load_session, save_session
-from Supabase import sinh_vien_repo, diem_repo, tien_do_hoc_tap_repo
+from vku_scraper import load_session, save_session, PORTAL_BASE_URL, TIEN_DO_URL
+from Supabase import sinh_vien_repo, diem_repo, tien_do_hoc_tap_repo, sync_fingerprint_repo
 
 console = Console()
 
@@ -116,7 +116,7 @@ def get_session_from_browser():
     console.print("\n[cyan]🔐 Đang mở browser để đăng nhập...[/cyan]\n")
     
     session_path = get_session_path()
-    vku_login_url = "https://daotao.vku.udn.vn/sv"
+    vku_login_url = f"{PORTAL_BASE_URL}/sv"
     
     try:
         with sync_playwright() as p:
@@ -163,7 +163,7 @@ def save_tien_do_html():
         return
     
     output_file = Path(__file__).parent / "ManualScrape" / "VKU_scraper" / "tien_do_hoc_tap.html"
-    tien_do_url = "https://daotao.vku.udn.vn/sv/hoc-phan-con-lai"
+    tien_do_url = TIEN_DO_URL
     
     console.print("\n[cyan]💾 Đang lưu HTML trang tiến độ học tập...[/cyan]\n")
     
@@ -205,7 +205,7 @@ def preview_tien_do_hoc_tap():
     
     console.print("\n[cyan]🔍 Đang tải trang tiến độ học tập...[/cyan]\n")
     
-    tien_do_url = "https://daotao.vku.udn.vn/sv/hoc-phan-con-lai"
+    tien_do_url = TIEN_DO_URL
     
     try:
         with sync_playwright() as p:
@@ -520,6 +520,14 @@ def delete_student():
                 except:
                     pass
                 
+                # Xóa SyncFingerprint (tham chiếu SinhVien)
+                try:
+                    console.print("[cyan]🔄 Đang xóa SyncFingerprint...[/cyan]")
+                    sync_fingerprint_repo.delete_by_student(student_id)
+                    console.print("[green]✅ Đã xóa SyncFingerprint[/green]")
+                except:
+                    pass
+                
                 # Xóa SinhVien
                 console.print("[cyan]🔄 Đang xóa SinhVien...[/cyan]")
                 result = sinh_vien_repo.delete_student(student_id)
@@ -0,0 +1,417 @@
+"""
+Course Schedule Importer - Nạp lịch lớp học phần (CSV/XLSX của khoa) vào bảng course_schedule
+
+- Đọc file theo kiểu streaming (csv.reader / openpyxl read_only), không load cả file vào bộ nhớ
+- Tự tìm dòng header trong 20 dòng đầu (file export thường có tiêu đề phía trên),
+  map tên cột tiếng Việt/tiếng Anh về cột của bảng
+- Validate TOÀN BỘ file trước khi ghi: chỉ cần một dòng lỗi là không ghi gì cả
+- Diff với dữ liệu hiện có theo khóa (stt_id, course_name), chỉ ghi phần thay đổi và chỉ
+  các cột có trong file (file thiếu cột nào thì giữ nguyên giá trị cột đó trong DB):
+  upsert (insert + update) theo chunk trước, sau đó mới delete các lớp không còn trong file
+- Mỗi bước đều idempotent: nếu lỗi giữa chừng, chạy lại cùng file sẽ hoàn tất phần còn lại
+
+Usage:
+    python course_schedule_importer.py lich_hoc.xlsx --dry-run
+    python course_schedule_importer.py lich_hoc.csv --chunk-size 500
+"""
+
+import argparse
+import csv
+import io
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from records import CourseSection
+
+# openpyxl là optional - chỉ cần khi import file .xlsx
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+COURSE_COLUMNS = (
+    "stt_id",
+    "course_name",
+    "lecturer_name",
+    "day_and_time",
+    "classroom",
+    "study_weeks",
+    "capacity",
+)
+COMPARE_COLUMNS = COURSE_COLUMNS[2:]
+
+# Tên cột (đã bỏ dấu, viết thường) -> cột trong bảng course_schedule
+HEADER_ALIASES = {
+    "stt_id": "stt_id",
+    "stt": "stt_id",
+    "course_name": "course_name",
+    "ten hoc phan": "course_name",
+    "ten lop hoc phan": "course_name",
+    "hoc phan": "course_name",
+    "mon hoc": "course_name",
+    "lecturer_name": "lecturer_name",
+    "giang vien": "lecturer_name",
+    "ten giang vien": "lecturer_name",
+    "day_and_time": "day_and_time",
+    "thoi khoa bieu": "day_and_time",
+    "thu tiet": "day_and_time",
+    "lich hoc": "day_and_time",
+    "classroom": "classroom",
+    "phong": "classroom",
+    "phong hoc": "classroom",
+    "study_weeks": "study_weeks",
+    "tuan hoc": "study_weeks",
+    "capacity": "capacity",
+    "si so": "capacity",
+    "so luong": "capacity",
+}
+
+HEADER_SEARCH_ROWS = 20
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+_WHITESPACE = re.compile(r"\s+")
+_HEADER_SEPARATORS = re.compile(r"[\s_\-/.:]+")
+_INTEGER = re.compile(r"^\d+(?:\.0+)?$")
+
+CourseKey = Tuple[int, str]
+Source = Union[str, Path, BinaryIO]
+
+
+class ScheduleImportError(Exception):
+    """File lịch học không hợp lệ - không có gì được ghi vào DB"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} lỗi trong file lịch học: " + "; ".join(errors[:5]))
+
+
+# ---------- Đọc file ----------
+
+def _normalize_header(value: Any) -> str:
+    text = unicodedata.normalize("NFD", str(value or "")).replace("đ", "d").replace("Đ", "D")
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return _HEADER_SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def _open_binary(source: Source) -> Tuple[BinaryIO, bool]:
+    if isinstance(source, (str, Path)):
+        return open(source, "rb"), True
+    return source, False
+
+
+def _iter_csv_cells(source: Source, encoding: str = "utf-8-sig") -> Iterator[List[Any]]:
+    stream, owned = _open_binary(source)
+    try:
+        text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+        try:
+            sample = text.read(4096)
+            text.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(text, dialect)
+        finally:
+            # Không để TextIOWrapper đóng stream của người gọi (UploadFile)
+            text.detach()
+    finally:
+        if owned:
+            stream.close()
+
+
+def _iter_xlsx_cells(source: Source, sheet: Optional[str] = None) -> Iterator[List[Any]]:
+    if openpyxl is None:
+        raise ScheduleImportError(["Cần cài openpyxl để đọc file .xlsx (pip install openpyxl)"])
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        for row in worksheet.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def iter_schedule_rows(
+    source: Source,
+    file_format: str,
+    sheet: Optional[str] = None,
+    encoding: str = "utf-8-sig"
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Đọc file lịch học từng dòng
+
+    Args:
+        source: Path hoặc file object (binary)
+        file_format: "csv" hoặc "xlsx"
+
+    Yields:
+        (số dòng trong file, {"stt_id": ..., "course_name": ..., ...}) - giá trị chưa chuẩn hóa
+    """
+    file_format = file_format.lower().lstrip(".")
+    if file_format == "csv":
+        cells = _iter_csv_cells(source, encoding=encoding)
+    elif file_format in ("xlsx", "xlsm"):
+        cells = _iter_xlsx_cells(source, sheet=sheet)
+    else:
+        raise ScheduleImportError([f"Định dạng không hỗ trợ: {file_format} (chỉ csv/xlsx)"])
+
+    mapping: Optional[Dict[int, str]] = None
+    for line, row in enumerate(cells, start=1):
+        if mapping is None:
+            candidate = {
+                index: HEADER_ALIASES[_normalize_header(value)]
+                for index, value in enumerate(row)
+                if _normalize_header(value) in HEADER_ALIASES
+            }
+            if {"stt_id", "course_name"} <= set(candidate.values()):
+                mapping = candidate
+            elif line >= HEADER_SEARCH_ROWS:
+                raise ScheduleImportError([
+                    f"Không tìm thấy dòng header (cần cột STT và Tên học phần) trong {HEADER_SEARCH_ROWS} dòng đầu"
+                ])
+            continue
+
+        if not any(value not in (None, "") for value in row):
+            continue
+        yield line, {
+            column: row[index] if index < len(row) else None
+            for index, column in mapping.items()
+        }
+
+    if mapping is None:
+        raise ScheduleImportError(["File rỗng hoặc không có dòng header"])
+
+
+# ---------- Chuẩn hóa + validate ----------
+
+def _clean_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = _WHITESPACE.sub(" ", str(value)).strip()
+    return text or None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and float(value).is_integer():
+        return int(value)
+    text = str(value).strip()
+    if _INTEGER.match(text):
+        return int(float(text))
+    raise ValueError(f"không phải số nguyên: {value!r}")
+
+
+def normalize_course_row(raw: Dict[str, Any]) -> CourseSection:
+    """
+    Chuẩn hóa một dòng về đúng kiểu của bảng course_schedule
+
+    Raises:
+        ValueError: Dòng không hợp lệ
+    """
+    row = CourseSection(
+        stt_id=_to_int(raw.get("stt_id")),
+        course_name=_clean_text(raw.get("course_name")),
+        lecturer_name=_clean_text(raw.get("lecturer_name")),
+        day_and_time=_clean_text(raw.get("day_and_time")),
+        classroom=_clean_text(raw.get("classroom")),
+        study_weeks=_clean_text(raw.get("study_weeks")),
+        capacity=_to_int(raw.get("capacity")),
+    )
+    if row.stt_id is None:
+        raise ValueError("thiếu STT")
+    if not row.course_name:
+        raise ValueError("thiếu tên học phần")
+    return row
+
+
+def parse_schedule(
+    rows: Iterable[Tuple[int, Dict[str, Any]]]
+) -> Tuple[Dict[CourseKey, CourseSection], Tuple[str, ...]]:
+    """
+    Chuẩn hóa + validate toàn bộ các dòng trong một lượt
+
+    Returns:
+        (courses, các cột có trong file theo thứ tự COURSE_COLUMNS)
+
+    Raises:
+        ScheduleImportError: Có ít nhất một dòng lỗi hoặc trùng khóa (stt_id, course_name)
+    """
+    courses: Dict[CourseKey, CourseSection] = {}
+    first_line: Dict[CourseKey, int] = {}
+    errors: List[str] = []
+    found = set()
+
+    for line, raw in rows:
+        found.update(raw)
+        try:
+            row = normalize_course_row(raw)
+        except ValueError as e:
+            errors.append(f"Dòng {line}: {e}")
+            continue
+        key = row.key
+        if key in courses:
+            errors.append(f"Dòng {line}: trùng lớp {key} với dòng {first_line[key]}")
+            continue
+        courses[key] = row
+        first_line[key] = line
+
+    if errors:
+        raise ScheduleImportError(errors)
+    if not courses:
+        raise ScheduleImportError(["File không có lớp học phần nào"])
+    return courses, tuple(column for column in COURSE_COLUMNS if column in found)
+
+
+# ---------- Diff + ghi ----------
+
+def diff_schedule(
+    existing: Iterable[Dict[str, Any]],
+    incoming: Dict[CourseKey, CourseSection],
+    columns: Tuple[str, ...] = COURSE_COLUMNS
+) -> Dict[str, Any]:
+    """
+    So sánh dữ liệu trong DB với file mới, chỉ trên các cột có trong file (columns)
+
+    Returns:
+        {"insert": [CourseSection], "update": [CourseSection], "delete": [(stt_id, course_name)],
+         "unchanged": int, "columns": columns}
+    """
+    compare_columns = [column for column in COMPARE_COLUMNS if column in columns]
+    # Giữ dòng hiện có dưới dạng CourseSection (slots) thay vì dict - bảng có thể vài nghìn lớp
+    current: Dict[CourseKey, CourseSection] = {}
+    for row in existing:
+        course = CourseSection.from_row(row)
+        course.stt_id = int(course.stt_id)
+        current[course.key] = course
+
+    inserts, updates = [], []
+    unchanged = 0
+    for key, row in incoming.items():
+        old = current.get(key)
+        if old is None:
+            inserts.append(row)
+        elif any(getattr(old, column) != getattr(row, column) for column in compare_columns):
+            updates.append(row)
+        else:
+            unchanged += 1
+
+    deletes = [key for key in current if key not in incoming]
+    return {"insert": inserts, "update": updates, "delete": deletes, "unchanged": unchanged, "columns": columns}
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def apply_diff(diff: Dict[str, Any], repo, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Ghi phần thay đổi theo chunk: upsert (insert + update) trước, delete sau.
+    Payload upsert chỉ gồm các cột có trong file nên upsert không ghi đè cột thiếu bằng NULL
+
+    Lỗi ở chunk nào thì dừng ngay và raise - các bước đã ghi đều idempotent nên
+    chạy lại import cùng file sẽ hoàn tất phần còn lại
+    """
+    written = {"upserted": 0, "deleted": 0, "batches": 0}
+    columns = diff.get("columns", COURSE_COLUMNS)
+
+    for chunk in _chunks(diff["insert"] + diff["update"], chunk_size):
+        repo.upsert_courses([course.to_row(columns) for course in chunk])
+        written["upserted"] += len(chunk)
+        written["batches"] += 1
+
+    # Delete gom theo tên môn: course_name = X AND stt_id IN (...)
+    by_course: Dict[str, List[int]] = {}
+    for stt_id, course_name in diff["delete"]:
+        by_course.setdefault(course_name, []).append(stt_id)
+    for course_name, stt_ids in by_course.items():
+        for chunk in _chunks(stt_ids, chunk_size):
+            repo.delete_courses(course_name, chunk)
+            written["deleted"] += len(chunk)
+            written["batches"] += 1
+
+    return written
+
+
+def import_schedule(
+    source: Source,
+    file_format: str,
+    dry_run: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sheet: Optional[str] = None,
+    repo=None
+) -> Dict[str, Any]:
+    """
+    Import file lịch học vào course_schedule
+
+    Returns:
+        {
+            "rows": 3120, "inserted": 40, "updated": 12, "deleted": 5, "unchanged": 3068,
+            "columns": ["stt_id", "course_name", ...],   # cột có trong file - chỉ các cột này được ghi
+            "dry_run": False, "timings": {"parse": 0.8, "diff": 0.3, "write": 1.2}
+        }
+
+    Raises:
+        ScheduleImportError: File không hợp lệ (không có gì được ghi)
+    """
+    if repo is None:
+        from Supabase import course_schedule_repo as repo
+
+    timings = {}
+    started = time.perf_counter()
+    courses, columns = parse_schedule(iter_schedule_rows(source, file_format, sheet=sheet))
+    timings["parse"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    diff = diff_schedule(repo.get_all_courses_paged(), courses, columns)
+    timings["diff"] = round(time.perf_counter() - started, 3)
+
+    report = {
+        "rows": len(courses),
+        "inserted": len(diff["insert"]),
+        "updated": len(diff["update"]),
+        "deleted": len(diff["delete"]),
+        "unchanged": diff["unchanged"],
+        "columns": list(columns),
+        "dry_run": dry_run,
+        "timings": timings,
+    }
+    if dry_run:
+        return report
+
+    started = time.perf_counter()
+    report["batches"] = apply_diff(diff, repo, chunk_size=chunk_size)["batches"]
+    timings["write"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import lịch lớp học phần (CSV/XLSX) vào course_schedule")
+    parser.add_argument("file", help="File .csv hoặc .xlsx export từ khoa")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ in số thay đổi, không ghi DB")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--sheet", help="Tên sheet (mặc định sheet đang active)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    try:
+        result = import_schedule(
+            args.file,
+            Path(args.file).suffix,
+            dry_run=args.dry_run,
+            chunk_size=args.chunk_size,
+            sheet=args.sheet,
+        )
+    except ScheduleImportError as e:
+        print("❌ File không hợp lệ, không ghi gì vào DB:")
+        for error in e.errors[:MAX_REPORTED_ERRORS]:
+            print(f"  - {error}")
+        sys.exit(1)
+
+    print(f"✅ {'[dry-run] ' if result['dry_run'] else ''}{result}")
@@ -1,18 +1,16 @@
-from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi import FastAPI, HTTPException, Header, Request, UploadFile, File
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 import os
 import sys
-import json
-import subprocess
 import shutil
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
 # Force ProactorEventLoop on Windows to avoid "Data should not be empty" AssertionError in asyncio
 if sys.platform == "win32":
@@ -21,7 +19,17 @@ if sys.platform == "win32":
 # Add ManualScrape path
 sys.path.insert(0, str(Path(__file__).parent / "ManualScrape" / "VKU_scraper"))
 
-from scraper import VKUScraperManager
+from scraper import VKUScraperManager, scrape_result_cache
+from vku_scraper import PROFILE_URL
+from browser_pool import BrowserPool
+from vku_scraper_async import AsyncBrowserPool
+from scrape_metrics import scrape_metrics
+from scrape_jobs import ScrapeJobManager, ScrapeQueueFullError
+from session_store import SessionStore
+from session_capture import SessionCaptureManager, CAPTURE_SUCCEEDED
+from session_health import SessionHealthChecker
+from scrape_scheduler import ScrapeScheduler
+from course_schedule_importer import import_schedule, ScheduleImportError, MAX_REPORTED_ERRORS
 from Supabase import sinh_vien_repo, diem_repo, auth_repo, tien_do_hoc_tap_repo, course_schedule_repo
 from auth_utils import get_current_user_id
 from cog_loader import CogLoader
@@ -29,17 +37,108 @@ from cog_loader import CogLoader
 # Initialize cog loader (will be set in lifespan)
 cog_loader = None
 
+# Shared Chromium pool for scrape fallbacks (will be set in lifespan)
+browser_pool: Optional[Union[BrowserPool, AsyncBrowserPool]] = None
+
+# Background scrape job queue (will be set in lifespan)
+scrape_jobs: Optional[ScrapeJobManager] = None
+
+# Session capture subprocesses, one per user (will be set in lifespan)
+session_captures: Optional[SessionCaptureManager] = None
+
+# Periodic re-sync of opted-in users (will be set in lifespan)
+scrape_scheduler: Optional[ScrapeScheduler] = None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown"""
-    global cog_loader
+    global cog_loader, browser_pool, scrape_jobs, session_captures, scrape_scheduler
+    keepalive_task = None
+    scheduler_task = None
     # Startup: Load all cogs
     cog_loader = CogLoader(app)
     cog_loader.load_all_cogs()
     print("[Startup] All cogs loaded")
     
+    # Startup: Browser pool (Chromium is launched lazily on first use)
+    if os.environ.get("SCRAPER_ASYNC_BROWSER", "0") == "1":
+        # Async Playwright on this event loop: many scrapes share one Chromium, no thread per scrape
+        browser_pool = AsyncBrowserPool(
+            size=int(os.environ.get("SCRAPER_BROWSER_POOL_SIZE", "1")),
+            max_concurrency=int(os.environ.get("SCRAPER_ASYNC_MAX_CONTEXTS", "8")),
+            headless=True,
+            max_uses=int(os.environ.get("SCRAPER_BROWSER_MAX_USES", "50"))
+        )
+        await browser_pool.start()
+    else:
+        max_memory_mb = os.environ.get("SCRAPER_BROWSER_MAX_MEMORY_MB")
+        browser_pool = BrowserPool(
+            size=int(os.environ.get("SCRAPER_BROWSER_POOL_SIZE", "2")),
+            headless=True,
+            max_uses=int(os.environ.get("SCRAPER_BROWSER_MAX_USES", "50")),
+            max_memory_mb=int(max_memory_mb) if max_memory_mb else None
+        )
+        browser_pool.start()
+    
+    # Startup: Scrape job workers
+    scrape_jobs = ScrapeJobManager(
+        max_workers=int(os.environ.get("SCRAPER_MAX_WORKERS", "2")),
+        max_queue=int(os.environ.get("SCRAPER_MAX_QUEUE", "50"))
+    )
+    
+    # Startup: Session capture (asyncio subprocess, needs the running loop)
+    # Session mới -> bỏ kết quả scrape cache của session cũ
+    session_captures = SessionCaptureManager(
+        SESSION_GET_SCRIPT,
+        cwd=SESSION_GET_SCRIPT.parent.parent.parent,  # Run from Backend folder
+        on_success=scrape_result_cache.invalidate
+    )
+    
+    # Startup: Optional session keepalive (refresh portal cookies close to expiry)
+    keepalive_interval = float(os.environ.get("SESSION_KEEPALIVE_INTERVAL", "0"))
+    if keepalive_interval > 0:
+        keepalive_task = asyncio.create_task(session_health.run_keepalive(keepalive_interval))
+        print(f"[Startup] Session keepalive every {keepalive_interval:.0f}s")
+    
+    # Startup: Scheduled re-sync (opt-in per user, SCRAPE_SCHEDULE_INTERVAL=0 disables the loop)
+    schedule_interval = float(os.environ.get("SCRAPE_SCHEDULE_INTERVAL", "0"))
+    scrape_scheduler = ScrapeScheduler(
+        SESSIONS_DIR / "scheduled_users.json",
+        submit=lambda user_id: _submit_scrape_job(user_id, force=True),
+        eligible=session_store.exists,
+        interval=schedule_interval or 6 * 3600,
+        max_per_minute=float(os.environ.get("SCRAPE_SCHEDULE_MAX_PER_MINUTE", "2")),
+        jitter=float(os.environ.get("SCRAPE_SCHEDULE_JITTER", "0.2"))
+    )
+    if schedule_interval > 0:
+        scheduler_task = asyncio.create_task(scrape_scheduler.run())
+        print(f"[Startup] Scrape scheduler every {schedule_interval:.0f}s "
+              f"({len(scrape_scheduler.user_ids())} users opted in)")
+    
     yield
     
+    # Shutdown: Stop scrape scheduler
+    if scheduler_task:
+        scheduler_task.cancel()
+    
+    # Shutdown: Stop session keepalive
+    if keepalive_task:
+        keepalive_task.cancel()
+    
+    # Shutdown: Kill running session captures
+    if session_captures:
+        await session_captures.shutdown()
+    
+    # Shutdown: Stop scrape job workers
+    if scrape_jobs:
+        scrape_jobs.shutdown()
+    
+    # Shutdown: Close browser pool
+    if isinstance(browser_pool, AsyncBrowserPool):
+        await browser_pool.stop()
+    elif browser_pool:
+        await asyncio.to_thread(browser_pool.stop)
+    
     # Shutdown: Cleanup all cogs
     if cog_loader:
         for cog_name in list(cog_loader.loaded_cogs.keys()):
@@ -166,7 +265,17 @@ app.add_middleware(
 # Configuration - Save session to Frontend/Sessions folder
 SESSIONS_DIR = Path(__file__).parent.parent / "Frontend" / "Sessions"
 SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
-SESSION_FILE = SESSIONS_DIR / "session.json"
+
+# Per-user portal sessions: Frontend/Sessions/users/<user_id>.json
+session_store = SessionStore(SESSIONS_DIR)
+
+# Fast HTTP probe of each user's portal session, cached for SESSION_PROBE_TTL seconds
+session_health = SessionHealthChecker(
+    session_store,
+    PROFILE_URL,
+    ttl=float(os.environ.get("SESSION_PROBE_TTL", "60")),
+    refresh_before=float(os.environ.get("SESSION_KEEPALIVE_REFRESH_BEFORE", "86400"))
+)
 
 # Path to session_get.py script
 SESSION_GET_SCRIPT = Path(__file__).parent / "ManualScrape" / "VKU_scraper" / "session_get.py"
@@ -180,9 +289,13 @@ class SessionCheckResponse(BaseModel):
     exists: bool
     path: str
     size: Optional[int] = None
+    modified_at: Optional[float] = None
 
 # ==================== SCRAPER RESPONSE MODELS ====================
 
+class ScrapeScheduleRequest(BaseModel):
+    enabled: bool
+
 class ScrapeDataResponse(BaseModel):
     success: bool
     message: str
@@ -264,98 +377,125 @@ class UpdateUserRequest(BaseModel):
 async def root():
     return {"message": "VKU Toolkit API", "status": "running", "version": "1.0.0"}
 
-@app.post("/api/capture-session", response_model=SessionResponse)
-async def capture_session():
+def _start_capture(user_id: str):
     """
-    Call session_get.py to launch browser and capture session
+    Bắt đầu (hoặc lấy lại) capture session của user
     """
     try:
-        # Check if session_get.py exists
-        if not SESSION_GET_SCRIPT.exists():
-            raise FileNotFoundError(f"session_get.py not found at {SESSION_GET_SCRIPT}")
-        
-        print(f"Running session capture script: {SESSION_GET_SCRIPT}")
-        
-        # Run session_get.py as subprocess using uv to ensure correct environment
-        result = subprocess.run(
-            ["uv", "run", "python", str(SESSION_GET_SCRIPT)],
-            cwd=str(SESSION_GET_SCRIPT.parent.parent.parent),  # Run from Backend folder
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minutes timeout
-        )
-        
-        print(f"Script output: {result.stdout}")
-        if result.stderr:
-            print(f"Script errors: {result.stderr}")
-        
-        if result.returncode != 0:
-            return SessionResponse(
-                success=False,
-                message=f"Session capture failed: {result.stderr}"
-            )
-        
-        # Check if session.json was created in Frontend/Sessions folder
-        if SESSION_FILE.exists():
-            return SessionResponse(
-                success=True,
-                message="Session captured successfully",
-                session_path=str(SESSION_FILE)
-            )
-        else:
-            return SessionResponse(
-                success=False,
-                message="Session file was not created"
-            )
-            
+        return session_captures.start(user_id, session_store.path_for(user_id))
     except FileNotFoundError as e:
         print(f"File not found: {e}")
         raise HTTPException(status_code=404, detail=str(e))
-    except subprocess.TimeoutExpired:
-        print("Session capture timeout")
-        raise HTTPException(status_code=408, detail="Session capture timeout (5 minutes)")
-    except Exception as e:
-        import traceback
-        error_detail = f"Failed to capture session: {str(e)}\n{traceback.format_exc()}"
-        print(error_detail)
-        raise HTTPException(status_code=500, detail=f"Failed to capture session: {str(e)}")
 
-@app.get("/api/check-session", response_model=SessionCheckResponse)
-async def check_session():
+def _get_user_capture(user_id: str):
+    job = session_captures.get(user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No session capture found")
+    return job
+
+@app.post("/api/capture-session", response_model=SessionResponse)
+async def capture_session(authorization: str = Header(None)):
     """
-    Check if session file exists
+    Call session_get.py to launch browser and capture session (theo user hiện tại)
+    Chạy session_get.py bằng asyncio subprocess và chờ user đăng nhập xong,
+    các request khác vẫn được xử lý trong lúc chờ
+    Requires: Authorization header với Bearer token
     """
-    exists = SESSION_FILE.exists()
-    size = SESSION_FILE.stat().st_size if exists else None
+    user_id = get_current_user_id(authorization)
+    job, _ = _start_capture(user_id)
+    print(f"Running session capture script: {SESSION_GET_SCRIPT}")
     
-    return SessionCheckResponse(
-        exists=exists,
-        path=str(SESSION_FILE),
-        size=size
+    await session_captures.wait(job)
+    
+    if job.error == "timeout":
+        raise HTTPException(status_code=408, detail=job.message)
+    return SessionResponse(
+        success=job.status == CAPTURE_SUCCEEDED,
+        message=job.message,
+        session_path=str(job.output_path) if job.status == CAPTURE_SUCCEEDED else None
+    )
+
+@app.post("/api/capture-session/start", status_code=202)
+async def start_capture_session(authorization: str = Header(None)):
+    """
+    Bắt đầu capture session nền, trả về ngay
+    Nếu user đã có capture đang chạy thì trả về capture đó (created=false)
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    job, created = _start_capture(user_id)
+    return {**job.to_dict(), "created": created}
+
+@app.get("/api/capture-session/status")
+async def get_capture_session_status(authorization: str = Header(None)):
+    """
+    Trạng thái + output của capture gần nhất của user
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    return _get_user_capture(user_id).to_dict(include_events=True)
+
+@app.get("/api/capture-session/events")
+async def stream_capture_session_events(authorization: str = Header(None)):
+    """
+    Server-Sent Events: output của session_get.py trong lúc user đăng nhập
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    job = _get_user_capture(user_id)
+    return StreamingResponse(
+        session_captures.stream_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+@app.delete("/api/capture-session")
+async def cancel_capture_session(authorization: str = Header(None)):
+    """
+    Hủy capture đang chạy của user (đóng browser đăng nhập)
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    job = await session_captures.cancel(user_id)
+    if not job:
+        return {"success": False, "message": "No running session capture"}
+    return {"success": True, "message": job.message}
+
+@app.get("/api/check-session", response_model=SessionCheckResponse)
+async def check_session(authorization: str = Header(None)):
+    """
+    Check if session file exists (theo user hiện tại)
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    return SessionCheckResponse(**session_store.info(user_id))
+
 @app.get("/api/session-content")
-async def get_session_content():
+async def get_session_content(authorization: str = Header(None)):
     """
-    Get session file content (for debugging)
+    Get session file content of the current user (for debugging)
+    Requires: Authorization header với Bearer token
     """
-    if not SESSION_FILE.exists():
-        raise HTTPException(status_code=404, detail="Session file not found")
-    
+    user_id = get_current_user_id(authorization)
     try:
-        with open(SESSION_FILE, 'r', encoding='utf-8') as f:
-            content = json.load(f)
-        return content
+        content = session_store.load(user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read session: {str(e)}")
+    
+    if content is None:
+        raise HTTPException(status_code=404, detail="Session file not found")
+    return content
 
 @app.delete("/api/session")
-async def delete_session():
+async def delete_session(authorization: str = Header(None)):
     """
-    Delete session file
+    Delete session file of the current user
+    Requires: Authorization header với Bearer token
     """
-    if SESSION_FILE.exists():
-        SESSION_FILE.unlink()
+    user_id = get_current_user_id(authorization)
+    # Không trả dữ liệu scrape của session đã xóa cho lần sync sau
+    scrape_result_cache.invalidate(user_id)
+    if session_store.delete(user_id):
         return {"success": True, "message": "Session deleted"}
     return {"success": False, "message": "Session file not found"}
 
@@ -490,34 +630,74 @@ async def update_user(request: UpdateUserRequest):
 
 # ==================== SCRAPER ENDPOINTS ====================
 
+def _submit_scrape_job(user_id: str, force: bool = False, resume: bool = False):
+    """
+    Tạo (hoặc lấy lại) job scrape của user trong job queue
+    force=True bỏ qua kết quả scrape còn trong cache, luôn scrape lại portal
+    resume=True ghi tiếp từ checkpoint khi lần sync trước lỗi giữa chừng (data.resumable)
+    """
+    # Check if the user's session exists
+    if not session_store.exists(user_id):
+        raise HTTPException(
+            status_code=400, 
+            detail="Session file not found. Please capture session first."
+        )
+    
+    def run_scrape(progress_callback):
+        # Session hết hạn thì báo ngay, không mở Chromium rồi chờ timeout
+        session_status = session_health.check(user_id)
+        if session_status["valid"] is False:
+            return {
+                "success": False,
+                "message": "VKU session expired. Please capture session again.",
+                "error": session_status["reason"],
+                "data": {"session": session_status}
+            }
+        
+        # Initialize scraper manager with session path and user_id
+        scraper_manager = VKUScraperManager(
+            session_path=str(session_store.path_for(user_id)),
+            headless=True,
+            user_id=user_id,  # Pass user_id to scraper
+            browser_pool=browser_pool,
+            progress_callback=progress_callback
+        )
+        return scraper_manager.scrape_and_sync(force=force, resume=resume)
+    
+    try:
+        return scrape_jobs.submit(user_id, run_scrape)
+    except ScrapeQueueFullError as e:
+        # Hàng đợi đầy - báo client thử lại sau thay vì nhận thêm scrape (tránh OOM)
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+def _get_user_job(job_id: str, user_id: str):
+    """
+    Lấy job theo id, chỉ cho phép chủ job truy cập
+    """
+    job = scrape_jobs.get(job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job
+
 @app.post("/api/scrape-and-sync", response_model=ScrapeDataResponse)
-async def scrape_and_sync(authorization: str = Header(None)):
+async def scrape_and_sync(force: bool = False, resume: bool = False, authorization: str = Header(None)):
     """
     Scrape dữ liệu từ VKU và đồng bộ vào Supabase (theo user hiện tại)
+    Chạy qua job queue (dùng lại job đang chạy của user nếu có) và chờ kết quả
+    Kết quả scrape gần đây được cache theo user (SCRAPE_CACHE_TTL), ?force=true để scrape lại
+    Lần trước lỗi giữa chừng (data.resumable) thì ?resume=true để ghi tiếp, không scrape lại
     Requires: Authorization header với Bearer token
     """
     try:
         # Get current user ID from token
         user_id = get_current_user_id(authorization)
         
-        # Check if session exists
-        if not SESSION_FILE.exists():
-            raise HTTPException(
-                status_code=400, 
-                detail="Session file not found. Please capture session first."
-            )
-        
-        # Initialize scraper manager with session path and user_id
-        scraper_manager = VKUScraperManager(
-            session_path=str(SESSION_FILE),
-            headless=True,
-            user_id=user_id  # Pass user_id to scraper
-        )
-        
-        # Run synchronous scraper in thread executor to avoid blocking async loop
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            result = await loop.run_in_executor(executor, scraper_manager.scrape_and_sync)
+        job, _ = _submit_scrape_job(user_id, force=force, resume=resume)
+        result = await scrape_jobs.wait(job)
         
         return ScrapeDataResponse(
             success=result.get("success", False),
@@ -532,19 +712,124 @@ async def scrape_and_sync(authorization: str = Header(None)):
         print(error_detail)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/scrape-jobs", status_code=202)
+async def create_scrape_job(force: bool = False, resume: bool = False, authorization: str = Header(None)):
+    """
+    Tạo job scrape nền, trả về job_id ngay
+    Nếu user đã có job đang chạy/chờ thì trả về job đó (created=false)
+    ?force=true bỏ qua cache kết quả scrape, ?resume=true ghi tiếp lần sync lỗi giữa chừng
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    job, created = _submit_scrape_job(user_id, force=force, resume=resume)
+    return {**job.to_dict(), "created": created}
+
+@app.get("/api/scrape-queue")
+async def get_scrape_queue():
+    """
+    Trạng thái hàng đợi scrape (số job đang chạy/chờ, thời gian chờ ước lượng)
+    """
+    return scrape_jobs.stats()
+
+@app.get("/api/scrape-jobs/{job_id}")
+async def get_scrape_job(job_id: str, authorization: str = Header(None)):
+    """
+    Trạng thái + các event tiến độ của job scrape
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    return _get_user_job(job_id, user_id).to_dict(include_events=True)
+
+@app.get("/api/scrape-jobs/{job_id}/events")
+async def stream_scrape_job_events(job_id: str, authorization: str = Header(None)):
+    """
+    Server-Sent Events: tiến độ từng bước (BƯỚC 1-5) của job scrape
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    job = _get_user_job(job_id, user_id)
+    return StreamingResponse(
+        scrape_jobs.stream_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/scrape-status")
-async def get_scrape_status():
+async def get_scrape_status(recheck: bool = False, authorization: str = Header(None)):
     """
-    Get scraping prerequisites status
+    Get scraping prerequisites status (theo user hiện tại)
+    Probe session bằng một request HTTP (cache SESSION_PROBE_TTL giây), ?recheck=true để probe lại
+    Requires: Authorization header với Bearer token
     """
-    session_exists = SESSION_FILE.exists()
+    user_id = get_current_user_id(authorization)
+    session_exists = session_store.exists(user_id)
+    session_status = await asyncio.to_thread(session_health.check, user_id, recheck)
+    
+    # valid=None (lỗi mạng) vẫn cho scrape - fallback Playwright sẽ tự xử lý
+    ready = session_exists and session_status["valid"] is not False
+    if not session_exists:
+        message = "Session required"
+    elif not ready:
+        message = "Session expired. Please capture session again."
+    else:
+        message = "Ready to scrape"
     
     return {
         "session_exists": session_exists,
-        "ready": session_exists,
-        "message": "Ready to scrape" if session_exists else "Session required",
+        "session_valid": session_status["valid"],
+        "session": session_status,
+        "ready": ready,
+        "message": message,
     }
 
+@app.get("/api/scrape-schedule")
+async def get_scrape_schedule(authorization: str = Header(None)):
+    """
+    Trạng thái re-sync tự động của user hiện tại + thống kê scheduler
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    next_run = scrape_scheduler.next_runs.get(user_id)
+    return {
+        "enabled": scrape_scheduler.is_enabled(user_id),
+        "next_run_at": next_run,
+        "scheduler": scrape_scheduler.stats(),
+    }
+
+@app.put("/api/scrape-schedule")
+async def update_scrape_schedule(request: ScrapeScheduleRequest, authorization: str = Header(None)):
+    """
+    Bật/tắt re-sync tự động (opt-in) cho user hiện tại
+    User mới bật sẽ được xếp lịch từ vòng tiếp theo của scheduler
+    Requires: Authorization header với Bearer token
+    """
+    user_id = get_current_user_id(authorization)
+    if request.enabled and not session_store.exists(user_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Session file not found. Please capture session first."
+        )
+    await asyncio.to_thread(scrape_scheduler.set_enabled, user_id, request.enabled)
+    return {"success": True, "enabled": request.enabled}
+
+@app.get("/api/scraper/browser-pool")
+async def get_browser_pool_stats():
+    """
+    Get shared browser pool status
+    """
+    if not browser_pool:
+        raise HTTPException(status_code=503, detail="Browser pool not started")
+    return browser_pool.stats()
+
+@app.get("/api/scraper/metrics")
+async def get_scraper_metrics(authorization: str = Header(None)):
+    """
+    Per-step scrape_and_sync timings (p50/p95 over a rolling window) and recent runs
+    (without user ids or trace paths - traces contain portal session cookies)
+    """
+    get_current_user_id(authorization)
+    return scrape_metrics.summary()
+
 # ==================== STUDENT ENDPOINTS ====================
 
 @app.get("/api/students", response_model=AllStudentsResponse)
@@ -733,6 +1018,38 @@ async def get_course_schedules(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/courses/schedule/import")
+async def import_course_schedules(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    sheet: Optional[str] = None,
+    authorization: str = Header(None)
+):
+    """
+    Import lịch lớp học phần (CSV/XLSX export của khoa) vào course_schedule
+    Chỉ ghi phần thay đổi (insert/update/delete theo stt_id + course_name), file lỗi thì không ghi gì
+    - dry_run: Chỉ trả về số thay đổi
+    - sheet: Tên sheet trong file .xlsx
+    Requires: Authorization header với Bearer token của user trong COURSE_IMPORT_ADMIN_IDS
+    """
+    user_id = get_current_user_id(authorization)
+    admin_ids = [uid.strip() for uid in os.environ.get("COURSE_IMPORT_ADMIN_IDS", "").split(",") if uid.strip()]
+    if user_id not in admin_ids:
+        raise HTTPException(status_code=403, detail="Not allowed to import course schedules")
+    
+    file_format = Path(file.filename or "").suffix
+    try:
+        return await asyncio.to_thread(
+            import_schedule, file.file, file_format, dry_run=dry_run, sheet=sheet
+        )
+    except ScheduleImportError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": str(e), "errors": e.errors[:MAX_REPORTED_ERRORS]}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import course schedules: {str(e)}")
+
 @app.get("/api/stats")
 async def get_stats():
     """
@@ -0,0 +1,87 @@
+"""
+Records - Kiểu dữ liệu gọn (dataclass slots) cho các dòng Diem, TienDoHocTap, course_schedule
+
+Các dòng ghi hàng loạt (điểm/tiến độ khi sync, lớp học phần khi import) được giữ dưới dạng
+object có __slots__ thay vì dict: không có __dict__ riêng cho từng dòng nên tốn ít bộ nhớ
+hơn, và dựng từ các giá trị theo cột (positional) rẻ hơn dựng dict. Chỉ đổi sang dict
+(wire format của PostgREST) ở ngay lúc gửi lên Supabase - to_row(). from_row() dùng khi
+importer đọc lại course_schedule để diff.
+
+Thứ tự field = thứ tự cột mà normalize.py/course_schedule_importer.py truyền vào constructor.
+Module chỉ dùng stdlib để import được cả khi không có Supabase (importer, benchmark).
+"""
+
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Optional, Sequence, Tuple, Type, TypeVar
+
+R = TypeVar("R", bound="_Record")
+
+
+class _Record:
+    """Chuyển đổi qua lại với dict (wire format) dùng chung cho các record"""
+
+    __slots__ = ()
+
+    # Cột bỏ khỏi dict khi giá trị None - để DB dùng giá trị mặc định
+    OMIT_IF_NONE: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def from_row(cls: Type[R], row: Dict[str, Any]) -> R:
+        """Dict (dòng đọc từ Supabase) -> record, bỏ qua các cột không thuộc record"""
+        return cls(*[row.get(column) for column in cls.__match_args__])
+
+    def to_row(self, columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Record -> dict để gửi cho insert/upsert (columns: chỉ lấy các cột này, mặc định tất cả)"""
+        row = {column: getattr(self, column) for column in (columns or self.__match_args__)}
+        for column in self.OMIT_IF_NONE:
+            if column in row and row[column] is None:
+                del row[column]
+        return row
+
+
+@dataclass(slots=True)
+class GradeRecord(_Record):
+    """Một dòng bảng Diem"""
+
+    OMIT_IF_NONE: ClassVar[Tuple[str, ...]] = ("user_id",)
+
+    TenHocPhan: str
+    SoTC: int
+    DiemT10: Optional[float]
+    HocKy: str
+    StudentID: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ProgressRecord(_Record):
+    """Một dòng bảng TienDoHocTap"""
+
+    OMIT_IF_NONE: ClassVar[Tuple[str, ...]] = ("user_id",)
+
+    TenHocPhan: str
+    HocKy: int
+    BatBuoc: bool
+    SoTC: int
+    DiemT4: Optional[int]
+    DiemChu: Optional[str]
+    StudentID: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CourseSection(_Record):
+    """Một lớp học phần trong bảng course_schedule, khóa (stt_id, course_name)"""
+
+    stt_id: int
+    course_name: str
+    lecturer_name: Optional[str] = None
+    day_and_time: Optional[str] = None
+    classroom: Optional[str] = None
+    study_weeks: Optional[str] = None
+    capacity: Optional[int] = None
+
+    @property
+    def key(self) -> Tuple[int, str]:
+        return (self.stt_id, self.course_name)
+
@@ -0,0 +1,302 @@
+"""
+Scrape Jobs - Chạy scrape_and_sync nền với worker pool giới hạn
+
+- POST tạo job trả về job_id ngay, không giữ HTTP request trong lúc scrape
+- Mỗi user chỉ có tối đa một job đang chạy/chờ (double-click trả về job cũ)
+- Tiến độ từng bước (BƯỚC 1-5) được ghi thành event để client poll hoặc nghe qua SSE
+- Admission control: giới hạn số scrape chạy đồng thời, hàng đợi FIFO công bằng giữa
+  các user (mỗi user chỉ có một job chờ), báo vị trí trong hàng đợi và từ chối khi hàng đợi đầy
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+ProgressCallback = Callable[[int, str], None]
+JobFunction = Callable[[ProgressCallback], Dict[str, Any]]
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+_STOP = object()
+
+
+class ScrapeQueueFullError(Exception):
+    """Hàng đợi scrape đã đầy - client nên thử lại sau retry_after giây"""
+
+    def __init__(self, retry_after: int, queued: int):
+        self.retry_after = retry_after
+        self.queued = queued
+        super().__init__(f"Hàng đợi scrape đã đầy ({queued} job), thử lại sau {retry_after}s")
+
+
+class ScrapeJob:
+    """Một lần scrape_and_sync của một user"""
+
+    def __init__(self, user_id: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.status = JOB_QUEUED
+        self.step = 0
+        self.message = "Đang chờ"
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Future = Future()
+        self.fn: Optional[JobFunction] = None
+        self.queue_position: Optional[int] = None
+        self._lock = threading.Lock()
+        self._add_event("queued", 0, self.message)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def _add_event(self, event_type: str, step: int, message: str) -> None:
+        with self._lock:
+            self.events.append({
+                "index": len(self.events),
+                "type": event_type,
+                "step": step,
+                "message": message,
+                "time": time.time(),
+            })
+
+    def report(self, step: int, message: str) -> None:
+        """Progress callback truyền vào VKUScraperManager"""
+        self.step = step
+        self.message = message
+        self._add_event("progress", step, message)
+
+    def events_since(self, index: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.events[index:]
+
+    def to_dict(self, include_events: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "step": self.step,
+            "message": self.message,
+            "queue_position": self.queue_position if self.status == JOB_QUEUED else None,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_events:
+            data["events"] = self.events_since(0)
+        return data
+
+
+class ScrapeJobManager:
+    """
+    Quản lý job scrape: worker pool giới hạn + tối đa một job active cho mỗi user
+
+    Hàng đợi là một FIFO chung. Vì submit() trả về job đang active của user thay vì tạo
+    job mới, mỗi user có tối đa một job chờ - chính điều đó làm hàng đợi công bằng:
+    một user không thể xếp nhiều job để chiếm hết lượt của người khác.
+
+    Usage:
+        jobs = ScrapeJobManager(max_workers=2, max_queue=50)
+        job, created = jobs.submit(user_id, lambda progress: manager.scrape_and_sync())
+        result = await jobs.wait(job)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 50,
+        job_ttl: float = 3600,
+        default_job_seconds: float = 20.0
+    ):
+        """
+        Args:
+            max_workers: Số scrape chạy đồng thời tối đa (mỗi scrape có thể giữ một browser)
+            max_queue: Số job chờ tối đa, vượt quá thì từ chối (ScrapeQueueFullError)
+            job_ttl: Giữ job đã xong trong bộ nhớ bao lâu (giây) để client còn poll được
+            default_job_seconds: Ước lượng thời gian một job khi chưa có số liệu (tính Retry-After)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.job_ttl = job_ttl
+        self.jobs: Dict[str, ScrapeJob] = {}
+        self.active_by_user: Dict[str, str] = {}
+        self.running = 0
+        self.rejected = 0
+        self._avg_job_seconds = default_job_seconds
+        self._pending: deque = deque()
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"scrape-job-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    # ---------- Admission ----------
+
+    def submit(self, user_id: str, fn: JobFunction) -> Tuple[ScrapeJob, bool]:
+        """
+        Tạo job mới cho user, hoặc trả về job đang active của user đó
+
+        Returns:
+            (job, created) - created=False nếu là job cũ đang chạy/chờ
+
+        Raises:
+            ScrapeQueueFullError: Hàng đợi đã đầy
+        """
+        with self._cond:
+            self._cleanup_locked()
+
+            active_id = self.active_by_user.get(user_id)
+            if active_id and active_id in self.jobs and not self.jobs[active_id].finished:
+                return self.jobs[active_id], False
+
+            # Còn worker rảnh thì job chạy ngay, không tính vào hàng đợi
+            waiting_after_admit = len(self._pending) + 1 - max(0, self.max_workers - self.running)
+            if waiting_after_admit > self.max_queue:
+                self.rejected += 1
+                raise ScrapeQueueFullError(self.estimate_wait_seconds(), len(self._pending))
+
+            job = ScrapeJob(user_id)
+            job.fn = fn
+            self.jobs[job.id] = job
+            self.active_by_user[user_id] = job.id
+            self._pending.append(job)
+            self._update_positions_locked()
+            self._cond.notify()
+            return job, True
+
+    def _update_positions_locked(self) -> None:
+        """Tính lại vị trí (1-based) của các job chờ"""
+        for position, job in enumerate(self._pending, start=1):
+            job.queue_position = position
+
+    def estimate_wait_seconds(self) -> int:
+        """Ước lượng thời gian cho tới khi có chỗ trong hàng đợi"""
+        rounds = (len(self._pending) + self.running) / self.max_workers
+        return max(1, int(round(rounds * self._avg_job_seconds)))
+
+    # ---------- Workers ----------
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping and not self._pending:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                job = self._pending.popleft()
+                self.running += 1
+                self._update_positions_locked()
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(self._run(job, job.fn))
+                except Exception as e:
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self.running -= 1
+                if job.started_at and job.finished_at:
+                    # Trung bình trượt thời gian chạy job, dùng cho Retry-After
+                    duration = job.finished_at - job.started_at
+                    self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * duration
+
+    def _run(self, job: ScrapeJob, fn: JobFunction) -> Dict[str, Any]:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        job._add_event("started", 0, "Bắt đầu scrape")
+        try:
+            result = fn(job.report)
+            job.result = result
+            job.status = JOB_SUCCEEDED if result.get("success") else JOB_FAILED
+            job.message = result.get("message", "")
+            if not result.get("success"):
+                job.error = result.get("error") or result.get("message")
+            return result
+        except Exception as e:
+            job.status = JOB_FAILED
+            job.error = str(e)
+            job.message = f"❌ Lỗi: {e}"
+            raise
+        finally:
+            job.finished_at = time.time()
+            job._add_event("finished", job.step, job.message)
+            with self._cond:
+                if self.active_by_user.get(job.user_id) == job.id:
+                    del self.active_by_user[job.user_id]
+
+    def _cleanup_locked(self) -> None:
+        """Xóa job đã xong quá job_ttl"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished and job.finished_at and now - job.finished_at > self.job_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        return self.jobs.get(job_id)
+
+    def get_active_job(self, user_id: str) -> Optional[ScrapeJob]:
+        job_id = self.active_by_user.get(user_id)
+        return self.jobs.get(job_id) if job_id else None
+
+    async def wait(self, job: ScrapeJob) -> Dict[str, Any]:
+        """Chờ job xong mà không block event loop"""
+        return await asyncio.wrap_future(job.future)
+
+    async def stream_events(self, job: ScrapeJob, poll_interval: float = 0.5) -> AsyncIterator[str]:
+        """Sinh các event của job theo format Server-Sent Events, dừng khi job xong"""
+        index = 0
+        while True:
+            for event in job.events_since(index):
+                index = event["index"] + 1
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["type"] == "finished":
+                    return
+            await asyncio.sleep(poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        """Trạng thái hàng đợi (dùng cho monitoring)"""
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "queued": len(self._pending),
+                "rejected": self.rejected,
+                "avg_job_seconds": round(self._avg_job_seconds, 2),
+                "estimated_wait_seconds": self.estimate_wait_seconds(),
+            }
+
+    def shutdown(self) -> None:
+        """Dừng worker, hủy các job còn đang chờ (kết thúc như job lỗi để client poll/SSE dừng lại)"""
+        with self._cond:
+            self._stopping = True
+            for job in self._pending:
+                job.future.cancel()
+                job.status = JOB_FAILED
+                job.message = job.error = "Server đang dừng - job đã bị hủy"
+                job.finished_at = time.time()
+                job._add_event("finished", job.step, job.message)
+                if self.active_by_user.get(job.user_id) == job.id:
+                    del self.active_by_user[job.user_id]
+            self._pending.clear()
+            self._cond.notify_all()
@@ -0,0 +1,175 @@
+"""
+Scrape Scheduler - Tự động re-sync định kỳ cho các user đã bật (opt-in)
+
+- Mỗi vòng (interval) chia đều các user ra suốt khoảng thời gian, cộng thêm jitter
+  ngẫu nhiên, để không dồn tất cả scrape vào cùng một lúc (VD: lúc vừa công bố điểm)
+- Giới hạn tốc độ toàn cục (max_per_minute) số scrape gửi tới portal VKU
+- Không tự scrape: chỉ đẩy job vào ScrapeJobManager qua hàm submit (giống nút "sync")
+- Danh sách user opt-in được lưu ra file JSON nên giữ nguyên sau khi restart server
+"""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SubmitFunction = Callable[[str], Any]
+EligibleFunction = Callable[[str], bool]
+
+
+class ScrapeScheduler:
+    """
+    Lịch re-sync nền cho các user opt-in
+
+    Usage:
+        scheduler = ScrapeScheduler(opt_in_file, submit=lambda uid: jobs.submit(uid, ...))
+        task = asyncio.create_task(scheduler.run())
+    """
+
+    def __init__(
+        self,
+        opt_in_file: Path,
+        submit: SubmitFunction,
+        eligible: Optional[EligibleFunction] = None,
+        interval: float = 6 * 3600,
+        max_per_minute: float = 2,
+        jitter: float = 0.2
+    ):
+        """
+        Args:
+            opt_in_file: File JSON lưu danh sách user_id đã bật lịch
+            submit: Hàm đẩy một lần scrape của user vào job queue
+            eligible: Hàm kiểm tra user có thể scrape không (VD: đã có session)
+            interval: Mỗi user được re-sync một lần trong khoảng này (giây)
+            max_per_minute: Số scrape tối đa gửi đi mỗi phút (toàn server)
+            jitter: Độ lệch ngẫu nhiên, tính theo tỉ lệ khoảng cách giữa 2 user
+        """
+        self.opt_in_file = Path(opt_in_file)
+        self.submit = submit
+        self.eligible = eligible or (lambda user_id: True)
+        self.interval = interval
+        self.min_spacing = 60.0 / max_per_minute if max_per_minute > 0 else 0.0
+        self.jitter = jitter
+        self.submitted = 0
+        self.failed = 0
+        self.skipped = 0
+        self.cycles = 0
+        self.next_runs: Dict[str, float] = {}
+        self._last_submit = 0.0
+        self._lock = threading.Lock()
+        self._user_ids = set(self._read_opt_in())
+
+    # ---------- Opt-in ----------
+
+    def _read_opt_in(self) -> List[str]:
+        if not self.opt_in_file.exists():
+            return []
+        try:
+            with open(self.opt_in_file, "r", encoding="utf-8") as f:
+                return list(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Không đọc được {self.opt_in_file}: {e}")
+            return []
+
+    def _write_opt_in(self) -> None:
+        self.opt_in_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.opt_in_file.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(sorted(self._user_ids), f)
+        os.replace(tmp_path, self.opt_in_file)
+
+    def set_enabled(self, user_id: str, enabled: bool) -> None:
+        """Bật/tắt re-sync tự động cho user"""
+        with self._lock:
+            if enabled:
+                self._user_ids.add(user_id)
+            else:
+                self._user_ids.discard(user_id)
+                self.next_runs.pop(user_id, None)
+            self._write_opt_in()
+
+    def is_enabled(self, user_id: str) -> bool:
+        return user_id in self._user_ids
+
+    def user_ids(self) -> List[str]:
+        with self._lock:
+            return sorted(self._user_ids)
+
+    # ---------- Scheduling ----------
+
+    def plan_cycle(self, user_ids: List[str], start: float) -> List[tuple]:
+        """
+        Rải đều các user trong một vòng: user thứ i chạy ở start + i*slot + jitter
+
+        Returns:
+            [(run_at, user_id), ...] theo thứ tự thời gian
+        """
+        if not user_ids:
+            return []
+        order = list(user_ids)
+        random.shuffle(order)
+        slot = self.interval / len(order)
+        plan = [
+            (start + i * slot + random.uniform(0, slot * self.jitter), user_id)
+            for i, user_id in enumerate(order)
+        ]
+        return sorted(plan)
+
+    async def _wait_rate_limit(self) -> None:
+        """Giữ khoảng cách tối thiểu giữa 2 lần submit (giới hạn tốc độ toàn cục)"""
+        wait = self._last_submit + self.min_spacing - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_submit = time.time()
+
+    async def _run_user(self, user_id: str) -> None:
+        # User có thể đã tắt lịch hoặc xóa session trong lúc chờ
+        if not self.is_enabled(user_id) or not self.eligible(user_id):
+            self.skipped += 1
+            return
+
+        await self._wait_rate_limit()
+        try:
+            self.submit(user_id)
+            self.submitted += 1
+            print(f"⏰ Scheduled re-sync submitted for user {user_id[:8]}")
+        except Exception as e:
+            self.failed += 1
+            print(f"⚠️ Scheduled re-sync failed for user {user_id[:8]}: {getattr(e, 'detail', e)}")
+
+    async def run(self) -> None:
+        """Vòng lặp chính, chạy trong lifespan (hủy task để dừng)"""
+        while True:
+            cycle_start = time.time()
+            plan = self.plan_cycle(self.user_ids(), cycle_start)
+            self.next_runs = {user_id: run_at for run_at, user_id in plan}
+
+            for run_at, user_id in plan:
+                delay = run_at - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.next_runs.pop(user_id, None)
+                await self._run_user(user_id)
+
+            self.cycles += 1
+            # Vòng trống (chưa ai opt-in) hoặc chạy xong sớm: chờ hết interval
+            remaining = cycle_start + self.interval - time.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "max_per_minute": round(60.0 / self.min_spacing, 2) if self.min_spacing else None,
+            "enabled_users": len(self._user_ids),
+            "cycles": self.cycles,
+            "submitted": self.submitted,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "pending_in_cycle": len(self.next_runs),
+        }
@@ -0,0 +1,240 @@
+"""
+Session Capture - Chạy session_get.py (user tự đăng nhập portal VKU) như một job nền
+
+- Dùng asyncio subprocess nên event loop không bị block trong lúc user đăng nhập (tới 5 phút)
+- Mỗi user chỉ có tối đa một capture đang chạy (gọi lại trả về job cũ)
+- Output của script được ghi thành event để client poll hoặc nghe qua SSE
+- Có thể hủy capture đang chạy (kill process con)
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+CAPTURE_RUNNING = "running"
+CAPTURE_SUCCEEDED = "succeeded"
+CAPTURE_FAILED = "failed"
+CAPTURE_CANCELLED = "cancelled"
+CAPTURE_FINISHED_STATUSES = (CAPTURE_SUCCEEDED, CAPTURE_FAILED, CAPTURE_CANCELLED)
+
+# Giữ tối đa N dòng output gần nhất của mỗi capture
+MAX_OUTPUT_EVENTS = 500
+
+
+class CaptureJob:
+    """Một lần chạy session_get.py của một user"""
+
+    def __init__(self, user_id: str, output_path: Path):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.output_path = Path(output_path)
+        self.status = CAPTURE_RUNNING
+        self.message = "Opening browser... Please login to VKU"
+        self.returncode: Optional[int] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.task: Optional[asyncio.Task] = None
+        self._next_index = 0
+        self._add_event("started", self.message)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in CAPTURE_FINISHED_STATUSES
+
+    def _add_event(self, event_type: str, message: str) -> None:
+        self.events.append({
+            "index": self._next_index,
+            "type": event_type,
+            "message": message,
+            "time": time.time(),
+        })
+        self._next_index += 1
+        if len(self.events) > MAX_OUTPUT_EVENTS:
+            del self.events[: len(self.events) - MAX_OUTPUT_EVENTS]
+
+    def events_since(self, index: int) -> List[Dict[str, Any]]:
+        return [event for event in self.events if event["index"] >= index]
+
+    def to_dict(self, include_events: bool = False) -> Dict[str, Any]:
+        data = {
+            "capture_id": self.id,
+            "status": self.status,
+            "message": self.message,
+            "returncode": self.returncode,
+            "error": self.error,
+            "session_path": str(self.output_path) if self.status == CAPTURE_SUCCEEDED else None,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if include_events:
+            data["events"] = list(self.events)
+        return data
+
+
+class SessionCaptureManager:
+    """
+    Quản lý các capture đang chạy, mỗi user tối đa một capture
+
+    Phải được tạo trong event loop của server (lifespan) vì dùng asyncio task.
+
+    Usage:
+        captures = SessionCaptureManager(SESSION_GET_SCRIPT, cwd=BACKEND_DIR)
+        job, created = captures.start(user_id, session_store.path_for(user_id))
+        await captures.wait(job)
+    """
+
+    def __init__(
+        self,
+        script: Path,
+        cwd: Path,
+        timeout: float = 300,
+        command: Sequence[str] = ("uv", "run", "python"),
+        on_success: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            script: Path tới session_get.py
+            cwd: Thư mục chạy script (Backend, để uv dùng đúng môi trường)
+            timeout: Thời gian tối đa cho user đăng nhập (giây)
+            command: Lệnh chạy python, script và output path được nối vào sau
+            on_success: Gọi với user_id khi user có session mới (vd. xóa cache scrape cũ)
+        """
+        self.script = Path(script)
+        self.cwd = Path(cwd)
+        self.timeout = timeout
+        self.command = list(command)
+        self.on_success = on_success
+        self.jobs_by_user: Dict[str, CaptureJob] = {}
+
+    def start(self, user_id: str, output_path: Path) -> Tuple[CaptureJob, bool]:
+        """
+        Bắt đầu capture cho user, hoặc trả về capture đang chạy của user đó
+
+        Returns:
+            (job, created) - created=False nếu là capture cũ đang chạy
+
+        Raises:
+            FileNotFoundError: Không tìm thấy session_get.py
+        """
+        current = self.jobs_by_user.get(user_id)
+        if current and not current.finished:
+            return current, False
+
+        if not self.script.exists():
+            raise FileNotFoundError(f"session_get.py not found at {self.script}")
+
+        job = CaptureJob(user_id, output_path)
+        self.jobs_by_user[user_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job, True
+
+    def get(self, user_id: str) -> Optional[CaptureJob]:
+        """Capture gần nhất của user (đang chạy hoặc đã xong)"""
+        return self.jobs_by_user.get(user_id)
+
+    async def _pump_output(self, job: CaptureJob) -> None:
+        async for raw_line in job.process.stdout:
+            line = raw_line.decode("utf-8", errors="replace").rstrip()
+            if line:
+                print(f"[capture {job.user_id[:8]}] {line}")
+                job._add_event("output", line)
+
+    async def _run(self, job: CaptureJob) -> None:
+        started_at = time.time()
+        env = {**os.environ, "PYTHONUNBUFFERED": "1", "PYTHONIOENCODING": "utf-8"}
+        try:
+            job.process = await asyncio.create_subprocess_exec(
+                *self.command, str(self.script), str(job.output_path),
+                cwd=str(self.cwd),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                env=env,
+            )
+            await asyncio.wait_for(self._pump_output(job), timeout=self.timeout)
+            job.returncode = await job.process.wait()
+
+            if job.returncode != 0:
+                job.status = CAPTURE_FAILED
+                job.error = f"session_get.py exited with code {job.returncode}"
+                job.message = "Session capture failed"
+            elif job.output_path.exists() and job.output_path.stat().st_mtime >= started_at - 1:
+                job.status = CAPTURE_SUCCEEDED
+                job.message = "Session captured successfully"
+                self._notify_success(job)
+            else:
+                job.status = CAPTURE_FAILED
+                job.message = "Session file was not created"
+        except asyncio.TimeoutError:
+            await self._kill(job)
+            job.status = CAPTURE_FAILED
+            job.error = "timeout"
+            job.message = f"Session capture timeout ({int(self.timeout)}s)"
+        except asyncio.CancelledError:
+            await self._kill(job)
+            job.status = CAPTURE_CANCELLED
+            job.message = "Session capture cancelled"
+        except Exception as e:
+            await self._kill(job)
+            job.status = CAPTURE_FAILED
+            job.error = str(e)
+            job.message = f"Failed to capture session: {e}"
+        finally:
+            job.finished_at = time.time()
+            job._add_event("finished", job.message)
+
+    def _notify_success(self, job: CaptureJob) -> None:
+        if self.on_success is None:
+            return
+        try:
+            self.on_success(job.user_id)
+        except Exception as e:
+            print(f"⚠️ Lỗi on_success của capture: {e}")
+
+    async def _kill(self, job: CaptureJob) -> None:
+        process = job.process
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.kill()
+            job.returncode = await process.wait()
+        except ProcessLookupError:
+            pass
+
+    async def cancel(self, user_id: str) -> Optional[CaptureJob]:
+        """Hủy capture đang chạy của user, trả về job (None nếu không có)"""
+        job = self.jobs_by_user.get(user_id)
+        if not job or job.finished:
+            return None
+        job.task.cancel()
+        await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    async def wait(self, job: CaptureJob) -> CaptureJob:
+        """Chờ capture xong (shield để request bị ngắt không hủy luôn capture)"""
+        await asyncio.shield(job.task)
+        return job
+
+    async def stream_events(self, job: CaptureJob, poll_interval: float = 0.5) -> AsyncIterator[str]:
+        """Sinh output của capture theo format Server-Sent Events, dừng khi capture xong"""
+        index = 0
+        while True:
+            for event in job.events_since(index):
+                index = event["index"] + 1
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["type"] == "finished":
+                    return
+            await asyncio.sleep(poll_interval)
+
+    async def shutdown(self) -> None:
+        """Hủy mọi capture đang chạy (kill browser đăng nhập)"""
+        running = [job for job in self.jobs_by_user.values() if not job.finished]
+        for job in running:
+            job.task.cancel()
+        await asyncio.gather(*(job.task for job in running), return_exceptions=True)
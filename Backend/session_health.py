@@ -0,0 +1,139 @@
+"""
+Session Health - Kiểm tra nhanh session portal VKU của từng user còn hợp lệ không
+
+- Probe = một request HTTP với cookies đã lưu, bị redirect về trang đăng nhập nghĩa là hết hạn
+  (vài chục ms thay vì mở Chromium rồi chờ wait_for_selector timeout 20s+)
+- Kết quả được cache theo user trong ttl giây, tự bỏ cache khi file session thay đổi
+- Keepalive (tùy chọn): định kỳ probe các session sắp hết hạn để portal gia hạn cookie,
+  cookie mới được ghi lại vào session của user
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from session_store import SessionStore
+from vku_http import probe_session
+
+
+class SessionHealthChecker:
+    """
+    Cache kết quả probe session theo user
+
+    Usage:
+        health = SessionHealthChecker(session_store, PROFILE_URL, ttl=60)
+        status = health.check(user_id)   # {"valid": True, "reason": "ok", ...}
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        probe_url: str,
+        ttl: float = 60,
+        refresh_before: float = 24 * 3600
+    ):
+        """
+        Args:
+            store: SessionStore chứa session của các user
+            probe_url: Trang portal cần đăng nhập mới xem được (VD: /sv/hoso)
+            ttl: Thời gian (giây) dùng lại kết quả probe
+            refresh_before: Keepalive probe session có cookie hết hạn trong khoảng này (giây)
+        """
+        self.store = store
+        self.probe_url = probe_url
+        self.ttl = ttl
+        self.refresh_before = refresh_before
+        # user_id -> (modified_at của file session, thời điểm probe, kết quả)
+        self._cache: Dict[str, Tuple[Optional[float], float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def check(self, user_id: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Trạng thái session của user (blocking - gọi qua asyncio.to_thread trong endpoint)
+
+        Returns:
+            {"valid": True | False | None, "reason": ..., "elapsed_ms": ..., "expires_at": ...,
+             "checked_at": ..., "cached": bool}
+        """
+        info = self.store.info(user_id)
+        if not info["exists"]:
+            return {
+                "valid": False,
+                "reason": "no_session",
+                "elapsed_ms": 0.0,
+                "expires_at": None,
+                "checked_at": time.time(),
+                "cached": False,
+            }
+
+        now = time.time()
+        if not force:
+            with self._lock:
+                cached = self._cache.get(user_id)
+            if cached and cached[0] == info["modified_at"] and now - cached[1] < self.ttl:
+                return {**cached[2], "cached": True}
+
+        return self._probe(user_id, info["modified_at"])
+
+    def _probe(self, user_id: str, modified_at: Optional[float]) -> Dict[str, Any]:
+        probe = probe_session(str(self.store.path_for(user_id)), self.probe_url)
+        cookies = probe.pop("cookies")
+        refreshed = probe.pop("refreshed")
+
+        # Portal gia hạn cookie qua Set-Cookie -> ghi lại để lần scrape sau dùng cookie mới
+        if refreshed:
+            state = self.store.load(user_id) or {}
+            if isinstance(state, dict):
+                self.store.save(user_id, {**state, "cookies": cookies})
+            else:
+                self.store.save(user_id, {"cookies": cookies, "origins": []})
+            modified_at = self.store.info(user_id)["modified_at"]
+            print(f"🍪 Đã gia hạn {refreshed} cookie cho user {user_id[:8]}")
+
+        status = {**probe, "checked_at": time.time()}
+        with self._lock:
+            self._cache[user_id] = (modified_at, status["checked_at"], status)
+        return {**status, "cached": False}
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    # ---------- Keepalive ----------
+
+    def _needs_keepalive(self, user_id: str) -> bool:
+        with self._lock:
+            cached = self._cache.get(user_id)
+        if cached and cached[2]["valid"] is False:
+            # Đã biết là hết hạn - chỉ probe lại khi user đã capture session mới
+            return cached[0] != self.store.info(user_id)["modified_at"]
+        expires_at = cached[2].get("expires_at") if cached else None
+        # Không biết hạn (chỉ có session cookie) thì cứ ping để portal không timeout phiên
+        return expires_at is None or expires_at - time.time() < self.refresh_before
+
+    def keepalive_once(self) -> Dict[str, int]:
+        """Probe (và gia hạn cookie) cho mọi session sắp hết hạn"""
+        stats = {"checked": 0, "valid": 0, "invalid": 0}
+        for user_id in self.store.user_ids():
+            try:
+                if not self._needs_keepalive(user_id):
+                    continue
+                status = self.check(user_id, force=True)
+            except Exception as e:
+                print(f"⚠️ Keepalive lỗi cho user {user_id[:8]}: {e}")
+                continue
+            stats["checked"] += 1
+            if status["valid"]:
+                stats["valid"] += 1
+            elif status["valid"] is False:
+                stats["invalid"] += 1
+        return stats
+
+    async def run_keepalive(self, interval: float) -> None:
+        """Vòng lặp keepalive chạy nền trong lifespan (hủy task để dừng)"""
+        while True:
+            await asyncio.sleep(interval)
+            stats = await asyncio.to_thread(self.keepalive_once)
+            if stats["checked"]:
+                print(f"🍪 Session keepalive: {stats}")
@@ -0,0 +1,129 @@
+"""
+Session Store - Lưu storage state (cookies + localStorage) của portal VKU theo từng user
+
+- Mỗi user có một file riêng: <base_dir>/users/<user_id>.json
+- Cache trong bộ nhớ, tự invalidate khi mtime/size của file thay đổi
+  (vd. session_get.py ghi lại file sau khi user đăng nhập lại)
+- Ghi file atomic (ghi file tạm rồi os.replace) để scraper không đọc phải file ghi dở
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SessionStore:
+    """
+    Kho session theo user_id
+
+    Usage:
+        store = SessionStore(SESSIONS_DIR)
+        path = store.path_for(user_id)     # truyền cho scraper / session_get.py
+        state = store.load(user_id)        # dict storage state hoặc None
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir) / "users"
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        # user_id -> ((mtime_ns, size), state)
+        self._cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, user_id: str) -> Path:
+        """
+        Path file session của user
+
+        Raises:
+            ValueError: user_id không hợp lệ (chặn path traversal)
+        """
+        if not user_id or not _USER_ID_PATTERN.match(user_id):
+            raise ValueError(f"Invalid user_id: {user_id!r}")
+        return self.base_dir / f"{user_id}.json"
+
+    def _stat_key(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def user_ids(self) -> List[str]:
+        """Danh sách user đang có session"""
+        return sorted(path.stem for path in self.base_dir.glob("*.json"))
+
+    def exists(self, user_id: str) -> bool:
+        return self.path_for(user_id).exists()
+
+    def info(self, user_id: str) -> Dict[str, Any]:
+        """Thông tin file session của user (cho /api/check-session)"""
+        path = self.path_for(user_id)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return {"exists": False, "path": str(path), "size": None, "modified_at": None}
+        return {
+            "exists": True,
+            "path": str(path),
+            "size": stat.st_size,
+            "modified_at": stat.st_mtime,
+        }
+
+    def load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Đọc storage state của user, dùng cache nếu file chưa thay đổi
+
+        Returns:
+            dict storage state, None nếu user chưa có session
+        """
+        path = self.path_for(user_id)
+        key = self._stat_key(path)
+        if key is None:
+            with self._lock:
+                self._cache.pop(user_id, None)
+            return None
+
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached and cached[0] == key:
+                return cached[1]
+
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        with self._lock:
+            self._cache[user_id] = (key, state)
+        return state
+
+    def save(self, user_id: str, state: Dict[str, Any]) -> Path:
+        """Ghi storage state của user (atomic)"""
+        path = self.path_for(user_id)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.base_dir), prefix=f".{user_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._cache.pop(user_id, None)
+        return path
+
+    def delete(self, user_id: str) -> bool:
+        """Xóa session của user, trả về False nếu không có"""
+        path = self.path_for(user_id)
+        with self._lock:
+            self._cache.pop(user_id, None)
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
@@ -7,7 +7,11 @@ import {
   Trash2,
   RefreshCw,
 } from "lucide-react";
-import { getApiEndpoint, getApiHeaders } from "../utils/apiConfig";
+import {
+  getApiEndpoint,
+  getApiHeaders,
+  getAuthHeaders,
+} from "../utils/apiConfig";
 
 interface SessionCapturePageProps {
   isDarkMode: boolean;
@@ -47,6 +51,7 @@ export function SessionCapturePage({ isDarkMode }: SessionCapturePageProps) {
         headers: {
           "Content-Type": "application/json",
           ...getApiHeaders(),
+          ...getAuthHeaders(),
         },
         mode: "cors",
       });
@@ -91,7 +96,7 @@ export function SessionCapturePage({ isDarkMode }: SessionCapturePageProps) {
     try {
       const response = await fetch(`${apiEndpoint}/api/capture-session`, {
         method: "POST",
-        headers: getApiHeaders(),
+        headers: { ...getApiHeaders(), ...getAuthHeaders() },
       });
 
       const data = await response.json();
@@ -128,7 +133,7 @@ export function SessionCapturePage({ isDarkMode }: SessionCapturePageProps) {
     try {
       const response = await fetch(`${apiEndpoint}/api/session`, {
         method: "DELETE",
-        headers: getApiHeaders(),
+        headers: { ...getApiHeaders(), ...getAuthHeaders() },
       });
 
       const data = await response.json();
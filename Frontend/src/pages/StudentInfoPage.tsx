@@ -13,7 +13,11 @@ import {
   Trash2,
 } from "lucide-react";
 import type { ThemeMode } from "../App";
-import { getApiEndpoint, getApiHeaders } from "../utils/apiConfig";
+import {
+  getApiEndpoint,
+  getApiHeaders,
+  getAuthHeaders,
+} from "../utils/apiConfig";
 
 interface StudentInfoPageProps {
   themeMode: ThemeMode;
@@ -139,7 +143,7 @@ export function StudentInfoPage({
   const checkScrapeStatus = async () => {
     try {
       const response = await fetch(`${apiEndpoint}/api/scrape-status`, {
-        headers: getApiHeaders(),
+        headers: { ...getApiHeaders(), ...getAuthHeaders() },
       });
       if (response.ok) {
         const data = await response.json();
@@ -160,6 +164,7 @@ export function StudentInfoPage({
         headers: {
           "Content-Type": "application/json",
           ...getApiHeaders(),
+          ...getAuthHeaders(),
         },
         mode: "cors",
       });
@@ -189,7 +194,7 @@ export function StudentInfoPage({
     try {
       const response = await fetch(`${apiEndpoint}/api/capture-session`, {
         method: "POST",
-        headers: getApiHeaders(),
+        headers: { ...getApiHeaders(), ...getAuthHeaders() },
       });
 
       const data = await response.json();
@@ -225,7 +230,7 @@ export function StudentInfoPage({
     try {
       const response = await fetch(`${apiEndpoint}/api/session`, {
         method: "DELETE",
-        headers: getApiHeaders(),
+        headers: { ...getApiHeaders(), ...getAuthHeaders() },
       });
 
       const data = await response.json();
@@ -83,6 +83,22 @@ export const getApiHeaders = (): Record<string, string> => {
   };
 };
 
+// Authorization header from the stored Supabase session (empty if not logged in)
+export const getAuthHeaders = (): Record<string, string> => {
+  const storedSession = localStorage.getItem("vku_session");
+  if (!storedSession) {
+    return {};
+  }
+  try {
+    const session = JSON.parse(storedSession);
+    return session.access_token
+      ? { Authorization: `Bearer ${session.access_token}` }
+      : {};
+  } catch {
+    return {};
+  }
+};
+
 // Fetch wrapper with automatic headers
 export const apiFetch = async (
   path: string,